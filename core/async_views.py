@@ -0,0 +1,82 @@
+"""
+Async views for read-heavy endpoints.
+
+`AsyncAPIView` is an `APIView` whose `async def` handlers run on the ASGI
+event loop, so a slow query parks a coroutine instead of a worker thread.
+Authentication, permission and throttle checks (which may query the
+database) run through `sync_to_async`; handlers that stay synchronous (e.g.
+`put` next to an async `get`) are run the same way, so one class can mix
+both.
+
+Handlers load data with Django's async ORM (`aget`, `async for`, ...) and
+serialize the loaded rows on the event loop, so serializers must not touch
+anything that was not fetched (`core.optimization.optimize_queryset` takes
+care of that for declared fields).
+
+The async ORM runs every query of a request on one thread, one after the
+other. `gather_queries()` runs independent queries concurrently instead,
+each on its own thread and database connection, which is closed as soon as
+the query returns.
+"""
+
+import asyncio
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.db import connection
+from rest_framework.views import APIView
+
+
+class AsyncAPIView(APIView):
+    # Django only serves a view asynchronously if it says so
+    view_is_async = True
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(
+                    self, request.method.lower(), self.http_method_not_allowed
+                )
+            else:
+                handler = self.http_method_not_allowed
+
+            if iscoroutinefunction(handler):
+                response = await handler(request, *args, **kwargs)
+            else:
+                response = await sync_to_async(handler)(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+
+def _with_connection(func):
+    def run():
+        try:
+            return func()
+        finally:
+            # Pool threads outlive requests; never leave a connection behind
+            connection.close()
+
+    return run
+
+
+async def gather_queries(*funcs):
+    """
+    Run the synchronous callables `funcs` (usually lambdas evaluating a
+    queryset) concurrently, each on its own thread and connection, and
+    return their results in order.
+    """
+    return await asyncio.gather(
+        *(
+            sync_to_async(_with_connection(func), thread_sensitive=False)()
+            for func in funcs
+        )
+    )
@@ -0,0 +1,60 @@
+"""
+Multi-get endpoints.
+
+Clients hydrating cards from notifications and feeds ask for many objects at
+once with `?ids=3,8,15` instead of one request per id. `parse_ids()` reads
+and bounds the list, the view loads every requested object with one
+optimised queryset, and `batch_results()` answers per id, in the order
+asked:
+
+    {"results": [
+        {"id": 3, "status": 200, "data": {...}},
+        {"id": 8, "status": 404, "error": "Not found."},
+        {"id": 15, "status": 403, "error": "You do not have permission to view this."}
+    ]}
+
+so one missing or hidden object does not fail the whole request.
+"""
+
+from django.conf import settings
+from rest_framework.exceptions import ValidationError
+
+MAX_BATCH_IDS = getattr(settings, "MAX_BATCH_IDS", 200)
+
+NOT_FOUND = "Not found."
+FORBIDDEN = "You do not have permission to view this."
+
+
+def parse_ids(request, maximum=MAX_BATCH_IDS):
+    """Read the comma-separated `ids` query parameter, without duplicates."""
+    raw = request.query_params.get("ids", "")
+    try:
+        ids = [int(part) for part in raw.split(",") if part.strip()]
+    except ValueError:
+        raise ValidationError({"ids": "Must be a comma-separated list of integers."})
+    if not ids:
+        raise ValidationError({"ids": "This query parameter is required."})
+    ids = list(dict.fromkeys(ids))
+    if len(ids) > maximum:
+        raise ValidationError({"ids": f"At most {maximum} ids per request."})
+    return ids
+
+
+def batch_results(ids, objects, serialize, forbidden=frozenset()):
+    """
+    Build the per-id results for `ids`. `objects` maps an id to its loaded
+    object, `serialize` renders a list of objects, and ids in `forbidden`
+    exist but may not be shown to the requesting user.
+    """
+    visible = [pk for pk in ids if pk in objects and pk not in forbidden]
+    data = dict(zip(visible, serialize([objects[pk] for pk in visible])))
+
+    results = []
+    for pk in ids:
+        if pk in data:
+            results.append({"id": pk, "status": 200, "data": data[pk]})
+        elif pk in objects:
+            results.append({"id": pk, "status": 403, "error": FORBIDDEN})
+        else:
+            results.append({"id": pk, "status": 404, "error": NOT_FOUND})
+    return {"results": results}
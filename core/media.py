@@ -0,0 +1,159 @@
+"""
+Serving uploaded media (`MEDIA_URL`).
+
+`serve_media` answers for files of the default storage. What it sends
+depends on `MEDIA_SERVE_MODE`:
+
+- `"django"` streams the file from the worker, honouring conditional
+  requests and single byte ranges (`Range: bytes=...`), so video players can
+  seek;
+- `"x-accel-redirect"` (nginx) and `"x-sendfile"` (Apache, lighttpd) only
+  send the headers and let the front proxy transfer the file, including
+  ranges, which frees the worker at once. For nginx, map
+  `MEDIA_ACCEL_REDIRECT_PREFIX` to `MEDIA_ROOT` in an `internal` location.
+
+Content-hashed names (`core.storage`) are cached for a year as `immutable`;
+other files must be revalidated.
+"""
+
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponse,
+    HttpResponseNotModified,
+    StreamingHttpResponse,
+)
+from django.utils._os import safe_join
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, quote_etag
+from django.views.decorators.http import require_safe
+
+from core.storage import is_hashed
+
+MEDIA_SERVE_MODE = getattr(settings, "MEDIA_SERVE_MODE", "django")
+MEDIA_ACCEL_REDIRECT_PREFIX = getattr(
+    settings, "MEDIA_ACCEL_REDIRECT_PREFIX", "/protected-media/"
+)
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "public, no-cache"
+BLOCK_SIZE = 64 * 1024
+
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def _byte_range(header, size):
+    """
+    `(start, end)` (inclusive) of a single-range `Range` header, None to
+    send the whole file, or False if the range cannot be satisfied.
+    """
+    match = _RANGE.match(header.strip())
+    # Malformed and multi-range requests get the whole file (RFC 9110 14.2)
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        # An empty file has no last bytes to send
+        if length == 0 or size == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        return False
+    return start, end
+
+
+def _read(path, start, length):
+    with open(path, "rb") as file:
+        file.seek(start)
+        while length > 0:
+            data = file.read(min(BLOCK_SIZE, length))
+            if not data:
+                break
+            length -= len(data)
+            yield data
+
+
+@require_safe
+def serve_media(request, path):
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+        stat = os.stat(full_path)
+    except (OSError, ValueError, SuspiciousFileOperation):
+        raise Http404("File not found.")
+    if not os.path.isfile(full_path):
+        raise Http404("File not found.")
+
+    etag = quote_etag(f"{stat.st_mtime_ns:x}-{stat.st_size:x}")
+    last_modified = int(stat.st_mtime)
+    headers = {
+        "Cache-Control": IMMUTABLE if is_hashed(path) else REVALIDATE,
+        "ETag": etag,
+        "Last-Modified": http_date(last_modified),
+        "Accept-Ranges": "bytes",
+    }
+    content_type, encoding = mimetypes.guess_type(full_path)
+    content_type = content_type or "application/octet-stream"
+
+    if_none_match = request.headers.get("If-None-Match")
+    if_modified_since = parse_http_date_safe(
+        request.headers.get("If-Modified-Since", "")
+    )
+    if (
+        if_none_match is not None and {etag, "*"} & set(parse_etags(if_none_match))
+    ) or (
+        if_none_match is None
+        and if_modified_since is not None
+        and last_modified <= if_modified_since
+    ):
+        response = HttpResponseNotModified()
+        for name, value in headers.items():
+            response[name] = value
+        return response
+
+    if MEDIA_SERVE_MODE in ("x-accel-redirect", "x-sendfile"):
+        response = HttpResponse(content_type=content_type, headers=headers)
+        if MEDIA_SERVE_MODE == "x-accel-redirect":
+            response["X-Accel-Redirect"] = MEDIA_ACCEL_REDIRECT_PREFIX + path
+        else:
+            response["X-Sendfile"] = full_path
+        return response
+
+    byte_range = None
+    range_header = request.headers.get("Range")
+    if_range = request.headers.get("If-Range")
+    # A stale If-Range asks for the whole (changed) file instead
+    if range_header and (
+        if_range is None or if_range in (etag, headers["Last-Modified"])
+    ):
+        byte_range = _byte_range(range_header, stat.st_size)
+
+    if byte_range is False:
+        response = HttpResponse(status=416, headers=headers)
+        response["Content-Range"] = f"bytes */{stat.st_size}"
+        return response
+
+    if byte_range is None:
+        response = FileResponse(open(full_path, "rb"), content_type=content_type)
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(
+            _read(full_path, start, end - start + 1),
+            status=206,
+            content_type=content_type,
+        )
+        response["Content-Length"] = str(end - start + 1)
+        response["Content-Range"] = f"bytes {start}-{end}/{stat.st_size}"
+    for name, value in headers.items():
+        response[name] = value
+    if encoding:
+        response["Content-Encoding"] = encoding
+    return response
@@ -0,0 +1,183 @@
+"""
+Queryset optimisation driven by serializer declarations.
+
+`optimize_queryset(queryset, SerializerClass)` reads the fields a serializer
+will render and adds the `select_related`, `prefetch_related` and `annotate`
+calls needed to render a whole list in a constant number of queries:
+
+- dotted sources (`source="created_by.username"`) and nested serializers on
+  forward foreign keys / one-to-ones become `select_related`;
+- nested `many=True` serializers and many-related fields become `Prefetch`
+  objects whose inner queryset is optimised for the child serializer;
+- `SerializerMethodField`s cannot be introspected, so a serializer may declare
+  the ORM paths they read in `Meta.field_paths`, e.g.
+  `{"claimer_username": ["claimer__username", "anonymous_claimant"]}`;
+- `Meta.annotations` maps a field name to the annotations it relies on, e.g.
+  `{"is_paid_forward": {"paid_forward_exists": Exists(...)}}`, which are
+  only applied when that field is rendered.
+
+When the serializer was trimmed with a sparse fieldset (see
+`core.serializers`), the columns it reads are also pushed down with `.only()`.
+If any rendered field reads something the optimiser cannot see, every column
+is loaded as usual.
+"""
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+from rest_framework.relations import ManyRelatedField, RelatedField
+
+
+def optimize_queryset(queryset, serializer, extra_fields=()):
+    """
+    Return `queryset` with the eager loading `serializer` needs.
+
+    `serializer` may be a serializer class or instance (a `many=True` list
+    serializer is unwrapped to its child). `extra_fields` names columns the
+    caller reads itself, which stay loaded when `.only()` is applied.
+    """
+    serializer = _as_instance(serializer)
+    plan = _Plan()
+    _collect(plan, serializer, queryset.model, prefix="", top_level=True)
+
+    if plan.select_related:
+        queryset = queryset.select_related(*sorted(plan.select_related))
+    if plan.prefetch_related:
+        queryset = queryset.prefetch_related(*plan.prefetch_related.values())
+    if plan.annotations:
+        queryset = queryset.annotate(**plan.annotations)
+    if getattr(serializer, "sparse", False) and plan.only_complete:
+        queryset = queryset.only(*sorted(plan.only | {"pk", *extra_fields}))
+    return queryset
+
+
+class _Plan:
+    def __init__(self):
+        self.select_related = set()
+        self.prefetch_related = {}
+        self.annotations = {}
+        # Columns read by the rendered fields, as ORM paths
+        self.only = set()
+        self.only_complete = True
+
+
+def _as_instance(serializer):
+    if isinstance(serializer, type):
+        serializer = serializer()
+    if isinstance(serializer, serializers.ListSerializer):
+        serializer = serializer.child
+    return serializer
+
+
+def _collect(plan, serializer, model, prefix, top_level):
+    meta = getattr(serializer, "Meta", None)
+    field_paths = getattr(meta, "field_paths", {})
+    annotations = getattr(meta, "annotations", {})
+
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+
+        # Annotations can only be attached to the queryset being optimised,
+        # not to rows pulled in through select_related.
+        if top_level and name in annotations:
+            plan.annotations.update(annotations[name])
+            continue
+
+        if name in field_paths:
+            for path in field_paths[name]:
+                _add_column(plan, model, path.split("__"), prefix)
+            continue
+
+        if field.source == "*":
+            plan.only_complete = False
+            continue
+        source = field.source.split(".")
+
+        if isinstance(field, serializers.ListSerializer):
+            _add_prefetch(plan, model, source, prefix, field.child)
+        elif isinstance(field, serializers.BaseSerializer):
+            related_model = _add_path(plan, model, source + [None], prefix)
+            if related_model is None:
+                plan.only_complete = False
+                continue
+            _collect(
+                plan,
+                field,
+                related_model,
+                prefix=prefix + "__".join(source) + "__",
+                top_level=False,
+            )
+        elif isinstance(field, ManyRelatedField):
+            _add_prefetch(plan, model, source, prefix, None)
+        elif isinstance(field, RelatedField) and len(source) == 1:
+            # Primary key fields render from the `<name>_id` column.
+            plan.only.add(prefix + source[0])
+        else:
+            _add_column(plan, model, source, prefix)
+
+
+def _add_column(plan, model, parts, prefix):
+    """Register a (possibly related) column read by a field."""
+    target = _add_path(plan, model, parts, prefix)
+    if target is None:
+        plan.only_complete = False
+        return
+    try:
+        field = target._meta.get_field(parts[-1])
+    except FieldDoesNotExist:
+        # Properties and methods may read anything
+        plan.only_complete = False
+        return
+    if field.concrete:
+        plan.only.add(prefix + "__".join(parts))
+    elif not (field.one_to_many or field.many_to_many):
+        plan.only_complete = False
+
+
+def _add_path(plan, model, parts, prefix):
+    """
+    Walk `parts` (the last part being a plain attribute) and register the
+    relations crossed. Returns the model reached, or None when the path leaves
+    the ORM (properties, methods) or crosses a to-many relation.
+    """
+    joined = []
+    for index, part in enumerate(parts[:-1]):
+        try:
+            field = model._meta.get_field(part)
+        except FieldDoesNotExist:
+            return None
+        if not field.is_relation:
+            return None
+        if field.many_to_many or field.one_to_many:
+            _add_prefetch(
+                plan, model, parts[index : index + 1], prefix + _join(joined), None
+            )
+            return None
+        joined.append(part)
+        plan.select_related.add(prefix + "__".join(joined))
+        plan.only.add(prefix + "__".join(joined))
+        model = field.related_model
+    return model
+
+
+def _add_prefetch(plan, model, source, prefix, child):
+    lookup = prefix + "__".join(source)
+    if lookup in plan.prefetch_related:
+        return
+    try:
+        field = model._meta.get_field(source[0])
+    except FieldDoesNotExist:
+        return
+    if len(source) != 1 or not field.is_relation:
+        return
+
+    if child is not None and hasattr(child, "Meta") and hasattr(child.Meta, "model"):
+        inner = optimize_queryset(field.related_model._default_manager.all(), child)
+        plan.prefetch_related[lookup] = Prefetch(lookup, queryset=inner)
+    else:
+        plan.prefetch_related[lookup] = lookup
+
+
+def _join(parts):
+    return "__".join(parts) + "__" if parts else ""
@@ -0,0 +1,39 @@
+"""
+Sparse fieldsets for API responses.
+
+`?fields=id,title,status` limits a response to the named fields and
+`?expand=claims` adds heavy fields back on top of that selection. A
+serializer lists its heavy (nested) fields in `Meta.expandable_fields`; they
+are dropped whenever `fields` is given unless named in `fields` or `expand`.
+Without either parameter the full representation is returned, as before.
+
+Because the trimmed serializer only declares the fields it renders,
+`core.optimization.optimize_queryset` skips the joins and prefetches nobody
+asked for and loads only the needed columns with `.only()`.
+"""
+
+
+def sparse_fieldset(request):
+    """Read the `fields` / `expand` query parameters into serializer kwargs."""
+    params = {}
+    for name in ("fields", "expand"):
+        raw = request.query_params.get(name)
+        if raw is not None:
+            params[name] = [part.strip() for part in raw.split(",") if part.strip()]
+    return params
+
+
+class SparseFieldsetMixin:
+    """Serializer mixin accepting `fields=` and `expand=` keyword arguments."""
+
+    def __init__(self, *args, fields=None, expand=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.sparse = fields is not None
+        if not self.sparse:
+            return
+
+        expandable = set(getattr(self.Meta, "expandable_fields", ()))
+        keep = set(fields) | (expandable & set(expand or ()))
+        for name in list(self.fields):
+            if name not in keep:
+                self.fields.pop(name)
@@ -36,11 +36,28 @@ CORS_ORIGIN_ALLOW_ALL = True
 MEDIA_URL = "/media/"
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 
+# Uploaded media get content-hashed, immutable names (core/storage.py) and are
+# served by core/media.py. MEDIA_SERVE_MODE "django" streams them from the
+# worker (with Range support); "x-accel-redirect" (nginx, with an internal
+# location for MEDIA_ACCEL_REDIRECT_PREFIX) or "x-sendfile" hands the
+# transfer to the front proxy.
+
+STORAGES = {
+    "default": {"BACKEND": "core.storage.HashedFileSystemStorage"},
+    # RAK media and profile images, deduplicated by content (uploads/storage.py)
+    "blobs": {"BACKEND": "uploads.storage.BlobStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+}
+MEDIA_SERVE_MODE = os.environ.get("MEDIA_SERVE_MODE", "django")
+MEDIA_ACCEL_REDIRECT_PREFIX = "/protected-media/"
+
 # Application definition
 
 INSTALLED_APPS = [
     "users.apps.UsersConfig",
     "rak.apps.RakConfig",
+    "jobs.apps.JobsConfig",
+    "uploads.apps.UploadsConfig",
     "rest_framework",
     "rest_framework.authtoken",
     "corsheaders",
@@ -56,7 +73,7 @@ AUTH_USER_MODEL = "users.CustomUser"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.TokenAuthentication",
+        "users.authentication.CachedTokenAuthentication",
     ]
 }
 
@@ -70,6 +87,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "rak.middleware.EventBatchMiddleware",
 ]
 
 ROOT_URLCONF = "core.urls"
@@ -147,3 +165,97 @@ STATIC_ROOT = os.path.join(BASE_DIR, "staticfiles")
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+
+# Home feed timelines (rak/timeline.py)
+# Authors with more followers than this are pulled into feeds at read time
+# instead of being fanned out to every follower on write.
+
+TIMELINE_MAX_LENGTH = 500
+TIMELINE_FANOUT_MAX_FOLLOWERS = 5000
+
+
+# Caching
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# The public RAK list cache (rak/response_cache.py) keys entries by the version
+# counter of each list, so even a per-process cache never serves a stale page.
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "youra",
+        "OPTIONS": {"MAX_ENTRIES": 5000},
+    }
+}
+
+RAK_LIST_CACHE_ALIAS = "default"
+RAK_LIST_CACHE_TIMEOUT = 300
+
+# Leaderboard (users/leaderboard.py)
+# Each worker fully reloads its in-process ranking this often (seconds).
+
+LEADERBOARD_RELOAD_SECONDS = 300
+
+# Notifications (rak/notifications.py)
+# `prune_notifications` deletes read notifications older than this (days).
+
+NOTIFICATION_RETENTION_DAYS = 90
+
+# Background jobs (jobs/)
+# Each queue maps to how many of its jobs may run at once across all
+# `run_jobs` workers. With JOBS_EAGER, jobs run in-process after commit
+# instead, for local development without a worker.
+
+JOB_QUEUES = {
+    "default": 1,
+    "images": 2,
+    "notifications": 2,
+    "points": 1,
+    "timelines": 2,
+}
+JOB_RETRY_BACKOFF = 10
+JOB_RETRY_BACKOFF_MAX = 3600
+JOB_LOCK_TIMEOUT = 600
+JOBS_EAGER = False
+
+# Live event stream (rak/streams.py)
+# Each process polls for new notifications and status changes this often
+# (seconds) and sends idle streams a keepalive comment every heartbeat.
+
+STREAM_POLL_INTERVAL = 2
+STREAM_HEARTBEAT_INTERVAL = 15
+
+# Multi-get endpoints (core/batch.py)
+# Most ids a client may ask for in one `?ids=` batch request.
+
+MAX_BATCH_IDS = 200
+
+# Chunked uploads (uploads/chunked.py)
+# Largest upload and chunk accepted (bytes); `prune_uploads` deletes uploads
+# nobody appended to for UPLOAD_EXPIRY_HOURS.
+
+UPLOAD_MAX_SIZE = 500 * 1024 * 1024
+UPLOAD_MAX_CHUNK_SIZE = 8 * 1024 * 1024
+UPLOAD_EXPIRY_HOURS = 24
+
+# Image variants (uploads/variants.py)
+# Resizing runs in a pool of this many processes per `run_jobs` worker.
+# Larger source images (bytes) get no variants.
+
+IMAGE_VARIANT_PROCESSES = 2
+IMAGE_VARIANT_MAX_SOURCE_SIZE = 20 * 1024 * 1024
+
+# Media blobs (uploads/blobs.py)
+# `gc_media` deletes blobs nothing has referred to for MEDIA_GC_GRACE_HOURS,
+# MEDIA_GC_BATCH_SIZE blobs per transaction.
+
+MEDIA_GC_GRACE_HOURS = 24
+MEDIA_GC_BATCH_SIZE = 500
+
+# Token authentication (users/authentication.py)
+# Each process caches up to TOKEN_CACHE_SIZE tokens with their user; profiles
+# are always read fresh. User changes made by other processes show after
+# TOKEN_CACHE_TTL (seconds) at most, deactivations included.
+
+TOKEN_CACHE_SIZE = 10000
+TOKEN_CACHE_TTL = 60
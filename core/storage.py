@@ -0,0 +1,101 @@
+"""
+Content-addressed file names for uploaded media.
+
+`HashedFileSystemStorage` (the default storage, see `STORAGES`) stores
+`rak_media/pic.png` as `rak_media/pic.3f2a9c1b7e0d.png`, where the suffix is
+taken from the SHA-256 of the content. A name therefore never changes
+content, which lets `core.media` serve it with a far-future immutable
+`Cache-Control`. The hash is computed while the file is written, in one pass,
+so non-seekable content (the raw request body of a chunked upload) works.
+Saving content that is already stored under the same name reuses the file.
+
+`uploads.storage.BlobStorage` goes further for the media fields and keys
+files by their hash alone, so identical content is stored once.
+"""
+
+import hashlib
+import os
+import re
+import tempfile
+
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import FileSystemStorage
+
+HASH_LENGTH = 12
+
+# `pic.3f2a9c1b7e0d.png`, or a full digest as the file name (uploads.storage)
+_HASHED_NAME = re.compile(
+    rf"(\.[0-9a-f]{{{HASH_LENGTH}}}|(^|/)[0-9a-f]{{64}})(\.[^./]*)?$"
+)
+
+
+def is_hashed(name):
+    """Whether `name` was stored with a content hash, i.e. is immutable."""
+    return bool(_HASHED_NAME.search(name))
+
+
+class HashedFileSystemStorage(FileSystemStorage):
+    def get_available_name(self, name, max_length=None):
+        # _save() makes the name unique by inserting the content hash; only
+        # leave room for it here.
+        if max_length is not None:
+            excess = len(name) + HASH_LENGTH + 1 - max_length
+            if excess > 0:
+                dir_name, file_name = os.path.split(name)
+                root, ext = os.path.splitext(file_name)
+                if excess >= len(root):
+                    raise SuspiciousFileOperation(
+                        f'Storage can not find an available filename for "{name}".'
+                    )
+                name = os.path.join(dir_name, root[:-excess] + ext)
+        return name
+
+    def _write_temp(self, directory, content):
+        """
+        Write `content` to a temporary file in `directory` (created if need
+        be); returns its path and the SHA-256 hex digest of the content.
+        """
+        os.makedirs(
+            directory, mode=self.directory_permissions_mode or 0o777, exist_ok=True
+        )
+        digest = hashlib.sha256()
+        descriptor, temp_path = tempfile.mkstemp(dir=directory, prefix=".upload-")
+        try:
+            with os.fdopen(descriptor, "wb") as temp:
+                for chunk in content.chunks():
+                    if isinstance(chunk, str):
+                        chunk = chunk.encode()
+                    digest.update(chunk)
+                    temp.write(chunk)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+        return temp_path, digest.hexdigest()
+
+    def _place(self, temp_path, name):
+        """Move a file written by `_write_temp` to `name`, unless it exists."""
+        full_path = self.path(name)
+        try:
+            if os.path.exists(full_path):
+                # Same content under the same name; keep the stored file
+                os.remove(temp_path)
+                return
+            os.makedirs(
+                os.path.dirname(full_path),
+                mode=self.directory_permissions_mode or 0o777,
+                exist_ok=True,
+            )
+            os.replace(temp_path, full_path)
+            if self.file_permissions_mode is not None:
+                os.chmod(full_path, self.file_permissions_mode)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def _save(self, name, content):
+        temp_path, digest = self._write_temp(os.path.dirname(self.path(name)), content)
+        root, ext = os.path.splitext(name)
+        name = f"{root}.{digest[:HASH_LENGTH]}{ext}"
+        self._place(temp_path, name)
+        return str(name).replace("\\", "/")
@@ -0,0 +1,171 @@
+import os
+import tempfile
+import threading
+from unittest import mock
+
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from core import async_views
+from core.media import _byte_range, serve_media
+from core.optimization import optimize_queryset
+from rak.models import Claimant, Collaborators, Notification, RandomActOfKindness
+from rak.serializers import (
+    ClaimantSerializer,
+    CollaboratorsSerializer,
+    NotificationSerializer,
+    RandomActOfKindnessSerializer,
+)
+from users.models import CustomUser, Follow, UserProfile
+from users.serializers import FollowSerializer, UserProfileSerializer
+
+
+class GatherQueriesTests(TestCase):
+    async def test_queries_overlap_and_close_their_connections(self):
+        # Both calls must be inside at once to get past the barrier
+        barrier = threading.Barrier(2, timeout=5)
+
+        def query():
+            barrier.wait()
+            return CustomUser.objects.exists()
+
+        with mock.patch.object(async_views, "connection") as connection:
+            results = await async_views.gather_queries(query, query)
+        self.assertEqual(results, [False, False])
+        self.assertEqual(connection.close.call_count, 2)
+
+    async def test_connection_is_closed_when_a_query_fails(self):
+        def fail():
+            raise ValueError
+
+        with mock.patch.object(async_views, "connection") as connection:
+            with self.assertRaises(ValueError):
+                await async_views.gather_queries(fail)
+        connection.close.assert_called_once_with()
+
+
+class OptimizeQuerysetTests(TestCase):
+    def setUp(self):
+        users = [
+            CustomUser.objects.create_user(username=f"user{i}", password="pw")
+            for i in range(4)
+        ]
+        for author, other in zip(users, users[1:] + users[:1]):
+            rak = RandomActOfKindness.objects.create(
+                created_by=author,
+                title="t",
+                description="d",
+                rak_type="offer",
+                action="a",
+                allow_collaborators=True,
+            )
+            rak.claim_rak(other, comment="c")
+            rak.collaborate(other, comment="c")
+            Follow.objects.create(follower=author, followed=other)
+            Notification.objects.create(recipient=author, message="m")
+
+    def render(self, serializer_class, queryset, queries, **fieldset):
+        """Render the optimised `queryset` in exactly `queries` queries."""
+        queryset = optimize_queryset(queryset, serializer_class(**fieldset))
+        with self.assertNumQueries(queries):
+            data = serializer_class(queryset, many=True, **fieldset).data
+        self.assertEqual(len(data), 4)
+        return queryset, data
+
+    def test_lists_render_in_constant_queries(self):
+        # The RAKs, then one prefetch each for claims and collaborators
+        _, raks = self.render(
+            RandomActOfKindnessSerializer, RandomActOfKindness.objects.all(), 3
+        )
+        self.assertTrue(all(rak["claims"] and rak["collabs"] for rak in raks))
+        self.render(ClaimantSerializer, Claimant.objects.all(), 1)
+        self.render(CollaboratorsSerializer, Collaborators.objects.all(), 1)
+        self.render(NotificationSerializer, Notification.objects.all(), 1)
+        self.render(FollowSerializer, Follow.objects.all(), 1)
+        _, profiles = self.render(UserProfileSerializer, UserProfile.objects.all(), 1)
+        self.assertTrue(all(profile["user"]["username"] for profile in profiles))
+
+    def test_sparse_fieldsets_load_only_what_they_render(self):
+        queryset, raks = self.render(
+            RandomActOfKindnessSerializer,
+            RandomActOfKindness.objects.all(),
+            1,
+            fields=["id", "title", "created_by_username"],
+        )
+        self.assertEqual(set(raks[0]), {"id", "title", "created_by_username"})
+        self.assertNotIn("description", str(queryset.query))
+
+        # Expanding claims adds their prefetch back, but not the collaborators'
+        _, raks = self.render(
+            RandomActOfKindnessSerializer,
+            RandomActOfKindness.objects.all(),
+            2,
+            fields=["id"],
+            expand=["claims"],
+        )
+        self.assertEqual(set(raks[0]), {"id", "claims"})
+
+        queryset, profiles = self.render(
+            UserProfileSerializer, UserProfile.objects.all(), 1, fields=["aura_points"]
+        )
+        self.assertEqual(set(profiles[0]), {"aura_points"})
+        self.assertNotIn("username", str(queryset.query))
+
+
+class ByteRangeTests(SimpleTestCase):
+    def test_ranges(self):
+        cases = (
+            ("bytes=0-3", 10, (0, 3)),
+            ("bytes=2-", 10, (2, 9)),
+            ("bytes=5-100", 10, (5, 9)),
+            ("bytes=-4", 10, (6, 9)),
+            ("bytes=-40", 10, (0, 9)),
+            ("bytes=10-", 10, False),
+            ("bytes=4-2", 10, False),
+            ("bytes=-0", 10, False),
+            ("bytes=-5", 0, False),
+            ("bytes=0-", 0, False),
+            ("bytes=0-1,4-5", 10, None),
+            ("items=0-1", 10, None),
+            ("bytes=-", 10, None),
+        )
+        for header, size, expected in cases:
+            with self.subTest(header=header, size=size):
+                self.assertEqual(_byte_range(header, size), expected)
+
+
+class ServeMediaTests(SimpleTestCase):
+    def setUp(self):
+        root = tempfile.TemporaryDirectory()
+        self.addCleanup(root.cleanup)
+        with open(os.path.join(root.name, "clip.bin"), "wb") as file:
+            file.write(b"0123456789")
+        settings = override_settings(MEDIA_ROOT=root.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def get(self, **headers):
+        return serve_media(
+            RequestFactory().get("/media/clip.bin", **headers), "clip.bin"
+        )
+
+    def test_range_is_partial_content(self):
+        response = self.get(HTTP_RANGE="bytes=-3")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], "bytes 7-9/10")
+        self.assertEqual(b"".join(response.streaming_content), b"789")
+
+    def test_unsatisfiable_range(self):
+        response = self.get(HTTP_RANGE="bytes=10-")
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], "bytes */10")
+
+    def test_stale_if_range_sends_the_whole_file(self):
+        whole = self.get()
+        whole.close()
+        etag = whole["ETag"]
+        response = self.get(HTTP_RANGE="bytes=0-1", HTTP_IF_RANGE=etag)
+        self.assertEqual(response.status_code, 206)
+
+        response = self.get(HTTP_RANGE="bytes=0-1", HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), b"0123456789")
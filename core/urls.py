@@ -14,8 +14,12 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+import re
+
+from django.conf import settings
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
+from core.media import serve_media
 from users.views import CustomAuthToken  # Import your token authentication view
 
 urlpatterns = [
@@ -27,10 +31,19 @@ urlpatterns = [
 
     # Include URLs from the 'users' app without 'api' prefix
     path('users/', include('users.urls')),
+    path('uploads/', include('uploads.urls')),
 
     # Django REST Framework login and logout views
     path('auth/', include('rest_framework.urls')),
 
     # Token-based authentication for API access without 'api' prefix
     path('token-auth/', CustomAuthToken.as_view(), name='token_auth'),
+
+    # Uploaded media, with caching headers, Range support and optional
+    # X-Accel-Redirect / X-Sendfile offload (see core/media.py)
+    re_path(
+        r'^%s(?P<path>.*)$' % re.escape(settings.MEDIA_URL.lstrip('/')),
+        serve_media,
+        name='media',
+    ),
 ]
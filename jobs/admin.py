@@ -0,0 +1,10 @@
+# jobs/admin.py
+
+from django.contrib import admin
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ("id", "task", "queue", "status", "attempts", "run_at")
+    list_filter = ("queue", "status")
@@ -0,0 +1,45 @@
+import signal
+
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs.worker import JOB_QUEUES, Worker
+
+
+class Command(BaseCommand):
+    help = (
+        "Run queued background jobs. Start as many workers as needed; each "
+        "one runs one job at a time and respects the JOB_QUEUES limits."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--queue",
+            action="append",
+            dest="queues",
+            help="Queue to work on (repeatable). Defaults to every JOB_QUEUES entry.",
+        )
+        parser.add_argument(
+            "--burst",
+            action="store_true",
+            help="Exit once no job is due instead of waiting for more.",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=1.0,
+            help="Seconds to wait when no job is due.",
+        )
+
+    def handle(self, *args, **options):
+        queues = options["queues"]
+        unknown = set(queues or ()) - set(JOB_QUEUES)
+        if unknown:
+            raise CommandError(f"Unknown queues: {', '.join(sorted(unknown))}")
+
+        worker = Worker(queues, poll_interval=options["poll_interval"])
+        # Let the current job finish on shutdown
+        signal.signal(signal.SIGTERM, worker.stop)
+        signal.signal(signal.SIGINT, worker.stop)
+
+        ran = worker.run(burst=options["burst"])
+        self.stdout.write(self.style.SUCCESS(f"Ran {ran} jobs."))
@@ -0,0 +1,50 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """
+    A call of a registered task (see `jobs.registry`) waiting to run, running
+    or given up on. Jobs that succeed are deleted.
+    """
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (QUEUED, "Queued"),
+        (RUNNING, "Running"),
+        (FAILED, "Failed"),
+    ]
+
+    queue = models.CharField(max_length=50, default="default")
+    task = models.CharField(max_length=255, help_text="Dotted name of the task")
+    payload = models.JSONField(default=dict, help_text="Keyword arguments")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    # Not run before this time; pushed back after each failed attempt
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=255, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Claiming the next due job of a queue
+            models.Index(
+                fields=["queue", "run_at", "id"],
+                condition=models.Q(status="queued"),
+                name="job_ready_idx",
+            ),
+            # Counting running jobs per queue and finding stale locks
+            models.Index(
+                fields=["queue", "locked_at"],
+                condition=models.Q(status="running"),
+                name="job_running_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Job {self.pk}: {self.task} ({self.status})"
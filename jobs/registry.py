@@ -0,0 +1,81 @@
+"""
+Task registry.
+
+Declare background work in an app's `tasks.py`:
+
+    @task(queue="notifications")
+    def send_welcome(user_id):
+        ...
+
+and queue a call with `send_welcome.enqueue(user_id=1)`. The job row is
+written in the caller's transaction, so it only becomes visible to workers
+(`manage.py run_jobs`) if that transaction commits. Arguments are passed as
+keyword arguments and must be JSON serialisable.
+
+With `JOBS_EAGER = True` jobs run in-process right after the transaction
+commits instead, which is handy for local development without a worker.
+"""
+
+from django.conf import settings
+from django.db import transaction
+
+from jobs.models import Job
+
+_tasks = {}
+
+
+class Task:
+    def __init__(self, func, queue, max_attempts, atomic):
+        self.func = func
+        self.name = f"{func.__module__}.{func.__qualname__}"
+        self.queue = queue
+        self.max_attempts = max_attempts
+        self.atomic = atomic
+
+    def __call__(self, **kwargs):
+        return self.func(**kwargs)
+
+    def __repr__(self):
+        return f"<Task {self.name}>"
+
+    def enqueue(self, run_at=None, **kwargs):
+        """Queue a call of this task. Returns the `Job`, or None when eager."""
+        if getattr(settings, "JOBS_EAGER", False):
+            transaction.on_commit(lambda: self.run(kwargs))
+            return None
+
+        job = Job(
+            queue=self.queue,
+            task=self.name,
+            payload=kwargs,
+            max_attempts=self.max_attempts,
+        )
+        if run_at is not None:
+            job.run_at = run_at
+        job.save()
+        return job
+
+    def run(self, payload):
+        if self.atomic:
+            with transaction.atomic():
+                return self.func(**payload)
+        return self.func(**payload)
+
+
+def task(queue="default", max_attempts=5, atomic=True):
+    """
+    Register the decorated function as a background task. With `atomic`
+    (the default) each attempt runs in a transaction, so a failed attempt
+    leaves nothing half done before it is retried.
+    """
+
+    def register(func):
+        registered = Task(func, queue, max_attempts, atomic)
+        _tasks[registered.name] = registered
+        return registered
+
+    return register
+
+
+def get_task(name):
+    return _tasks.get(name)
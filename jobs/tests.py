@@ -0,0 +1,81 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from jobs import worker
+from jobs.models import Job
+from jobs.registry import task
+
+calls = []
+
+
+@task(queue="default", max_attempts=2)
+def record(value):
+    calls.append(value)
+    if value == "fail":
+        raise RuntimeError("failed on purpose")
+
+
+class WorkerTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_claim_takes_each_due_job_once(self):
+        first = record.enqueue(value="first")
+        later = record.enqueue(
+            value="later", run_at=timezone.now() + timedelta(hours=1)
+        )
+
+        job = worker.claim("default", "worker-1")
+        self.assertEqual(job.pk, first.pk)
+        self.assertEqual(
+            (job.status, job.locked_by, job.attempts), (Job.RUNNING, "worker-1", 1)
+        )
+        # Running and future jobs cannot be claimed
+        self.assertIsNone(worker.claim("default", "worker-2"))
+        self.assertEqual(Job.objects.get(pk=later.pk).status, Job.QUEUED)
+
+    def test_execute_deletes_a_finished_job(self):
+        record.enqueue(value="ok")
+        self.assertTrue(worker.execute(worker.claim("default", "worker-1")))
+        self.assertEqual(calls, ["ok"])
+        self.assertFalse(Job.objects.exists())
+
+    def test_execute_backs_off_then_gives_up(self):
+        record.enqueue(value="fail")
+        before = timezone.now()
+        self.assertFalse(worker.execute(worker.claim("default", "worker-1")))
+
+        job = Job.objects.get()
+        self.assertEqual((job.status, job.attempts, job.locked_by), (Job.QUEUED, 1, ""))
+        self.assertGreaterEqual(
+            job.run_at, before + timedelta(seconds=worker.JOB_RETRY_BACKOFF)
+        )
+        self.assertIn("failed on purpose", job.last_error)
+        self.assertIsNone(worker.claim("default", "worker-1"))
+
+        Job.objects.update(run_at=timezone.now())
+        self.assertFalse(worker.execute(worker.claim("default", "worker-1")))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.FAILED, 2))
+        self.assertIsNone(worker.claim("default", "worker-1"))
+
+    def test_backoff_doubles_up_to_the_cap(self):
+        self.assertLess(worker.backoff(1), worker.backoff(3))
+        self.assertLessEqual(worker.backoff(50), worker.JOB_RETRY_BACKOFF_MAX * 1.1)
+
+    def test_requeue_stale(self):
+        record.enqueue(value="stale")
+        record.enqueue(value="fresh")
+        stale = worker.claim("default", "dead-worker")
+        fresh = worker.claim("default", "live-worker")
+        Job.objects.filter(pk=stale.pk).update(
+            locked_at=timezone.now() - timedelta(seconds=worker.JOB_LOCK_TIMEOUT + 1)
+        )
+
+        self.assertEqual(worker.requeue_stale(), 1)
+        stale.refresh_from_db()
+        self.assertEqual((stale.status, stale.locked_by), (Job.QUEUED, ""))
+        self.assertEqual(Job.objects.get(pk=fresh.pk).status, Job.RUNNING)
+        self.assertEqual(worker.claim("default", "worker-1").pk, stale.pk)
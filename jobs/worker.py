@@ -0,0 +1,173 @@
+"""
+Job worker.
+
+`Worker.run()` repeatedly claims the next due job of each of its queues and
+runs it. Claiming is safe with any number of worker processes:
+
+- on PostgreSQL the next job is selected with `SELECT ... FOR UPDATE SKIP
+  LOCKED`, so workers never wait on each other's rows;
+- elsewhere (SQLite) a candidate is claimed with a compare-and-swap UPDATE
+  (`status = 'queued'` in the WHERE clause) and the next one is tried if
+  another worker won it.
+
+`JOB_QUEUES` maps each queue to the number of its jobs that may run at once
+across all workers; a worker skips a queue while that many are running.
+The limit is checked before claiming, so simultaneous claims may overshoot
+it briefly.
+
+A failed attempt is retried after an exponential backoff (`JOB_RETRY_BACKOFF`
+seconds, doubled per attempt, capped at `JOB_RETRY_BACKOFF_MAX`) until the
+task's `max_attempts` is reached, then the job is kept as failed. Jobs
+running for longer than `JOB_LOCK_TIMEOUT` seconds are assumed to belong to
+a dead worker and are queued again.
+"""
+
+import logging
+import os
+import random
+import socket
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from jobs.models import Job
+from jobs.registry import get_task
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUES = getattr(settings, "JOB_QUEUES", {"default": 1})
+JOB_RETRY_BACKOFF = getattr(settings, "JOB_RETRY_BACKOFF", 10)
+JOB_RETRY_BACKOFF_MAX = getattr(settings, "JOB_RETRY_BACKOFF_MAX", 3600)
+JOB_LOCK_TIMEOUT = getattr(settings, "JOB_LOCK_TIMEOUT", 600)
+
+# Candidates tried per claim when falling back to compare-and-swap
+CLAIM_CANDIDATES = 5
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def backoff(attempts):
+    """Seconds to wait before retrying after `attempts` failed attempts."""
+    delay = min(JOB_RETRY_BACKOFF * 2 ** (attempts - 1), JOB_RETRY_BACKOFF_MAX)
+    # Jitter so jobs that failed together do not all retry together
+    return delay * random.uniform(1, 1.1)
+
+
+def claim(queue, worker_id):
+    """Mark the next due job of `queue` as running and return it, or None."""
+    now = timezone.now()
+    due = Job.objects.filter(queue=queue, status=Job.QUEUED, run_at__lte=now).order_by(
+        "run_at", "id"
+    )
+    running = {
+        "status": Job.RUNNING,
+        "locked_by": worker_id,
+        "locked_at": now,
+        "attempts": F("attempts") + 1,
+    }
+
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            job = due.select_for_update(skip_locked=True).first()
+            if job is None:
+                return None
+            Job.objects.filter(pk=job.pk).update(**running)
+    else:
+        for pk in due.values_list("pk", flat=True)[:CLAIM_CANDIDATES]:
+            if Job.objects.filter(pk=pk, status=Job.QUEUED).update(**running):
+                break
+        else:
+            return None
+        job = Job(pk=pk)
+
+    job.refresh_from_db()
+    return job
+
+
+def requeue_stale():
+    """Queue again the jobs whose worker stopped reporting back."""
+    cutoff = timezone.now() - timedelta(seconds=JOB_LOCK_TIMEOUT)
+    return Job.objects.filter(status=Job.RUNNING, locked_at__lt=cutoff).update(
+        status=Job.QUEUED, locked_by="", locked_at=None
+    )
+
+
+def execute(job):
+    """Run a claimed job, then delete it or schedule its retry."""
+    task = get_task(job.task)
+    try:
+        if task is None:
+            raise LookupError(f"Unknown task {job.task!r}")
+        task.run(job.payload)
+    except Exception:
+        logger.exception("Job %s (%s) failed", job.pk, job.task)
+        error = traceback.format_exc()
+        if job.attempts < job.max_attempts:
+            Job.objects.filter(pk=job.pk).update(
+                status=Job.QUEUED,
+                run_at=timezone.now() + timedelta(seconds=backoff(job.attempts)),
+                locked_by="",
+                locked_at=None,
+                last_error=error,
+            )
+        else:
+            Job.objects.filter(pk=job.pk).update(
+                status=Job.FAILED, locked_at=None, last_error=error
+            )
+        return False
+
+    Job.objects.filter(pk=job.pk).delete()
+    return True
+
+
+class Worker:
+    def __init__(self, queues=None, worker_id=None, poll_interval=1.0):
+        self.limits = {
+            queue: JOB_QUEUES.get(queue, 1) for queue in (queues or JOB_QUEUES)
+        }
+        self.worker_id = worker_id or default_worker_id()
+        self.poll_interval = poll_interval
+        self.stopping = False
+
+    def stop(self, *args):
+        """Finish the current job, then return from `run()`."""
+        self.stopping = True
+
+    def run_once(self):
+        """Run at most one job per queue. Returns the number of jobs run."""
+        ran = 0
+        for queue, limit in self.limits.items():
+            if self.stopping:
+                break
+            running = Job.objects.filter(queue=queue, status=Job.RUNNING).count()
+            if running >= limit:
+                continue
+            job = claim(queue, self.worker_id)
+            if job is not None:
+                execute(job)
+                ran += 1
+        return ran
+
+    def run(self, burst=False):
+        """
+        Process jobs until stopped. With `burst`, return as soon as no job is
+        due instead of polling. Returns the number of jobs run.
+        """
+        total = 0
+        while not self.stopping:
+            close_old_connections()
+            requeue_stale()
+            ran = self.run_once()
+            total += ran
+            if not ran:
+                if burst:
+                    break
+                time.sleep(self.poll_interval)
+        return total
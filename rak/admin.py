@@ -1,10 +1,25 @@
 # rak/admin.py
 
 from django.contrib import admin
+from rak import notifications
 from .models import RandomActOfKindness, Claimant, Notification, PayItForward
 
+
+class NotificationAdmin(admin.ModelAdmin):
+    # Delete through rak.notifications so unread counters follow
+    def delete_model(self, request, obj):
+        notifications.delete(obj.recipient, [obj.pk])
+
+    def delete_queryset(self, request, queryset):
+        ids_by_recipient = {}
+        for pk, recipient_id in queryset.values_list("pk", "recipient_id"):
+            ids_by_recipient.setdefault(recipient_id, []).append(pk)
+        for recipient_id, ids in ids_by_recipient.items():
+            notifications.delete(recipient_id, ids)
+
+
 admin.site.register(RandomActOfKindness)
 admin.site.register(Claimant)
 # admin.site.register(RAKClaim)
-admin.site.register(Notification)
+admin.site.register(Notification, NotificationAdmin)
 admin.site.register(PayItForward)
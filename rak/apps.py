@@ -9,3 +9,4 @@ class RakConfig(AppConfig):
 
     def ready(self):
         import rak.signals  # Import signals to ensure they are registered
+        import rak.handlers  # Register the domain event handlers
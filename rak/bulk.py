@@ -0,0 +1,179 @@
+"""
+Bulk claims and status changes (`RAKBulkActionView`).
+
+`apply(user, items)` takes a list of `{"rak_id", "action", ...}` items, where
+`action` is `claim` or a status from `RandomActOfKindness.TRANSITIONS`, and
+processes them the way `RAKClaimView` and `RAKStatusUpdateView` would one by
+one, with a fixed number of queries:
+
+- the RAKs are loaded (and locked) with one query, and the claims the user
+  already holds on them with another, so every permission check runs in
+  memory;
+- the valid items are applied with one `bulk_create` of claims and one
+  `UPDATE` per target status, all in a single transaction, and raise the
+  same domain events as the single-item paths.
+
+The result reports each item in request order with the HTTP status its
+single-item endpoint would have answered and a `detail` message.
+"""
+
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from rak import events, versions
+from rak.models import Claimant, RandomActOfKindness
+
+CLAIM = "claim"
+ACTIONS = (CLAIM, *RandomActOfKindness.TRANSITIONS)
+
+SUCCESS = {
+    CLAIM: "RAK claimed.",
+    "open": "RAK status updated.",
+    "in progress": "RAK status updated.",
+    "completed": "RAK status updated.",
+}
+
+
+class Rejected(Exception):
+    def __init__(self, status, detail):
+        self.status = status
+        self.detail = detail
+
+
+def _check_claim(user, rak, claimed):
+    if rak.created_by_id == user.pk:
+        raise Rejected(400, "You cannot claim your own RAK.")
+    if rak.pk in claimed:
+        raise Rejected(400, "You have already claimed this RAK.")
+    if not (
+        rak.status == "open" or (rak.status == "in progress" and rak.allow_claimants)
+    ):
+        raise Rejected(
+            400,
+            "This RAK cannot be claimed because it has already been claimed or completed.",
+        )
+
+
+def _check_status(user, rak, new_status, claimed):
+    # Same rules as RAKStatusUpdateView
+    if rak.rak_type == "request" and rak.created_by_id != user.pk:
+        raise Rejected(
+            403,
+            "You are not authorised to update this RAK. Only the creator can mark it as completed.",
+        )
+    if rak.rak_type == "offer" and rak.pk not in claimed:
+        raise Rejected(
+            403,
+            "You are not authorised to update this RAK. Only the person who claimed it can mark it as completed.",
+        )
+    if rak.status not in RandomActOfKindness.TRANSITIONS[new_status]:
+        raise Rejected(409, "This RAK has already been completed.")
+
+
+def apply(user, items):
+    """Apply the valid `items` for `user` in one transaction; see module docstring."""
+    ids = [item["rak_id"] for item in items]
+    results = []
+    claims = []
+    transitions = defaultdict(list)
+
+    with transaction.atomic():
+        # Lock the rows so the checks below still hold when the updates run
+        raks = RandomActOfKindness.objects.select_for_update().in_bulk(ids)
+        claimed = set(
+            Claimant.objects.filter(rak_id__in=ids, claimer=user).values_list(
+                "rak_id", flat=True
+            )
+        )
+
+        for item in items:
+            rak = raks.get(item["rak_id"])
+            action = item["action"]
+            try:
+                if rak is None:
+                    raise Rejected(404, "Not found.")
+                if action == CLAIM:
+                    _check_claim(user, rak, claimed)
+                    claims.append((rak, item))
+                else:
+                    _check_status(user, rak, action, claimed)
+                    transitions[action].append(rak)
+            except Rejected as rejected:
+                results.append(
+                    {
+                        "rak_id": item["rak_id"],
+                        "action": action,
+                        "status": rejected.status,
+                        "detail": rejected.detail,
+                    }
+                )
+            else:
+                results.append(
+                    {
+                        "rak_id": item["rak_id"],
+                        "action": action,
+                        "status": 200,
+                        "detail": SUCCESS[action],
+                    }
+                )
+
+        if claims:
+            _claim(user, claims)
+        for new_status, targets in transitions.items():
+            _transition(new_status, targets)
+        if claims or transitions:
+            # Queryset updates skip post_save, so invalidate cached responses
+            # of the lists the RAKs left or entered
+            statuses = {rak.status for rak, _ in claims}
+            if claims:
+                statuses.add("in progress")
+            for new_status, targets in transitions.items():
+                statuses.add(new_status)
+                statuses.update(rak.status for rak in targets)
+            versions.bump_raks(statuses)
+
+    return results
+
+
+def _claim(user, claims):
+    Claimant.objects.bulk_create(
+        [
+            Claimant(
+                claimer=user,
+                rak=rak,
+                comment=item.get("comment", ""),
+                anonymous_claimant=item.get("anonymous", False),
+            )
+            for rak, item in claims
+        ]
+    )
+    RandomActOfKindness.objects.filter(pk__in=[rak.pk for rak, _ in claims]).update(
+        status="in progress", claim_count=F("claim_count") + 1
+    )
+    for rak, item in claims:
+        events.publish(
+            events.RAKClaimed(
+                rak_id=rak.pk,
+                claimer_id=user.pk,
+                anonymous=item.get("anonymous", False),
+            )
+        )
+        if rak.status != "in progress":
+            events.publish(events.RAKStatusChanged(rak_id=rak.pk, status="in progress"))
+
+
+def _transition(new_status, raks):
+    changes = {"status": new_status}
+    if new_status == "completed":
+        changes["completed_at"] = timezone.now()
+    RandomActOfKindness.objects.filter(pk__in=[rak.pk for rak in raks]).update(
+        **changes
+    )
+    for rak in raks:
+        if rak.status != new_status:
+            events.publish(events.RAKStatusChanged(rak_id=rak.pk, status=new_status))
+        if new_status == "completed":
+            events.publish(events.RAKCompleted(rak_id=rak.pk))
@@ -0,0 +1,142 @@
+"""
+Domain events.
+
+Model methods and signal receivers announce what happened with
+`publish(RAKCompleted(rak_id=...))` instead of doing the follow-up work
+(points, notifications, timelines) inline. Handlers registered with
+`@handles(EventType)` run only once the surrounding transaction has
+committed (`transaction.on_commit`), so rolled back work never notifies
+anyone, and they receive every event of their type in the batch at once so
+they can use bulk queries.
+
+`EventBatchMiddleware` (`rak.middleware`) makes each request one batch: the
+events committed while handling it are dispatched together when the view
+returns. Outside a batch (shell, management commands) events are dispatched
+as soon as they are committed. Handlers live in `rak/handlers.py`.
+"""
+
+import logging
+from collections import defaultdict
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from asgiref.sync import sync_to_async
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RAKPublished:
+    rak_id: int
+
+
+@dataclass(frozen=True)
+class RAKVisibilityChanged:
+    rak_id: int
+    private: bool
+
+
+@dataclass(frozen=True)
+class RAKClaimed:
+    rak_id: int
+    claimer_id: int
+    anonymous: bool = False
+
+
+@dataclass(frozen=True)
+class RAKCollaborated:
+    rak_id: int
+    collaborator_id: int
+    anonymous: bool = False
+
+
+@dataclass(frozen=True)
+class RAKStatusChanged:
+    rak_id: int
+    status: str
+
+
+@dataclass(frozen=True)
+class RAKCompleted:
+    rak_id: int
+
+
+@dataclass(frozen=True)
+class PayItForwardCreated:
+    original_rak_id: int
+    new_rak_id: int
+
+
+_handlers = defaultdict(list)
+
+# Stack of open batches; each batch is a list of committed events
+_batches = ContextVar("rak_event_batches", default=())
+
+
+def handles(*event_types):
+    """Register the decorated function as a handler for `event_types`."""
+
+    def register(handler):
+        for event_type in event_types:
+            _handlers[event_type].append(handler)
+        return handler
+
+    return register
+
+
+def publish(event):
+    """Queue `event` for its handlers once the current transaction commits."""
+    transaction.on_commit(lambda: _committed(event))
+
+
+def _committed(event):
+    batches = _batches.get()
+    if batches:
+        batches[-1].append(event)
+    else:
+        dispatch([event])
+
+
+@contextmanager
+def batch():
+    """Collect the events committed inside the block and dispatch them on exit."""
+    events = []
+    token = _batches.set(_batches.get() + (events,))
+    try:
+        yield events
+    finally:
+        _batches.reset(token)
+        dispatch(events)
+
+
+@asynccontextmanager
+async def abatch():
+    """`batch()` for async code; handlers run in a worker thread."""
+    events = []
+    token = _batches.set(_batches.get() + (events,))
+    try:
+        yield events
+    finally:
+        _batches.reset(token)
+        if events:
+            await sync_to_async(dispatch)(events)
+
+
+def dispatch(events):
+    """Run the handlers of each event type once with all events of that type."""
+    grouped = defaultdict(list)
+    for event in events:
+        grouped[type(event)].append(event)
+
+    for event_type, group in grouped.items():
+        for handler in _handlers[event_type]:
+            # The work that raised the events is committed; one failing
+            # handler must not stop the others or fail the request.
+            try:
+                handler(group)
+            except Exception:
+                logger.exception(
+                    "Handler %s failed for %s", handler.__name__, event_type.__name__
+                )
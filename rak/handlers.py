@@ -0,0 +1,66 @@
+"""
+Domain event handlers (see `rak.events`).
+
+Each handler receives every event of its type from one batch, after the
+transaction that raised them has committed, and queues one background job
+for the whole batch (see `rak/tasks.py`). The request only pays for that
+INSERT; the work itself runs in a `run_jobs` worker. Status changes are the
+exception: they are recorded right away for the live event stream
+(`rak.streams`), also with a single INSERT.
+"""
+
+from rak import events, tasks
+from rak.models import StatusChange
+
+
+def _rak_ids(batch):
+    return sorted({event.rak_id for event in batch})
+
+
+@events.handles(events.RAKPublished)
+def fan_out_published(batch):
+    tasks.fan_out.enqueue(rak_ids=_rak_ids(batch))
+
+
+@events.handles(events.RAKVisibilityChanged)
+def update_timelines(batch):
+    tasks.sync_visibility.enqueue(rak_ids=_rak_ids(batch))
+
+
+@events.handles(events.RAKStatusChanged)
+def record_status_changes(batch):
+    StatusChange.objects.bulk_create(
+        [StatusChange(rak_id=event.rak_id, status=event.status) for event in batch]
+    )
+
+
+@events.handles(events.RAKCompleted)
+def pay_out_completed(batch):
+    tasks.pay_out_completed.enqueue(rak_ids=_rak_ids(batch))
+
+
+@events.handles(events.RAKClaimed)
+def notify_claimed(batch):
+    tasks.notify_authors.enqueue(
+        participations=[
+            [event.rak_id, event.claimer_id, event.anonymous] for event in batch
+        ],
+        message="Your Random Act of Kindness has been claimed by {name}.",
+    )
+
+
+@events.handles(events.RAKCollaborated)
+def notify_collaborated(batch):
+    tasks.notify_authors.enqueue(
+        participations=[
+            [event.rak_id, event.collaborator_id, event.anonymous] for event in batch
+        ],
+        message="{name} is collaborating on your Random Act of Kindness.",
+    )
+
+
+@events.handles(events.PayItForwardCreated)
+def notify_paid_forward(batch):
+    tasks.notify_paid_forward.enqueue(
+        rak_ids=sorted({event.original_rak_id for event in batch})
+    )
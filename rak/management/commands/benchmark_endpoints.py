@@ -0,0 +1,94 @@
+import statistics
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+
+# Read endpoints served by async views (core.async_views)
+DEFAULT_PATHS = [
+    "/rak/all/",
+    "/rak/rak/unclaimed/",
+    "/rak/leaderboard/",
+    "/users/leaderboard/",
+    "/users/profile/",
+    "/rak/notifications/",
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test read endpoints of a running server and report throughput "
+        "and latency percentiles. Run it against the WSGI deployment "
+        "(gunicorn --pythonpath core core.wsgi) and the ASGI one from the "
+        "Procfile (gunicorn --pythonpath core core.asgi:application -k "
+        "uvicorn.workers.UvicornWorker) with the same --workers to compare them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("base_url", help="e.g. http://127.0.0.1:8000")
+        parser.add_argument(
+            "--path",
+            action="append",
+            dest="paths",
+            help="Path to request (repeatable). Defaults to the main read endpoints.",
+        )
+        parser.add_argument(
+            "--requests", type=int, default=500, help="Requests per path."
+        )
+        parser.add_argument(
+            "--concurrency", type=int, default=50, help="Requests in flight at once."
+        )
+        parser.add_argument(
+            "--token", help="API token, sent as `Authorization: Token <token>`."
+        )
+
+    def handle(self, *args, **options):
+        if options["requests"] < 2 or options["concurrency"] < 1:
+            raise CommandError("Use --requests >= 2 and --concurrency >= 1.")
+
+        base_url = options["base_url"].rstrip("/")
+        headers = {}
+        if options["token"]:
+            headers["Authorization"] = f"Token {options['token']}"
+
+        self.stdout.write(
+            f"{'path':<32} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} "
+            f"{'p99 ms':>8} {'errors':>7}"
+        )
+        for path in options["paths"] or DEFAULT_PATHS:
+            stats = self.run(
+                base_url + path, headers, options["requests"], options["concurrency"]
+            )
+            self.stdout.write(
+                f"{path:<32} {stats['throughput']:>8.1f} {stats['p50']:>8.1f} "
+                f"{stats['p95']:>8.1f} {stats['p99']:>8.1f} {stats['errors']:>7}"
+            )
+
+    def run(self, url, headers, count, concurrency):
+        def fetch(_):
+            request = urllib.request.Request(url, headers=headers)
+            started = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request, timeout=30) as response:
+                    response.read()
+                    ok = response.status < 400
+            except (urllib.error.URLError, TimeoutError):
+                ok = False
+            return time.perf_counter() - started, ok
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(fetch, range(count)))
+        elapsed = time.perf_counter() - started
+
+        latencies = sorted(latency * 1000 for latency, _ in results)
+        percentiles = statistics.quantiles(latencies, n=100)
+        return {
+            "throughput": count / elapsed,
+            "p50": percentiles[49],
+            "p95": percentiles[94],
+            "p99": percentiles[98],
+            "errors": sum(1 for _, ok in results if not ok),
+        }
@@ -0,0 +1,126 @@
+import re
+from types import SimpleNamespace
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from rak import views
+from rak.models import RandomActOfKindness, TimelineEntry
+from rak.pagination import (
+    NotificationPagination,
+    RAKCursorPagination,
+    TimelinePagination,
+)
+
+User = get_user_model()
+
+# List views whose `get_queryset()` feeds RAKCursorPagination
+LIST_VIEWS = [
+    views.AllRAKListView,
+    views.UnclaimedRAKListView,
+    views.ClaimedRAKListView,
+    views.ExploreRAKView,
+    views.MyClaimedRAKListView,
+    views.MyCompletedRequestRAKListView,
+    views.MyPostedRAKListView,
+]
+
+SQLITE_FULL_SCAN = re.compile(r"\bSCAN (?!CONSTANT ROW)(\S+)(?! USING)\s*$")
+POSTGRES_FULL_SCAN = re.compile(r"Seq Scan on (\S+)")
+
+
+class Command(BaseCommand):
+    help = (
+        "EXPLAIN the page queries of the RAK list and inbox endpoints (first "
+        "page and a cursor page) and fail if any plan falls back to a full table scan."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--database", default="default", help="Database alias to explain on."
+        )
+        parser.add_argument(
+            "--verbose-plans", action="store_true", help="Print every plan."
+        )
+
+    def handle(self, *args, **options):
+        alias = options["database"]
+        vendor = connections[alias].vendor
+        if vendor not in ("sqlite", "postgresql"):
+            raise CommandError(f"Query plan checks do not support '{vendor}'.")
+
+        failures = []
+        for label, queryset in self.page_queries(alias):
+            plan = self.explain(queryset, alias, vendor)
+            scans = self.full_scans(plan, vendor)
+            if options["verbose_plans"] or scans:
+                self.stdout.write(f"--- {label}\n{plan}\n")
+            if scans:
+                failures.append(f"{label}: full scan of {', '.join(scans)}")
+            else:
+                self.stdout.write(f"ok   {label}")
+
+        if failures:
+            raise CommandError(
+                "Query plans fell back to full scans:\n" + "\n".join(failures)
+            )
+        self.stdout.write(self.style.SUCCESS("All list query plans use indexes."))
+
+    def page_queries(self, alias):
+        user = User(pk=1, username="explain")
+        view_request = SimpleNamespace(user=user)
+
+        for view_class in LIST_VIEWS:
+            view = view_class()
+            view.request = view_request
+            base = view.get_queryset().using(alias)
+            yield from self.pages(view_class.__name__, base, RAKCursorPagination())
+
+        entries = TimelineEntry.objects.using(alias).filter(user=user)
+        yield from self.pages("UserFeedView (timeline)", entries, TimelinePagination())
+
+        hybrid = RandomActOfKindness.objects.using(alias).filter(
+            Q(pk__in=TimelineEntry.objects.filter(user=user).values("rak_id"))
+            | Q(created_by__in=[2, 3]),
+            private=False,
+        )
+        yield from self.pages("UserFeedView (hybrid)", hybrid, RAKCursorPagination())
+
+        for unread in ("false", "true"):
+            view = views.NotificationInboxView()
+            view.request = SimpleNamespace(user=user, query_params={"unread": unread})
+            yield from self.pages(
+                f"NotificationInboxView (unread={unread})",
+                view.get_queryset().using(alias),
+                NotificationPagination(),
+            )
+
+    def pages(self, label, queryset, paginator):
+        ordered = queryset.order_by(*paginator.ordering)
+        first = ordered[: paginator.page_size + 1]
+        position = [timezone.now()] + [1] * (len(paginator.ordering) - 1)
+        seek = ordered.filter(paginator.build_seek_filter(position))
+        yield f"{label} [first page]", first
+        yield f"{label} [cursor page]", seek[: paginator.page_size + 1]
+
+    def explain(self, queryset, alias, vendor):
+        if vendor == "postgresql":
+            # Make the planner prefer any index path so tiny tables still
+            # reveal whether a usable index exists.
+            with transaction.atomic(using=alias):
+                with connections[alias].cursor() as cursor:
+                    cursor.execute("SET LOCAL enable_seqscan = off")
+                return queryset.explain()
+        return queryset.explain()
+
+    def full_scans(self, plan, vendor):
+        pattern = POSTGRES_FULL_SCAN if vendor == "postgresql" else SQLITE_FULL_SCAN
+        tables = []
+        for line in plan.splitlines():
+            match = pattern.search(line.strip())
+            if match:
+                tables.append(match.group(1))
+        return tables
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from rak import notifications, streams
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete read notifications older than the retention period "
+        "(NOTIFICATION_RETENTION_DAYS), in batches, and status changes the "
+        "live event stream no longer needs. Run periodically."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=notifications.NOTIFICATION_RETENTION_DAYS,
+            help="Keep read notifications younger than this many days.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=notifications.PRUNE_BATCH_SIZE,
+            help="Rows deleted per statement.",
+        )
+
+    def handle(self, *args, **options):
+        deleted = notifications.prune(
+            days=options["days"], batch_size=options["batch_size"]
+        )
+        changes = streams.prune_status_changes()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Deleted {deleted} notifications and {changes} status changes."
+            )
+        )
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from rak import timeline
+from rak.models import TimelineEntry
+from users.models import Follow
+
+
+class Command(BaseCommand):
+    help = "Rebuild every home timeline from the current follow graph."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--clear",
+            action="store_true",
+            help="Delete all timeline entries before rebuilding.",
+        )
+
+    def handle(self, *args, **options):
+        if options["clear"]:
+            TimelineEntry.objects.all().delete()
+
+        follows = Follow.objects.values_list("follower_id", "followed_id")
+        total = 0
+        for follower_id, followed_id in follows.iterator(chunk_size=1000):
+            timeline.backfill(follower_id, followed_id)
+            total += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt timelines for {total} follows."))
@@ -0,0 +1,60 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from rak import versions
+from rak.models import Claimant, Collaborators, PayItForward, RandomActOfKindness
+
+
+def _count(model, fk):
+    return Coalesce(
+        Subquery(
+            model.objects.filter(**{fk: OuterRef("pk")})
+            .order_by()
+            .values(fk)
+            .annotate(total=Count("pk"))
+            .values("total"),
+            output_field=IntegerField(),
+        ),
+        Value(0),
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute claim_count, collaborator_count and pay_it_forward_count "
+        "on every RAK from the related tables."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Number of RAK ids updated per UPDATE statement.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        last_id = 0
+        updated = 0
+        while True:
+            ids = list(
+                RandomActOfKindness.objects.filter(pk__gt=last_id)
+                .order_by("pk")
+                .values_list("pk", flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            updated += RandomActOfKindness.objects.filter(
+                pk__gte=ids[0], pk__lte=ids[-1]
+            ).update(
+                claim_count=_count(Claimant, "rak"),
+                collaborator_count=_count(Collaborators, "rak"),
+                pay_it_forward_count=_count(PayItForward, "original_rak"),
+            )
+            last_id = ids[-1]
+
+        # Queryset updates skip the signals, so invalidate cached lists here
+        versions.bump_raks()
+        self.stdout.write(self.style.SUCCESS(f"Repaired counters on {updated} RAKs."))
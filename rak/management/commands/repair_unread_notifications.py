@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from rak import notifications
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute every user's unread notification count from the "
+        "notifications table, e.g. after notifications were deleted in the "
+        "admin."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=notifications.RECOUNT_BATCH_SIZE,
+            help="Number of profiles updated per UPDATE statement.",
+        )
+
+    def handle(self, *args, **options):
+        updated = notifications.recount(batch_size=options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Recounted unread notifications of {updated} users.")
+        )
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from rak import timeline
+
+
+class Command(BaseCommand):
+    help = (
+        "Trim home timelines that have grown past TIMELINE_MAX_LENGTH entries, "
+        "e.g. after lowering it. Fan-out trims the timelines it adds to; "
+        "reading a feed never trims it."
+    )
+
+    def handle(self, *args, **options):
+        deleted = timeline.trim_oversized()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} timeline entries."))
@@ -0,0 +1,29 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from rak import events
+
+
+class EventBatchMiddleware:
+    """
+    Dispatch the domain events committed while handling a request as one
+    batch, after the view has returned (see `rak.events`). Works for both
+    WSGI and ASGI, so async views are not pushed into a thread by it.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with events.batch():
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        async with events.abatch():
+            return await self.get_response(request)
@@ -0,0 +1,29 @@
+# Generated by Django 5.1 on 2026-10-18 16:08
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rak', '0021_randomactofkindness_allow_claimants_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TimelineEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(help_text="Copy of the RAK's created_at")),
+                ('rak', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='timeline_entries', to='rak.randomactofkindness')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='timeline_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', '-created_at', '-rak'], name='timeline_user_recent_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'rak'), name='unique_timeline_entry')],
+            },
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.1 on 2026-10-18 16:10
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def populate_counters(apps, schema_editor):
+    RandomActOfKindness = apps.get_model("rak", "RandomActOfKindness")
+
+    def count(model_name, fk):
+        model = apps.get_model("rak", model_name)
+        return Coalesce(
+            Subquery(
+                model.objects.filter(**{fk: OuterRef("pk")})
+                .order_by()
+                .values(fk)
+                .annotate(total=Count("pk"))
+                .values("total"),
+                output_field=IntegerField(),
+            ),
+            Value(0),
+        )
+
+    RandomActOfKindness.objects.update(
+        claim_count=count("Claimant", "rak"),
+        collaborator_count=count("Collaborators", "rak"),
+        pay_it_forward_count=count("PayItForward", "original_rak"),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rak', '0022_timelineentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='randomactofkindness',
+            name='claim_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='randomactofkindness',
+            name='collaborator_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='randomactofkindness',
+            name='pay_it_forward_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.1 on 2026-10-18 16:12
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rak', '0023_randomactofkindness_counters'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='claimant',
+            index=models.Index(fields=['claimer', 'rak'], name='claimant_claimer_rak_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='randomactofkindness',
+            index=models.Index(fields=['-created_at', '-id'], name='rak_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='randomactofkindness',
+            index=models.Index(condition=models.Q(('private', False)), fields=['-created_at', '-id'], name='rak_public_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='randomactofkindness',
+            index=models.Index(condition=models.Q(('private', False), ('status', 'open')), fields=['-created_at', '-id'], name='rak_open_public_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='randomactofkindness',
+            index=models.Index(condition=models.Q(('private', False), ('status', 'in progress')), fields=['-created_at', '-id'], name='rak_claimed_public_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='randomactofkindness',
+            index=models.Index(fields=['created_by', '-created_at', '-id'], name='rak_author_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='randomactofkindness',
+            index=models.Index(fields=['created_by', 'rak_type', 'status', '-created_at', '-id'], name='rak_author_type_status_idx'),
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.1 on 2026-10-18 16:26
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, Min, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def remove_duplicates(apps, schema_editor):
+    """Keep the first claim / collaboration per user and RAK, then recount."""
+    RandomActOfKindness = apps.get_model("rak", "RandomActOfKindness")
+    Claimant = apps.get_model("rak", "Claimant")
+    Collaborators = apps.get_model("rak", "Collaborators")
+
+    for model, user_field in ((Claimant, "claimer"), (Collaborators, "collaborator")):
+        duplicates = (
+            model.objects.values("rak", user_field)
+            .annotate(first_id=Min("id"), total=Count("id"))
+            .filter(total__gt=1)
+        )
+        for row in duplicates:
+            model.objects.filter(
+                rak=row["rak"], **{user_field: row[user_field]}
+            ).exclude(id=row["first_id"]).delete()
+
+    def count(model):
+        return Coalesce(
+            Subquery(
+                model.objects.filter(rak=OuterRef("pk"))
+                .order_by()
+                .values("rak")
+                .annotate(total=Count("pk"))
+                .values("total"),
+                output_field=IntegerField(),
+            ),
+            Value(0),
+        )
+
+    RandomActOfKindness.objects.update(
+        claim_count=count(Claimant), collaborator_count=count(Collaborators)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rak', '0025_resourceversion'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicates, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='claimant',
+            name='claimant_claimer_rak_idx',
+        ),
+        migrations.AddConstraint(
+            model_name='claimant',
+            constraint=models.UniqueConstraint(fields=('claimer', 'rak'), name='unique_claim'),
+        ),
+        migrations.AddConstraint(
+            model_name='collaborators',
+            constraint=models.UniqueConstraint(fields=('rak', 'collaborator'), name='unique_collaboration'),
+        ),
+    ]
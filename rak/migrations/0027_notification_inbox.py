@@ -0,0 +1,52 @@
+# Generated by Django 5.1 on 2026-10-18 16:35
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count_unread(apps, schema_editor):
+    """Seed every profile's unread counter from the existing notifications."""
+    Notification = apps.get_model("rak", "Notification")
+    UserProfile = apps.get_model("users", "UserProfile")
+    UserProfile.objects.update(
+        unread_notifications=Coalesce(
+            Subquery(
+                Notification.objects.filter(
+                    recipient=OuterRef("user"), is_read=False
+                )
+                .order_by()
+                .values("recipient")
+                .annotate(total=Count("pk"))
+                .values("total"),
+                output_field=IntegerField(),
+            ),
+            Value(0),
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rak', '0026_unique_claims_and_collaborations'),
+        ('users', '0010_userprofile_unread_notifications'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['recipient', '-created_at', '-id'], name='notif_inbox_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['recipient', 'is_read', '-created_at', '-id'], name='notif_inbox_read_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(condition=models.Q(('is_read', True)), fields=['created_at'], name='notif_read_created_idx'),
+        ),
+        migrations.RunPython(count_unread, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1 on 2026-10-18 16:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rak', '0027_notification_inbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatusChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('open', 'Open'), ('claimed', 'Claimed'), ('in_progress', 'In Progress'), ('completed', 'Completed')], max_length=15)),
+                ('changed_at', models.DateTimeField(auto_now_add=True)),
+                ('rak', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='status_changes', to='rak.randomactofkindness')),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1 on 2026-10-18 16:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rak', '0028_statuschange'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='randomactofkindness',
+            name='media_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1 on 2026-10-18 17:08
+
+import uploads.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rak', '0029_randomactofkindness_media_variants'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='randomactofkindness',
+            name='media',
+            field=models.FileField(blank=True, null=True, storage=uploads.storage.get_blob_storage, upload_to='rak_media/'),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.1 on 2026-10-18 19:05
+
+from django.conf import settings
+from django.db import migrations
+
+
+def backfill_timelines(apps, schema_editor):
+    """
+    Seed the home timelines of existing follows, which predate fan-out on
+    write: each follower gets the newest TIMELINE_MAX_LENGTH public RAKs of
+    the accounts they follow that are fanned out (see rak.timeline).
+    """
+    Follow = apps.get_model("users", "Follow")
+    RandomActOfKindness = apps.get_model("rak", "RandomActOfKindness")
+    TimelineEntry = apps.get_model("rak", "TimelineEntry")
+    max_length = getattr(settings, "TIMELINE_MAX_LENGTH", 500)
+    max_followers = getattr(settings, "TIMELINE_FANOUT_MAX_FOLLOWERS", 5000)
+
+    follows = (
+        Follow.objects.filter(
+            followed__userprofile__followers_count__lte=max_followers
+        )
+        .order_by("follower_id")
+        .values_list("follower_id", "followed_id")
+    )
+    followed_by = {}
+    for follower_id, followed_id in follows.iterator(chunk_size=1000):
+        followed_by.setdefault(follower_id, []).append(followed_id)
+
+    for follower_id, followed_ids in followed_by.items():
+        recent = RandomActOfKindness.objects.filter(
+            created_by_id__in=followed_ids, private=False
+        ).order_by("-created_at", "-id")[:max_length]
+        TimelineEntry.objects.bulk_create(
+            [
+                TimelineEntry(
+                    user_id=follower_id, rak_id=rak_id, created_at=created_at
+                )
+                for rak_id, created_at in recent.values_list("id", "created_at")
+            ],
+            ignore_conflicts=True,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rak', '0030_alter_randomactofkindness_media'),
+        ('users', '0012_alter_userprofile_profile_image'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_timelines, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,13 @@
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import F
 from django.utils import timezone
 from django.contrib.auth import get_user_model
 
+from rak import events
 from rak.choices import POST_TYPE_CHOICES, STATUS_CHOICES
+from uploads.storage import get_blob_storage
+from users.models import AuraPointsEntry
+from users.points import award, award_many
 
 User = get_user_model()
 
@@ -12,7 +17,12 @@ class RandomActOfKindness(models.Model):
     created_by = models.ForeignKey(User, on_delete=models.CASCADE)
     title = models.TextField(max_length=30)
     description = models.TextField(max_length=255)
-    media = models.FileField(upload_to="rak_media/", blank=True, null=True)
+    # Stored once per distinct content, see uploads.storage
+    media = models.FileField(
+        upload_to="rak_media/", storage=get_blob_storage, blank=True, null=True
+    )
+    # Resized copies of an image `media`, written by uploads.variants
+    media_variants = models.JSONField(default=dict, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     status = models.CharField(max_length=15, choices=STATUS_CHOICES, default="open")
     private = models.BooleanField(
@@ -35,95 +45,291 @@ class RandomActOfKindness(models.Model):
     allow_claimants = models.BooleanField(
         default=False, help_text="Allow multiple claimants"
     )
+    # Denormalised participation counters. They only ever change through
+    # atomic F() updates (see `increment_counter`) and `save()` leaves them out.
+    claim_count = models.PositiveIntegerField(default=0)
+    collaborator_count = models.PositiveIntegerField(default=0)
+    pay_it_forward_count = models.PositiveIntegerField(default=0)
+
+    COUNTER_FIELDS = ("claim_count", "collaborator_count", "pay_it_forward_count")
+    # Only written by the job that renders them (see uploads.variants)
+    DERIVED_FIELDS = ("media_variants",)
+
+    # Statuses a RAK may be moved to, each with the statuses it may come from.
+    # Completed is final.
+    TRANSITIONS = {
+        "open": ("open", "in progress"),
+        "in progress": ("open", "in progress"),
+        "completed": ("open", "in progress"),
+    }
+
+    class Meta:
+        # Indexes follow the list endpoints in rak/views.py, which all page on
+        # (created_at, id) newest first. `check_query_plans` verifies they are
+        # used. Index names are limited to 30 characters.
+        indexes = [
+            # AllRAKListView
+            models.Index(fields=["-created_at", "-id"], name="rak_recent_idx"),
+            # ExploreRAKView and the hybrid feed read public RAKs only
+            models.Index(
+                fields=["-created_at", "-id"],
+                condition=models.Q(private=False),
+                name="rak_public_recent_idx",
+            ),
+            # UnclaimedRAKListView
+            models.Index(
+                fields=["-created_at", "-id"],
+                condition=models.Q(status="open", private=False),
+                name="rak_open_public_recent_idx",
+            ),
+            # ClaimedRAKListView
+            models.Index(
+                fields=["-created_at", "-id"],
+                condition=models.Q(status="in progress", private=False),
+                name="rak_claimed_public_recent_idx",
+            ),
+            # MyPostedRAKListView
+            models.Index(
+                fields=["created_by", "-created_at", "-id"],
+                name="rak_author_recent_idx",
+            ),
+            # MyCompletedRequestRAKListView
+            models.Index(
+                fields=["created_by", "rak_type", "status", "-created_at", "-id"],
+                name="rak_author_type_status_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"RAK: {self.title} by {self.created_by.username}"
 
+    # Fields whose changes raise domain events (see rak/signals.py)
+    TRACKED_FIELDS = ("private", "status")
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_state()
+        return instance
+
+    def remember_state(self):
+        """Record the tracked fields as stored, so signals can tell what changed."""
+        self._loaded_state = {
+            name: self.__dict__[name]
+            for name in self.TRACKED_FIELDS
+            if name in self.__dict__
+        }
+
+    def save(self, *args, **kwargs):
+        # Never write the counters back from a possibly stale in-memory copy
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.COUNTER_FIELDS + self.DERIVED_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
+    def increment_counter(self, field, amount=1):
+        RandomActOfKindness.objects.filter(pk=self.pk).update(
+            **{field: F(field) + amount}
+        )
+        setattr(self, field, getattr(self, field) + amount)
+
     @property
     def is_paid_forward(self):
         """Returns true if this RAK was created with a Pay It Forward"""
-        return self.pay_it_forwards.exists()
+        return self.pay_it_forward_count > 0
 
     def enable_collaborators(self):
         self.allow_claimants = True
         self.save()
 
-    def claim_rak(self, user, comment="", anonymous_claimant=False):
-        if self.status != "open" and not (
-            self.allow_claimants and self.status == "in progress"
-        ):
-            raise ValueError(
-                "This RAK cannot be claimed because it has already been claimed or completed."
-            )
-
-        if self.created_by == user:
-            raise ValueError("You cannot claim your own RAK.")
+    def _touch(self, *statuses):
+        # Queryset updates skip post_save, so invalidate cached responses here:
+        # those of the lists of `statuses`, which the RAK left or entered.
+        # Avoid circular import (rak.versions imports this module)
+        from rak import versions
 
-        # Logic for if the user has already claimed a RAK - don't allow it
-        existing_claim = self.claims.filter(claimer=user).exists()
-        if existing_claim:
-            raise ValueError("You have already claimed this RAK.")
-
-        # Create a Claimant instance
-        claimant = Claimant.objects.create(
-            claimer=user,
-            rak=self,
-            comment=comment,
-            anonymous_claimant=anonymous_claimant,
-        )
+        versions.bump_raks(statuses)
 
-        # Update RAK status
-        if not self.allow_claimants:
-            self.status = "in progress"
-        elif self.status == "open":
-            self.status = "in progress"
-        self.save()
+    def claim_rak(self, user, comment="", anonymous_claimant=False):
+        if self.created_by_id == user.pk:
+            raise ValueError("You cannot claim your own RAK.")
 
+        # Compare-and-swap: only an open RAK, or an in-progress one that
+        # allows several claimants, can be claimed. The unique constraint on
+        # (claimer, rak) rejects a second claim by the same user.
+        with transaction.atomic():
+            claimable = RandomActOfKindness.objects.filter(
+                models.Q(status="open")
+                | models.Q(status="in progress", allow_claimants=True),
+                pk=self.pk,
+            ).update(status="in progress", claim_count=F("claim_count") + 1)
+            if not claimable:
+                raise ValueError(
+                    "This RAK cannot be claimed because it has already been claimed or completed."
+                )
+            try:
+                with transaction.atomic():
+                    claimant = Claimant.objects.create(
+                        claimer=user,
+                        rak=self,
+                        comment=comment,
+                        anonymous_claimant=anonymous_claimant,
+                    )
+            except IntegrityError:
+                raise ValueError("You have already claimed this RAK.")
+            events.publish(
+                events.RAKClaimed(
+                    rak_id=self.pk, claimer_id=user.pk, anonymous=anonymous_claimant
+                )
+            )
+            if self.status != "in progress":
+                events.publish(
+                    events.RAKStatusChanged(rak_id=self.pk, status="in progress")
+                )
+                # The claim's own signal covers the list the RAK entered
+                self._touch(self.status)
+
+        self.status = "in progress"
+        self.claim_count += 1
+        self.remember_state()
         return claimant
 
     def collaborate(self, user, comment="", anonymous_collaborator=False):
-        if not self.allow_collaborators:
-            raise ValueError("Collaborators are not allowed for this RAK.")
-
-        if self.created_by == user:
+        if self.created_by_id == user.pk:
             raise ValueError("You cannot collaborate on your own RAK.")
 
-        # Check if particular user has already collaborated on this RAK
-        if self.collabs.filter(collaborator=user).exists():
-            raise ValueError("You have already collaborated on this RAK.")
-
-        # Create a Collaborators instance
-        collaborator = Collaborators.objects.create(
-            collaborator=user,
-            rak=self,
-            comment=comment,
-            anonymous_collaborator=anonymous_collaborator,
-        )
+        # Compare-and-swap as in claim_rak; (rak, collaborator) is unique.
+        with transaction.atomic():
+            allowed = RandomActOfKindness.objects.filter(
+                pk=self.pk, allow_collaborators=True
+            ).update(
+                status=models.Case(
+                    models.When(status="open", then=models.Value("in progress")),
+                    default=F("status"),
+                ),
+                collaborator_count=F("collaborator_count") + 1,
+            )
+            if not allowed:
+                raise ValueError("Collaborators are not allowed for this RAK.")
+            try:
+                with transaction.atomic():
+                    collaborator = Collaborators.objects.create(
+                        collaborator=user,
+                        rak=self,
+                        comment=comment,
+                        anonymous_collaborator=anonymous_collaborator,
+                    )
+            except IntegrityError:
+                raise ValueError("You have already collaborated on this RAK.")
+            events.publish(
+                events.RAKCollaborated(
+                    rak_id=self.pk,
+                    collaborator_id=user.pk,
+                    anonymous=anonymous_collaborator,
+                )
+            )
+            if self.status == "open":
+                events.publish(
+                    events.RAKStatusChanged(rak_id=self.pk, status="in progress")
+                )
+                self._touch("open")
 
-        # Update RAK status
         if self.status == "open":
             self.status = "in progress"
-            self.save()
-
+        self.collaborator_count += 1
+        self.remember_state()
         return collaborator
 
+    def transition(self, new_status):
+        """
+        Move the RAK to `new_status` with a compare-and-swap update. Returns
+        False if the current status does not allow it (e.g. already completed).
+        """
+        if new_status == "completed":
+            return self.complete_rak()
+
+        updated = RandomActOfKindness.objects.filter(
+            pk=self.pk, status__in=self.TRANSITIONS[new_status]
+        ).update(status=new_status)
+        if updated:
+            if self.status != new_status:
+                events.publish(
+                    events.RAKStatusChanged(rak_id=self.pk, status=new_status)
+                )
+            self.status = new_status
+            self.remember_state()
+            self._touch(new_status, *self.TRANSITIONS[new_status])
+        return bool(updated)
+
     def complete_rak(self):
-        if self.status == "completed":
+        """
+        Mark the RAK completed. Returns False if it was already completed, so
+        concurrent requests complete it only once. Aura points are paid out
+        by the `RAKCompleted` handler after commit.
+        """
+        completed_at = timezone.now()
+        with transaction.atomic():
+            completed = RandomActOfKindness.objects.filter(
+                pk=self.pk, status__in=self.TRANSITIONS["completed"]
+            ).update(status="completed", completed_at=completed_at)
+            if not completed:
+                return False
+
+            self.status = "completed"
+            self.completed_at = completed_at
+            self.remember_state()
+            events.publish(events.RAKCompleted(rak_id=self.pk))
+            events.publish(events.RAKStatusChanged(rak_id=self.pk, status="completed"))
+            self._touch(*self.TRANSITIONS["completed"])
+        return True
+
+    def award_points(self):
+        """
+        Pay out the aura points of a completed RAK through the ledger. Safe to
+        call repeatedly: each user is paid at most once per source.
+        """
+        if not self.completed_at:
             return
 
-        self.status = "completed"
-        self.completed_at = timezone.now()
-        self.save()
+        with transaction.atomic():
+            # Claimants earn the RAK's points, all paid in set-based statements
+            award_many(
+                self.claims.values_list("claimer_id", flat=True),
+                AuraPointsEntry.CLAIM,
+                self.aura_points_value,
+                self,
+            )
 
-        # Award aura points to all claimants
-        for claim in self.claims.all():
-            claimant_profile = claim.claimer.userprofile
-            claimant_profile.aura_points += self.aura_points_value
-            claimant_profile.save()
-            claimant_profile.calculate_level()  # Update aura level if necessary
+            if not self.is_paid_forward:
+                # Offers also reward the person who made them
+                if self.rak_type == "offer":
+                    award(
+                        self.created_by_id,
+                        AuraPointsEntry.OFFER,
+                        self.aura_points_value,
+                        self,
+                    )
+            elif self.rak_type == "request" and self.status == "completed":
+                # A paid-forward request rewards the original requester
+                award(
+                    self.created_by_id,
+                    AuraPointsEntry.PAY_IT_FORWARD,
+                    self.aura_points_value,
+                    self,
+                )
 
     def send_notification(self, message):
-        Notification.objects.create(recipient=self.created_by, message=message)
+        # Delivered by a background job.
+        # Avoid circular import (rak.tasks imports this module)
+        from rak import tasks
+
+        tasks.send_notification.enqueue(
+            recipient_id=self.created_by_id, message=message
+        )
 
 
 class Claimant(models.Model):
@@ -137,6 +343,13 @@ class Claimant(models.Model):
     )
     claimed_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        constraints = [
+            # One claim per user and RAK. The index also serves
+            # MyClaimedRAKListView, which looks up the RAK ids a user claimed.
+            models.UniqueConstraint(fields=["claimer", "rak"], name="unique_claim"),
+        ]
+
     def __str__(self):
         return f"RAK claimed by {self.claimer.username} on {self.claimed_at}"
 
@@ -152,6 +365,13 @@ class Collaborators(models.Model):
     )
     started_collabing_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["rak", "collaborator"], name="unique_collaboration"
+            ),
+        ]
+
     def __str__(self):
         return f"RAK collaborated with {self.collaborator.username} on {self.started_collabing_at}"
 
@@ -164,6 +384,27 @@ class Notification(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     is_read = models.BooleanField(default=False)
 
+    class Meta:
+        # Indexes follow the inbox endpoints, which page on (created_at, id)
+        # newest first. Writes go through rak.notifications.
+        indexes = [
+            # NotificationInboxView
+            models.Index(
+                fields=["recipient", "-created_at", "-id"], name="notif_inbox_idx"
+            ),
+            # NotificationInboxView with ?unread=true, and marking all read
+            models.Index(
+                fields=["recipient", "is_read", "-created_at", "-id"],
+                name="notif_inbox_read_idx",
+            ),
+            # prune_notifications
+            models.Index(
+                fields=["created_at"],
+                condition=models.Q(is_read=True),
+                name="notif_read_created_idx",
+            ),
+        ]
+
     def __str__(self):
         return f"Notification for {self.recipient.username} - {self.message}"
 
@@ -185,3 +426,64 @@ class PayItForward(models.Model):
 
     def __str__(self):
         return f"Pay It Forward by {self.paid_forward_by.username} for {self.original_rak.title}"
+
+
+class StatusChange(models.Model):
+    """
+    A RAK's status change, kept for a day so `rak.streams` can push it to
+    everyone taking part in the RAK. Pruned by `prune_notifications`.
+    """
+
+    rak = models.ForeignKey(
+        RandomActOfKindness, on_delete=models.CASCADE, related_name="status_changes"
+    )
+    status = models.CharField(max_length=15, choices=STATUS_CHOICES)
+    changed_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"RAK {self.rak_id} {self.status} at {self.changed_at}"
+
+
+class TimelineEntry(models.Model):
+    """
+    A RAK in a follower's home feed. Rows are written when the RAK is posted
+    (fan-out on write) so reading a feed is one range scan on `user`.
+    """
+
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="timeline_entries"
+    )
+    rak = models.ForeignKey(
+        RandomActOfKindness, on_delete=models.CASCADE, related_name="timeline_entries"
+    )
+    created_at = models.DateTimeField(help_text="Copy of the RAK's created_at")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "rak"], name="unique_timeline_entry"
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["user", "-created_at", "-rak"], name="timeline_user_recent_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"Timeline entry for {self.user_id}: RAK {self.rak_id}"
+
+
+class ResourceVersion(models.Model):
+    """
+    A counter bumped whenever the data behind a group of endpoints changes.
+    Read endpoints derive their ETag / Last-Modified from it (see
+    `rak.versions`) so unchanged lists can be answered with a 304.
+    """
+
+    name = models.CharField(max_length=100, unique=True)
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.name} v{self.version}"
@@ -0,0 +1,156 @@
+"""
+Notification inbox.
+
+Every user's unread count is kept in `UserProfile.unread_notifications`, so
+polling for it is a primary key lookup instead of a COUNT. All writes go
+through this module, which keeps the counter in step with `F()` updates in
+the same transaction:
+
+- `notify()` inserts any number of notifications with one `bulk_create` and
+  one counter UPDATE per distinct increment (normally one);
+- `mark_read()` and `delete()` act on a list of ids or on the whole inbox in
+  a single UPDATE / DELETE, however many rows that covers;
+- `prune()` removes read notifications past the retention period in batches,
+  for the `prune_notifications` command.
+
+Writes that bypass this module (admin edits of `is_read`, querysets in a
+shell; admin deletes come through here) leave the counter behind; `recount()`, run by the
+`repair_unread_notifications` command, recomputes it from the table.
+"""
+
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from rak.models import Notification
+from users.models import UserProfile
+
+NOTIFICATION_RETENTION_DAYS = getattr(settings, "NOTIFICATION_RETENTION_DAYS", 90)
+PRUNE_BATCH_SIZE = 1000
+RECOUNT_BATCH_SIZE = 5000
+
+
+def notify(notifications):
+    """Save unsaved `Notification` objects and count them as unread."""
+    notifications = list(notifications)
+    if not notifications:
+        return []
+
+    per_recipient = Counter(
+        notification.recipient_id
+        for notification in notifications
+        if not notification.is_read
+    )
+    # Users receiving the same number of notifications share one UPDATE
+    by_amount = {}
+    for recipient_id, amount in per_recipient.items():
+        by_amount.setdefault(amount, []).append(recipient_id)
+
+    with transaction.atomic():
+        created = Notification.objects.bulk_create(notifications)
+        for amount, recipient_ids in by_amount.items():
+            UserProfile.objects.filter(user_id__in=recipient_ids).update(
+                unread_notifications=F("unread_notifications") + amount
+            )
+    return created
+
+
+def unread_count(user):
+    return (
+        UserProfile.objects.filter(user=user)
+        .values_list("unread_notifications", flat=True)
+        .first()
+        or 0
+    )
+
+
+def _inbox(user, ids):
+    notifications = Notification.objects.filter(recipient=user)
+    if ids is not None:
+        notifications = notifications.filter(pk__in=ids)
+    return notifications
+
+
+def _discount(user, amount):
+    if amount:
+        UserProfile.objects.filter(user=user).update(
+            unread_notifications=Greatest(F("unread_notifications") - amount, 0)
+        )
+
+
+def mark_read(user, ids=None):
+    """
+    Mark the given notifications (all of them when `ids` is None) as read.
+    Returns the number that were unread.
+    """
+    with transaction.atomic():
+        updated = _inbox(user, ids).filter(is_read=False).update(is_read=True)
+        _discount(user, updated)
+    return updated
+
+
+def delete(user, ids=None):
+    """
+    Delete the given notifications (all of them when `ids` is None). Returns
+    the number deleted.
+    """
+    with transaction.atomic():
+        # Unread ones first, so the counter drops by exactly what was unread
+        unread, _ = _inbox(user, ids).filter(is_read=False).delete()
+        read, _ = _inbox(user, ids).delete()
+        _discount(user, unread)
+    return unread + read
+
+
+def prune(days=NOTIFICATION_RETENTION_DAYS, batch_size=PRUNE_BATCH_SIZE):
+    """
+    Delete read notifications older than `days`, `batch_size` rows per
+    statement so no single transaction locks much of the table. Returns the
+    number deleted.
+    """
+    cutoff = timezone.now() - timedelta(days=days)
+    expired = Notification.objects.filter(is_read=True, created_at__lt=cutoff)
+    deleted = 0
+    while True:
+        batch = list(expired.values_list("pk", flat=True)[:batch_size])
+        if not batch:
+            return deleted
+        count, _ = Notification.objects.filter(pk__in=batch).delete()
+        deleted += count
+
+
+def recount(batch_size=RECOUNT_BATCH_SIZE):
+    """
+    Recompute every `unread_notifications` from the unread notifications,
+    `batch_size` profiles per UPDATE. Returns the number of profiles updated.
+    """
+    unread = Coalesce(
+        Subquery(
+            Notification.objects.filter(recipient=OuterRef("user_id"), is_read=False)
+            .order_by()
+            .values("recipient")
+            .annotate(total=Count("pk"))
+            .values("total"),
+            output_field=IntegerField(),
+        ),
+        Value(0),
+    )
+    last_id = 0
+    updated = 0
+    while True:
+        ids = list(
+            UserProfile.objects.filter(pk__gt=last_id)
+            .order_by("pk")
+            .values_list("pk", flat=True)[:batch_size]
+        )
+        if not ids:
+            return updated
+        updated += UserProfile.objects.filter(pk__gte=ids[0], pk__lte=ids[-1]).update(
+            unread_notifications=unread
+        )
+        last_id = ids[-1]
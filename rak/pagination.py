@@ -0,0 +1,161 @@
+import base64
+import json
+from collections import OrderedDict
+from functools import reduce
+from operator import or_
+
+from django.db.models import Q
+from django.core.exceptions import ValidationError
+from rest_framework.exceptions import ParseError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Opaque cursor pagination that seeks on the ordering columns.
+
+    The cursor holds the ordering values of the last row of the page, and the
+    next page is fetched with a `(a, b) < (x, y)` style filter instead of an
+    OFFSET, so every page costs the same as the first one. The last ordering
+    field must be unique (normally `id`) so that ties are broken exactly.
+    A cursor that does not decode to such values is answered with a 400.
+    """
+
+    cursor_query_param = "cursor"
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = ("-created_at", "-id")
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self._prepare(queryset, request, view)
+        # Fetch one extra row to know whether there is a following page.
+        return self._set_page(list(queryset[: self.page_size + 1]))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """`paginate_queryset` for async views, using the async ORM."""
+        queryset = self._prepare(queryset, request, view)
+        return self._set_page([row async for row in queryset[: self.page_size + 1]])
+
+    def _prepare(self, queryset, request, view):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+
+        queryset = self.load_ordering_fields(queryset.order_by(*self.ordering))
+        position = self.decode_cursor(request, queryset.model)
+        if position is not None:
+            queryset = queryset.filter(self.build_seek_filter(position))
+        return queryset
+
+    def _set_page(self, results):
+        self.page = results[: self.page_size]
+        self.has_next = len(results) > self.page_size
+        return self.page
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def load_ordering_fields(self, queryset):
+        """
+        Keep the ordering columns loaded when the queryset was limited with
+        `.only()` (sparse fieldsets), as the next cursor is built from them.
+        """
+        names, defer = queryset.query.deferred_loading
+        if names and not defer:
+            ordering = [order.lstrip("-") for order in self.ordering]
+            queryset = queryset.only(*names, *ordering)
+        return queryset
+
+    def get_paginated_response(self, data):
+        return Response(
+            OrderedDict([("next", self.get_next_link()), ("results", data)])
+        )
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        position = [
+            self._get_position_value(self.page[-1], order) for order in self.ordering
+        ]
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(position)
+        )
+
+    def build_seek_filter(self, position):
+        """
+        Expand the row-value comparison into the equivalent OR of ANDs, e.g.
+        `created_at < x OR (created_at = x AND id < y)` for a descending order.
+        """
+        clauses = []
+        for index, order in enumerate(self.ordering):
+            field = order.lstrip("-")
+            lookup = "lt" if order.startswith("-") else "gt"
+            equal = {
+                previous.lstrip("-"): position[i]
+                for i, previous in enumerate(self.ordering[:index])
+            }
+            clauses.append(Q(**equal, **{f"{field}__{lookup}": position[index]}))
+        return reduce(or_, clauses)
+
+    def encode_cursor(self, position):
+        payload = json.dumps(position, separators=(",", ":")).encode("utf-8")
+        return base64.urlsafe_b64encode(payload).decode("ascii")
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            raw = json.loads(base64.urlsafe_b64decode(encoded.encode("ascii")))
+            if not isinstance(raw, list) or len(raw) != len(self.ordering):
+                raise ValueError
+            return [
+                model._meta.get_field(order.lstrip("-")).to_python(value)
+                for order, value in zip(self.ordering, raw)
+            ]
+        except (TypeError, ValueError, ValidationError, UnicodeError):
+            raise ParseError(self.invalid_cursor_message)
+
+    def _get_position_value(self, instance, order):
+        value = getattr(instance, order.lstrip("-"))
+        if hasattr(value, "isoformat"):
+            return value.isoformat()
+        return value
+
+
+class RAKCursorPagination(KeysetPagination):
+    """
+    Newest-first pagination for RAK lists, ordered on `(created_at, id)`.
+
+    There is deliberately no ordering on the participation counters
+    (`claim_count`, ...): they change while clients page, and a cursor
+    seeking on a changed value skips or repeats RAKs.
+    """
+
+    ordering = ("-created_at", "-id")
+
+
+class TimelinePagination(KeysetPagination):
+    """
+    Pagination over `TimelineEntry` rows. Cursors carry `(created_at, rak id)`
+    so they are interchangeable with `RAKCursorPagination` cursors.
+    """
+
+    ordering = ("-created_at", "-rak_id")
+
+
+class NotificationPagination(KeysetPagination):
+    """Newest-first pagination for the notification inbox."""
+
+    ordering = ("-created_at", "-id")
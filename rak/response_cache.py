@@ -0,0 +1,136 @@
+"""
+Response cache for the public RAK lists.
+
+`UnclaimedRAKListView`, `ClaimedRAKListView` and `AllRAKListView` render the
+same page for every caller, so the serialized page is cached per view, host
+and query string. Keys embed the version counter of the data the view
+renders (see `rak.versions`): `raks:open` for the unclaimed list and
+`raks:in progress` for the claimed one, which are only bumped by changes to
+public RAKs in that status (or leaving it), including their claims,
+collaborators and pay-it-forwards; `raks` for the list of all RAKs, bumped by
+every change. A bump invalidates every cached page of the lists keyed on it,
+and stale entries simply age out after `RAK_LIST_CACHE_TIMEOUT`.
+
+Hits and misses are counted in the cache; the number of invalidations of
+each list is its counter's version. `RAKListCacheStatsView` reports both.
+"""
+
+import hashlib
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.response import Response
+
+from rak import versions
+from rak.models import ResourceVersion
+
+CACHE_ALIAS = getattr(settings, "RAK_LIST_CACHE_ALIAS", "default")
+CACHE_TIMEOUT = getattr(settings, "RAK_LIST_CACHE_TIMEOUT", 300)
+KEY_PREFIX = "rak-list"
+STATS = ("hits", "misses")
+
+
+def _cache():
+    return caches[CACHE_ALIAS]
+
+
+def _cache_key(view, request, name):
+    # updated_at guards against reused numbers if the counter row is recreated
+    version, updated_at = versions.current(request, [name])[name]
+    stamp = updated_at.timestamp() if updated_at else 0
+    query = sorted(
+        (name, value)
+        for name, values in request.query_params.lists()
+        for value in values
+    )
+    raw = f"{request.get_host()}|{request.path}|{query}"
+    digest = hashlib.sha256(raw.encode("utf-8")).hexdigest()
+    return f"{KEY_PREFIX}:{type(view).__name__}:v{version}.{stamp}:{digest}"
+
+
+def _count(stat):
+    key = f"{KEY_PREFIX}:stats:{stat}"
+    cache = _cache()
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Evicted between add() and incr()
+        cache.set(key, 1, timeout=None)
+
+
+async def _acount(stat):
+    key = f"{KEY_PREFIX}:stats:{stat}"
+    cache = _cache()
+    await cache.aadd(key, 0, timeout=None)
+    try:
+        await cache.aincr(key)
+    except ValueError:
+        await cache.aset(key, 1, timeout=None)
+
+
+def cached_response(name):
+    """
+    Decorate an `APIView` `get` (sync or async) to serve it from the cache
+    while the version counter `name` stays the same.
+    """
+
+    def decorator(view_method):
+        if iscoroutinefunction(view_method):
+
+            @wraps(view_method)
+            async def async_wrapper(self, request, *args, **kwargs):
+                key = await sync_to_async(_cache_key)(self, request, name)
+                data = await _cache().aget(key)
+                if data is not None:
+                    await _acount("hits")
+                    return Response(data)
+
+                await _acount("misses")
+                response = await view_method(self, request, *args, **kwargs)
+                if response.status_code == 200:
+                    await _cache().aset(key, response.data, CACHE_TIMEOUT)
+                return response
+
+            return async_wrapper
+
+        @wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            key = _cache_key(self, request, name)
+            data = _cache().get(key)
+            if data is not None:
+                _count("hits")
+                return Response(data)
+
+            _count("misses")
+            response = view_method(self, request, *args, **kwargs)
+            if response.status_code == 200:
+                _cache().set(key, response.data, CACHE_TIMEOUT)
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def stats():
+    """
+    Hit / miss counters since the last reset, and the invalidation count of
+    each version counter the lists are keyed on.
+    """
+    cache = _cache()
+    counts = {stat: cache.get(f"{KEY_PREFIX}:stats:{stat}", 0) for stat in STATS}
+    lookups = counts["hits"] + counts["misses"]
+    counts["hit_rate"] = counts["hits"] / lookups if lookups else 0.0
+    names = [versions.RAKS, *map(versions.rak_list, versions.RAK_LIST_STATUSES)]
+    found = dict(
+        ResourceVersion.objects.filter(name__in=names).values_list("name", "version")
+    )
+    counts["invalidations"] = {name: found.get(name, 0) for name in names}
+    return counts
+
+
+def reset_stats():
+    _cache().delete_many([f"{KEY_PREFIX}:stats:{stat}" for stat in STATS])
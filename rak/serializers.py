@@ -1,4 +1,9 @@
 from rest_framework import serializers
+
+from core.batch import MAX_BATCH_IDS
+from core.serializers import SparseFieldsetMixin
+from rak.bulk import ACTIONS
+from uploads.serializers import VariantsField
 from .models import (
     Collaborators,
     RandomActOfKindness,
@@ -30,6 +35,12 @@ class CollaboratorsSerializer(serializers.ModelSerializer):
             "rak": {"read_only": True},
             "comment": {"required": True},
         }
+        field_paths = {
+            "collaborator_username": [
+                "collaborator__username",
+                "anonymous_collaborator",
+            ]
+        }
 
     def get_collaborator_username(self, obj):
         if obj.anonymous_collaborator:
@@ -57,6 +68,7 @@ class ClaimantSerializer(serializers.ModelSerializer):
             "rak": {"read_only": True},
             "comment": {"required": True},
         }
+        field_paths = {"claimer_username": ["claimer__username", "anonymous_claimant"]}
 
     def get_claimer_username(self, obj):
         if obj.anonymous_claimant:
@@ -65,13 +77,14 @@ class ClaimantSerializer(serializers.ModelSerializer):
             return obj.claimer.username
 
 
-class RandomActOfKindnessSerializer(serializers.ModelSerializer):
+class RandomActOfKindnessSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     created_by_username = serializers.CharField(
         source="created_by.username", read_only=True
     )
     claims = ClaimantSerializer(many=True, read_only=True)
     collabs = CollaboratorsSerializer(many=True, read_only=True)
     is_paid_forward = serializers.SerializerMethodField()
+    media_variants = VariantsField("media")
 
     class Meta:
         model = RandomActOfKindness
@@ -82,6 +95,7 @@ class RandomActOfKindnessSerializer(serializers.ModelSerializer):
             "title",
             "description",
             "media",
+            "media_variants",
             "created_at",
             "status",
             "private",
@@ -95,16 +109,28 @@ class RandomActOfKindnessSerializer(serializers.ModelSerializer):
             "claims",
             "collabs",
             "is_paid_forward",
+            "claim_count",
+            "collaborator_count",
+            "pay_it_forward_count",
         ]
         extra_kwargs = {
             "created_by": {"read_only": True},
             "status": {"read_only": True},
             "completed_at": {"read_only": True},
+            "claim_count": {"read_only": True},
+            "collaborator_count": {"read_only": True},
+            "pay_it_forward_count": {"read_only": True},
         }
+        field_paths = {
+            "is_paid_forward": ["pay_it_forward_count"],
+            "media_variants": ["media", "media_variants"],
+        }
+        # Only rendered with `?fields=` when also named in `?expand=`
+        expandable_fields = ["claims", "collabs"]
 
     def get_is_paid_forward(self, obj):
-        # Check if the RAK is referenced as an original_rak in PayItForward
-        return PayItForward.objects.filter(original_rak=obj).exists()
+        # Read from the denormalised counter instead of querying PayItForward
+        return obj.pay_it_forward_count > 0
 
 
 class NotificationSerializer(serializers.ModelSerializer):
@@ -129,6 +155,47 @@ class NotificationSerializer(serializers.ModelSerializer):
         }
 
 
+class NotificationBulkActionSerializer(serializers.Serializer):
+    """Target of a bulk inbox action: a list of ids, or the whole inbox."""
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        max_length=10000,
+    )
+    all = serializers.BooleanField(default=False)
+
+    def validate(self, data):
+        if data["all"] == ("ids" in data):
+            raise serializers.ValidationError("Provide either `ids` or `all`.")
+        return data
+
+
+class RAKBulkItemSerializer(serializers.Serializer):
+    """One `(rak_id, action)` pair of a bulk request."""
+
+    rak_id = serializers.IntegerField(min_value=1)
+    action = serializers.ChoiceField(choices=ACTIONS)
+    comment = serializers.CharField(max_length=255, required=False, allow_blank=True)
+    anonymous = serializers.BooleanField(default=False)
+
+
+class RAKBulkActionSerializer(serializers.Serializer):
+    """Claims and status changes applied together by `rak.bulk.apply()`."""
+
+    items = serializers.ListField(
+        child=RAKBulkItemSerializer(),
+        allow_empty=False,
+        max_length=MAX_BATCH_IDS,
+    )
+
+    def validate_items(self, items):
+        rak_ids = [item["rak_id"] for item in items]
+        if len(set(rak_ids)) != len(rak_ids):
+            raise serializers.ValidationError("Each RAK may appear only once.")
+        return items
+
+
 class PayItForwardSerializer(serializers.ModelSerializer):
     original_rak = RandomActOfKindnessSerializer(read_only=True)
     new_rak = RandomActOfKindnessSerializer(read_only=True)
@@ -148,3 +215,4 @@ class PayItForwardSerializer(serializers.ModelSerializer):
         extra_kwargs = {
             "created_at": {"read_only": True},
         }
+        field_paths = {"paid_forward_by_username": ["new_rak__created_by__username"]}
@@ -1,64 +1,71 @@
 # This is for 'events' where i want something to happen. Like event listener kind of..... use this for point logic?
 
-from django.db.models.signals import post_save
+from django.db.models import F
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
-from .models import RandomActOfKindness, Notification
-from users.models import UserProfile
+from rak import events, timeline, versions
+from .models import (
+    RandomActOfKindness,
+    Claimant,
+    Collaborators,
+    PayItForward,
+)
+from users.models import UserProfile, Follow
 
 User = get_user_model()
 
 
+# Bump the version counters behind the ETag / Last-Modified validators and
+# the response cache. Connected before publish_rak_events, which resets the
+# loaded state this compares against.
 @receiver(post_save, sender=RandomActOfKindness)
-def handle_rak_post_save(sender, instance, created, **kwargs):
-    # I only want to award aura points if the RAK is completed and it's not a Pay It Forward action
-    # --- Logic here could be a bit flawed ....CHECK ME
-    if instance.completed_at and not instance.is_paid_forward:
-        # INSTANCE 1 ---  RAK is an offer, award points via the created_by
-        if instance.rak_type == "offer":
-            user_profile = instance.created_by.userprofile
-            user_profile.aura_points += (
-                instance.aura_points_value
-            )  # Add aura points to created_by user
-            user_profile.points_from_offers += (
-                instance.aura_points_value
-            )  # Track points from offers
-            user_profile.save()
-
-        # INSTANCE 2 --- RAK is a request, no points for the owner, claimant gets points!!!!
-        elif instance.rak_type == "request" and instance.status == "completed":
-            for claim in instance.claims.all():
-                claimant_profile = claim.claimer.userprofile
-                claimant_profile.points_from_claiming += instance.aura_points_value
-                claimant_profile.save()
-
-    # INSTANCE 3 --- If Pay It Forward is completed, award points to the original RAK owner (requester)
-    if (
-        instance.is_paid_forward
-        and instance.status == "completed"
-        and instance.rak_type == "request"
-    ):
-        original_rak_owner_profile = instance.created_by.userprofile
-        aura_points_for_owner = (
-            instance.aura_points
-        )  # The original requester now gets the points
-        original_rak_owner_profile.aura_points += aura_points_for_owner
-        original_rak_owner_profile.points_from_pay_it_forward += (
-            aura_points_for_owner  # Track points from Pay It Forward
+@receiver(post_delete, sender=RandomActOfKindness)
+def bump_rak_version(sender, instance, **kwargs):
+    stored = {name: instance.__dict__.get(name) for name in instance.TRACKED_FIELDS}
+    if stored["status"] is None:
+        # Deferred, so the lists the RAK shows in are unknown
+        versions.bump_raks()
+        return
+    # As saved, and as loaded before the save
+    states = [stored, {**stored, **getattr(instance, "_loaded_state", {})}]
+    versions.bump_raks(state["status"] for state in states if not state["private"])
+
+
+# Translate RAK saves into domain events; the work happens in rak/handlers.py
+# after commit. Saves that change neither visibility nor status (title edits
+# and the like) publish nothing.
+@receiver(post_save, sender=RandomActOfKindness)
+def publish_rak_events(sender, instance, created, **kwargs):
+    loaded = getattr(instance, "_loaded_state", {})
+    if created:
+        events.publish(events.RAKPublished(rak_id=instance.pk))
+    elif "private" in loaded and loaded["private"] != instance.private:
+        events.publish(
+            events.RAKVisibilityChanged(rak_id=instance.pk, private=instance.private)
         )
-        original_rak_owner_profile.save()
-
-    # Handle notifications
-    if instance.status == "claimed":
-        for claim in instance.claims.all():
-            Notification.objects.create(
-                recipient=instance.created_by,
-                message=f"Your Random Act of Kindness has been claimed by {claim.claimer.username}.",
+
+    # Status changes normally go through claim_rak(), transition() and
+    # complete_rak(); this catches saves that set the status directly (e.g.
+    # the admin).
+    status = instance.__dict__.get("status")
+    if not created and "status" in loaded and loaded["status"] != status:
+        events.publish(events.RAKStatusChanged(rak_id=instance.pk, status=status))
+    if status == "completed" and (
+        created or loaded.get("status", "completed") != "completed"
+    ):
+        events.publish(events.RAKCompleted(rak_id=instance.pk))
+    instance.remember_state()
+
+
+@receiver(post_save, sender=PayItForward)
+def publish_pay_it_forward(sender, instance, created, **kwargs):
+    if created:
+        events.publish(
+            events.PayItForwardCreated(
+                original_rak_id=instance.original_rak_id,
+                new_rak_id=instance.new_rak_id,
             )
-    if instance.completed_at:
-        Notification.objects.create(
-            recipient=instance.created_by,
-            message=f"Your Random Act of Kindness has been completed.",
         )
 
 
@@ -69,3 +76,81 @@ def create_or_update_user_profile(sender, instance, created, **kwargs):
     else:
         # Ensure the UserProfile exists
         UserProfile.objects.get_or_create(user=instance)
+
+
+@receiver(post_save, sender=Follow)
+def handle_follow_created(sender, instance, created, **kwargs):
+    if created:
+        UserProfile.objects.filter(user_id=instance.followed_id).update(
+            followers_count=F("followers_count") + 1
+        )
+        timeline.backfill(instance.follower_id, instance.followed_id)
+
+
+@receiver(post_delete, sender=Follow)
+def handle_follow_deleted(sender, instance, **kwargs):
+    UserProfile.objects.filter(
+        user_id=instance.followed_id, followers_count__gt=0
+    ).update(followers_count=F("followers_count") - 1)
+    timeline.unfollow(instance.follower_id, instance.followed_id)
+
+
+# Keep the participation counters exact when rows are removed (admin, cascades)
+def _decrement_counter(rak_id, field):
+    RandomActOfKindness.objects.filter(pk=rak_id, **{f"{field}__gt": 0}).update(
+        **{field: F(field) - 1}
+    )
+
+
+@receiver(post_delete, sender=Claimant)
+def handle_claim_deleted(sender, instance, **kwargs):
+    _decrement_counter(instance.rak_id, "claim_count")
+
+
+@receiver(post_delete, sender=Collaborators)
+def handle_collaborator_deleted(sender, instance, **kwargs):
+    _decrement_counter(instance.rak_id, "collaborator_count")
+
+
+@receiver(post_delete, sender=PayItForward)
+def handle_pay_it_forward_deleted(sender, instance, **kwargs):
+    _decrement_counter(instance.original_rak_id, "pay_it_forward_count")
+
+
+@receiver(post_save, sender=Claimant)
+@receiver(post_delete, sender=Claimant)
+@receiver(post_save, sender=Collaborators)
+@receiver(post_delete, sender=Collaborators)
+def bump_participation_version(sender, instance, **kwargs):
+    versions.bump_rak(instance.rak_id)
+
+
+@receiver(post_save, sender=PayItForward)
+@receiver(post_delete, sender=PayItForward)
+def bump_pay_it_forward_version(sender, instance, **kwargs):
+    # The new RAK bumps its own counters when saved
+    versions.bump_rak(instance.original_rak_id)
+
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def bump_profile_version(sender, instance, **kwargs):
+    versions.bump(versions.PROFILES)
+
+
+# Usernames are rendered in RAK lists and leaderboards; logins only touch last_login
+RENDERED_USER_FIELDS = {"username", "first_name", "last_name", "email"}
+
+
+@receiver(post_save, sender=User)
+def bump_user_versions(sender, instance, created, update_fields=None, **kwargs):
+    if created or (update_fields and not RENDERED_USER_FIELDS & set(update_fields)):
+        return
+    versions.bump_raks()
+    versions.bump(versions.PROFILES)
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def bump_follow_version(sender, instance, **kwargs):
+    versions.bump(versions.follows(instance.follower_id))
@@ -0,0 +1,281 @@
+"""
+Live event stream (server-sent events) served by `EventStreamView`.
+
+A stream pushes two kinds of events to a signed-in user:
+
+- `notification`: every new `Notification` addressed to them, with the
+  notification id as the SSE event id so a reconnecting client resumes from
+  `Last-Event-ID` without missing any;
+- `status`: status changes (`StatusChange` rows) of the RAKs they posted,
+  claimed or collaborate on.
+
+Connections are cheap: each is an `asyncio.Queue` registered with the
+process-wide `hub`, and no query runs per connection while it is idle. The
+hub polls the database once every `STREAM_POLL_INTERVAL` seconds for rows
+written since the last poll, whichever process wrote them (the notification
+and status change tables act as the broadcast log), and hands each row to
+the queues of the users it concerns. A process holding thousands of idle
+streams therefore costs one or two range scans per interval.
+
+Streams need an ASGI server (see `core/asgi.py`); under WSGI an endless
+response would tie up a worker thread per client.
+"""
+
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Max
+from django.utils import timezone
+from rest_framework.exceptions import AuthenticationFailed
+
+from rak.models import (
+    Claimant,
+    Collaborators,
+    Notification,
+    RandomActOfKindness,
+    StatusChange,
+)
+from users.authentication import aget_user
+
+logger = logging.getLogger(__name__)
+
+STREAM_POLL_INTERVAL = getattr(settings, "STREAM_POLL_INTERVAL", 2)
+STREAM_HEARTBEAT_INTERVAL = getattr(settings, "STREAM_HEARTBEAT_INTERVAL", 15)
+# Events buffered per connection before a slow client is disconnected
+STREAM_QUEUE_SIZE = 100
+POLL_BATCH_SIZE = 500
+# Status changes only need to outlive the polls that broadcast them
+STATUS_CHANGE_RETENTION = timedelta(days=1)
+
+
+def format_event(event, data, event_id=None):
+    """Encode one SSE message."""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, default=str, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
+
+
+def notification_event(notification):
+    return format_event(
+        "notification",
+        {
+            "id": notification["id"],
+            "message": notification["message"],
+            "created_at": notification["created_at"],
+            "is_read": notification["is_read"],
+        },
+        event_id=notification["id"],
+    )
+
+
+NOTIFICATION_FIELDS = ("id", "recipient_id", "message", "created_at", "is_read")
+
+
+class Subscription:
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self.queue = asyncio.Queue(maxsize=STREAM_QUEUE_SIZE)
+        self.overflowed = False
+
+    def push(self, event_id, message):
+        try:
+            self.queue.put_nowait((event_id, message))
+        except asyncio.QueueFull:
+            # The client is not keeping up; end the stream so it reconnects
+            # and catches up from Last-Event-ID.
+            self.overflowed = True
+
+
+class Hub:
+    """Routes rows polled from the database to the connected users' queues."""
+
+    def __init__(self):
+        self._subscriptions = defaultdict(set)
+        self._poller = None
+        self._loop = None
+        self._starting = None
+        self._notification_id = None
+        self._status_change_id = None
+
+    def __len__(self):
+        return sum(len(queues) for queues in self._subscriptions.values())
+
+    async def subscribe(self, user_id):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._poller = None
+            self._starting = asyncio.Lock()
+        # Streams opening together must not start a poller each
+        async with self._starting:
+            if self._poller is None or self._poller.done():
+                # First stream in this process (or since the last one closed):
+                # only rows written from now on are broadcast.
+                self._notification_id = await _latest(Notification)
+                self._status_change_id = await _latest(StatusChange)
+                self._poller = loop.create_task(self._poll())
+        subscription = Subscription(user_id)
+        self._subscriptions[user_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        queues = self._subscriptions.get(subscription.user_id)
+        if queues is not None:
+            queues.discard(subscription)
+            if not queues:
+                del self._subscriptions[subscription.user_id]
+
+    def _deliver(self, user_id, message, event_id=None):
+        for subscription in self._subscriptions.get(user_id, ()):
+            subscription.push(event_id, message)
+
+    async def _poll(self):
+        while self._subscriptions:
+            await asyncio.sleep(STREAM_POLL_INTERVAL)
+            try:
+                await self.poll_once()
+            except Exception:
+                # Keep the streams open; the next poll picks up from here
+                logger.exception("Polling for stream events failed")
+
+    async def poll_once(self):
+        """Broadcast the rows written since the previous poll."""
+        notifications = Notification.objects.filter(
+            id__gt=self._notification_id
+        ).order_by("id")
+        async for notification in notifications.values(*NOTIFICATION_FIELDS)[
+            :POLL_BATCH_SIZE
+        ]:
+            self._notification_id = notification["id"]
+            self._deliver(
+                notification["recipient_id"],
+                notification_event(notification),
+                event_id=notification["id"],
+            )
+
+        changes = [
+            change
+            async for change in StatusChange.objects.filter(
+                id__gt=self._status_change_id
+            )
+            .order_by("id")
+            .values("id", "rak_id", "status", "changed_at")[:POLL_BATCH_SIZE]
+        ]
+        if not changes:
+            return
+        self._status_change_id = changes[-1]["id"]
+
+        participants = await _participants({change["rak_id"] for change in changes})
+        for change in changes:
+            message = format_event(
+                "status",
+                {
+                    "rak_id": change["rak_id"],
+                    "status": change["status"],
+                    "changed_at": change["changed_at"],
+                },
+            )
+            for user_id in participants[change["rak_id"]]:
+                self._deliver(user_id, message)
+
+
+async def _latest(model):
+    result = await model.objects.aaggregate(latest=Max("id"))
+    return result["latest"] or 0
+
+
+async def _participants(rak_ids):
+    """Map each RAK id to the users who posted, claimed or collaborate on it."""
+    participants = defaultdict(set)
+    for queryset in (
+        RandomActOfKindness.objects.filter(pk__in=rak_ids).values_list(
+            "pk", "created_by_id"
+        ),
+        Claimant.objects.filter(rak_id__in=rak_ids).values_list("rak_id", "claimer_id"),
+        Collaborators.objects.filter(rak_id__in=rak_ids).values_list(
+            "rak_id", "collaborator_id"
+        ),
+    ):
+        async for rak_id, user_id in queryset:
+            participants[rak_id].add(user_id)
+    return participants
+
+
+async def authenticate(request):
+    """
+    Return the id of the user a stream request authenticates as, or None.
+    Accepts `Authorization: Token <key>` and, because browsers' `EventSource`
+    cannot send headers, a `?token=<key>` query parameter.
+    """
+    scheme, _, key = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "token":
+        key = request.GET.get("token", "")
+    if not key:
+        return None
+    try:
+        user, _ = await aget_user(key)
+    except AuthenticationFailed:
+        return None
+    return user.pk
+
+
+async def missed_notifications(user_id, last_event_id):
+    """
+    `(id, message)` for the notifications created after `last_event_id`, for
+    a reconnecting client.
+    """
+    notifications = Notification.objects.filter(
+        recipient_id=user_id, id__gt=last_event_id
+    ).order_by("id")
+    return [
+        (notification["id"], notification_event(notification))
+        async for notification in notifications.values(*NOTIFICATION_FIELDS)[
+            :STREAM_QUEUE_SIZE
+        ]
+    ]
+
+
+async def stream(user_id, last_event_id=None):
+    """Yield the SSE messages for one connection until the client leaves."""
+    subscription = await hub.subscribe(user_id)
+    try:
+        # Ask clients to wait a moment before reconnecting
+        yield "retry: 5000\n\n"
+        sent_id = last_event_id or 0
+        if last_event_id is not None:
+            for event_id, message in await missed_notifications(user_id, last_event_id):
+                sent_id = event_id
+                yield message
+        while not subscription.overflowed:
+            try:
+                event_id, message = await asyncio.wait_for(
+                    subscription.queue.get(), STREAM_HEARTBEAT_INTERVAL
+                )
+            except asyncio.TimeoutError:
+                # Comment line keeping proxies from closing an idle stream
+                yield ": keepalive\n\n"
+                continue
+            # The catch-up above may already have sent it
+            if event_id is not None and event_id <= sent_id:
+                continue
+            sent_id = event_id or sent_id
+            yield message
+    finally:
+        hub.unsubscribe(subscription)
+
+
+def prune_status_changes():
+    """Delete status changes older than `STATUS_CHANGE_RETENTION`."""
+    cutoff = timezone.now() - STATUS_CHANGE_RETENTION
+    deleted, _ = StatusChange.objects.filter(changed_at__lt=cutoff).delete()
+    return deleted
+
+
+hub = Hub()
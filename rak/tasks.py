@@ -0,0 +1,107 @@
+"""
+Background tasks for RAK side effects, run by `manage.py run_jobs` (see
+`jobs.registry`). They are queued by the domain event handlers in
+`rak/handlers.py`, so none of this work happens in the request thread.
+
+Each task handles a whole batch of RAKs with a fixed number of queries:
+notifications are inserted in bulk with `rak.notifications.notify()`, RAKs
+and usernames are fetched with one query each. Tasks may be retried, so they
+are idempotent or run atomically (the default).
+"""
+
+from django.contrib.auth import get_user_model
+
+from jobs.registry import task
+from rak import notifications, timeline
+from rak.models import Notification, RandomActOfKindness
+
+User = get_user_model()
+
+
+@task(queue="timelines")
+def fan_out(rak_ids):
+    raks = RandomActOfKindness.objects.filter(pk__in=rak_ids, private=False)
+    for rak in raks:
+        timeline.fan_out(rak)
+
+
+@task(queue="timelines")
+def sync_visibility(rak_ids):
+    # Act on the stored visibility, which is the latest of any changes
+    for rak in RandomActOfKindness.objects.filter(pk__in=rak_ids):
+        if rak.private:
+            timeline.retract(rak)
+        else:
+            timeline.fan_out(rak)
+
+
+@task(queue="points")
+def pay_out_completed(rak_ids):
+    raks = list(
+        RandomActOfKindness.objects.filter(pk__in=rak_ids, completed_at__isnull=False)
+    )
+    for rak in raks:
+        rak.award_points()
+    notifications.notify(
+        [
+            Notification(
+                recipient_id=rak.created_by_id,
+                message="Your Random Act of Kindness has been completed.",
+            )
+            for rak in raks
+        ]
+    )
+
+
+@task(queue="notifications")
+def notify_authors(participations, message):
+    """
+    Notify the author of each RAK in `participations`, a list of
+    `[rak_id, user_id, anonymous]`, with `message` formatted with the user's
+    name.
+    """
+    authors = dict(
+        RandomActOfKindness.objects.filter(
+            pk__in={rak_id for rak_id, _, _ in participations}
+        ).values_list("pk", "created_by_id")
+    )
+    usernames = dict(
+        User.objects.filter(
+            pk__in={
+                user_id for _, user_id, anonymous in participations if not anonymous
+            }
+        ).values_list("pk", "username")
+    )
+    notifications.notify(
+        [
+            Notification(
+                recipient_id=authors[rak_id],
+                message=message.format(
+                    name="an anonymous user" if anonymous else usernames.get(user_id)
+                ),
+            )
+            for rak_id, user_id, anonymous in participations
+            if rak_id in authors
+        ]
+    )
+
+
+@task(queue="notifications")
+def notify_paid_forward(rak_ids):
+    authors = RandomActOfKindness.objects.filter(pk__in=rak_ids).values_list(
+        "created_by_id", flat=True
+    )
+    notifications.notify(
+        [
+            Notification(
+                recipient_id=author_id,
+                message="Your Random Act of Kindness has been paid forward.",
+            )
+            for author_id in authors
+        ]
+    )
+
+
+@task(queue="notifications")
+def send_notification(recipient_id, message):
+    notifications.notify([Notification(recipient_id=recipient_id, message=message)])
@@ -1,3 +1,419 @@
-from django.test import TestCase
+import asyncio
+import base64
+import importlib
+import io
+from unittest import mock
+from urllib.parse import parse_qs, urlsplit
 
-# Create your tests here.
+from django.apps import apps
+from django.contrib.admin.sites import site
+from django.core.cache import caches
+from django.core.management import call_command
+from django.test import RequestFactory, TestCase
+from rest_framework.authtoken.models import Token
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from jobs.worker import Worker
+from rak import bulk, notifications, response_cache, streams, timeline, versions
+from rak.pagination import RAKCursorPagination
+from rak.models import Claimant, Notification, RandomActOfKindness, TimelineEntry
+from users.models import AuraPointsEntry, CustomUser, Follow, UserProfile
+
+
+def make_rak(user, **kwargs):
+    fields = {
+        "title": "t",
+        "description": "d",
+        "rak_type": "offer",
+        "action": "a",
+    }
+    fields.update(kwargs)
+    return RandomActOfKindness.objects.create(created_by=user, **fields)
+
+
+class TimelineTests(TestCase):
+    def setUp(self):
+        self.reader = CustomUser.objects.create_user(username="reader", password="pw")
+        self.author = CustomUser.objects.create_user(username="author", password="pw")
+        self.headers = {
+            "Authorization": f"Token {Token.objects.create(user=self.reader).key}"
+        }
+
+    def test_migration_backfills_existing_follows(self):
+        public = make_rak(self.author)
+        make_rak(self.author, private=True)
+        Follow.objects.create(follower=self.reader, followed=self.author)
+        # As before fan-out on write existed
+        TimelineEntry.objects.all().delete()
+
+        migration = importlib.import_module("rak.migrations.0031_backfill_timelines")
+        migration.backfill_timelines(apps, None)
+
+        response = self.client.get("/rak/feed/", headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([rak["id"] for rak in response.json()["results"]], [public.pk])
+
+    def test_reading_the_feed_does_not_trim(self):
+        for rak in (make_rak(self.author), make_rak(self.author)):
+            TimelineEntry.objects.create(
+                user=self.reader, rak=rak, created_at=rak.created_at
+            )
+        with mock.patch.object(timeline, "TIMELINE_MAX_LENGTH", 1):
+            response = self.client.get("/rak/feed/", headers=self.headers)
+        self.assertEqual(len(response.json()["results"]), 2)
+        self.assertEqual(TimelineEntry.objects.filter(user=self.reader).count(), 2)
+
+    def test_fan_out_bounds_the_timeline(self):
+        Follow.objects.create(follower=self.reader, followed=self.author)
+        with mock.patch.object(timeline, "TIMELINE_MAX_LENGTH", 2):
+            for _ in range(3):
+                with self.captureOnCommitCallbacks(execute=True):
+                    make_rak(self.author)
+                Worker().run(burst=True)
+        newest = RandomActOfKindness.objects.order_by("-created_at", "-id")[:2]
+        self.assertEqual(
+            set(
+                TimelineEntry.objects.filter(user=self.reader).values_list(
+                    "rak_id", flat=True
+                )
+            ),
+            {rak.pk for rak in newest},
+        )
+
+    def test_fan_out_changes_the_feed_etag(self):
+        Follow.objects.create(follower=self.reader, followed=self.author)
+        with self.captureOnCommitCallbacks(execute=True):
+            rak = make_rak(self.author)
+        # Read after the commit but before the fan-out job ran
+        stale = self.client.get("/rak/feed/", headers=self.headers)
+        self.assertEqual(stale.json()["results"], [])
+
+        Worker().run(burst=True)
+        response = self.client.get(
+            "/rak/feed/", headers={**self.headers, "If-None-Match": stale["ETag"]}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([r["id"] for r in response.json()["results"]], [rak.pk])
+
+
+class CompareAndSwapTests(TestCase):
+    """Claims and status changes stay consistent when requests repeat or race."""
+
+    def setUp(self):
+        self.author = CustomUser.objects.create_user(username="author", password="pw")
+        self.claimer = CustomUser.objects.create_user(username="claimer", password="pw")
+        self.client = APIClient()
+        self.client.force_authenticate(self.claimer)
+
+    def post(self, url, data=None):
+        # Events, and the jobs they queue, are dispatched on commit
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(url, data or {}, format="json")
+
+    def test_double_claim_is_rejected(self):
+        rak = make_rak(self.author)
+        self.assertEqual(self.post(f"/rak/rak/{rak.pk}/claim/").status_code, 200)
+        self.assertEqual(self.post(f"/rak/rak/{rak.pk}/claim/").status_code, 400)
+
+        shared = make_rak(self.author, allow_claimants=True)
+        self.assertEqual(self.post(f"/rak/rak/{shared.pk}/claim/").status_code, 200)
+        response = self.post(f"/rak/rak/{shared.pk}/claim/")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.json()["detail"], "You have already claimed this RAK."
+        )
+
+        for claimed in (rak, shared):
+            claimed.refresh_from_db()
+            self.assertEqual(claimed.claim_count, 1)
+            self.assertEqual(Claimant.objects.filter(rak=claimed).count(), 1)
+
+    def test_completing_twice_conflicts_and_pays_once(self):
+        rak = make_rak(self.author)
+        self.post(f"/rak/rak/{rak.pk}/claim/")
+        url = f"/rak/rak/{rak.pk}/status/"
+        self.assertEqual(self.post(url, {"status": "completed"}).status_code, 200)
+        self.assertEqual(self.post(url, {"status": "completed"}).status_code, 409)
+        Worker().run(burst=True)
+
+        # The claimer, and the author of the offer
+        entries = AuraPointsEntry.objects.filter(rak=rak)
+        self.assertEqual(
+            sorted(entries.values_list("user_id", flat=True)),
+            sorted([self.author.pk, self.claimer.pk]),
+        )
+        profile = UserProfile.objects.get(user=self.claimer)
+        self.assertEqual(profile.aura_points, rak.aura_points_value)
+
+    def test_award_points_is_idempotent(self):
+        rak = make_rak(self.author)
+        rak.claim_rak(self.claimer)
+        rak.complete_rak()
+        rak.award_points()
+        rak.award_points()
+
+        self.assertEqual(AuraPointsEntry.objects.filter(rak=rak).count(), 2)
+        for user in (self.author, self.claimer):
+            profile = UserProfile.objects.get(user=user)
+            self.assertEqual(profile.aura_points, rak.aura_points_value)
+
+
+class BulkTests(TestCase):
+    """Bulk claims and status changes are checked per item, applied at once."""
+
+    def setUp(self):
+        self.author = CustomUser.objects.create_user(username="author", password="pw")
+        self.claimer = CustomUser.objects.create_user(username="claimer", password="pw")
+        self.client = APIClient()
+        self.client.force_authenticate(self.claimer)
+
+    def post(self, url, data=None):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(url, data or {}, format="json")
+
+    def test_bulk_rejects_per_item(self):
+        claimable = make_rak(self.author)
+        own = make_rak(self.claimer)
+        unclaimed = make_rak(self.author)
+        response = self.post(
+            "/rak/rak/bulk/",
+            {
+                "items": [
+                    {"rak_id": claimable.pk, "action": "claim"},
+                    {"rak_id": own.pk, "action": "claim"},
+                    {"rak_id": unclaimed.pk, "action": "completed"},
+                    {"rak_id": 999999, "action": "claim"},
+                ]
+            },
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(
+            [result["status"] for result in response.json()["results"]],
+            [200, 400, 403, 404],
+        )
+        self.assertEqual(
+            list(Claimant.objects.values_list("rak_id", flat=True)), [claimable.pk]
+        )
+        for rak, status in (
+            (claimable, "in progress"),
+            (own, "open"),
+            (unclaimed, "open"),
+        ):
+            rak.refresh_from_db()
+            self.assertEqual(rak.status, status)
+
+    def test_bulk_applies_nothing_when_it_fails(self):
+        first, second = make_rak(self.author), make_rak(self.author)
+        items = [
+            {"rak_id": first.pk, "action": "claim"},
+            {"rak_id": second.pk, "action": "claim"},
+        ]
+        # Fail after the claims were written, while raising the second event
+        with mock.patch.object(
+            bulk.events, "publish", side_effect=[None, RuntimeError]
+        ):
+            with self.assertRaises(RuntimeError):
+                bulk.apply(self.claimer, items)
+
+        self.assertFalse(Claimant.objects.exists())
+        for rak in (first, second):
+            rak.refresh_from_db()
+            self.assertEqual((rak.status, rak.claim_count), ("open", 0))
+
+
+class UnreadCounterTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username="alice", password="pw")
+        notifications.notify(
+            Notification(recipient=self.user, message=str(i)) for i in range(3)
+        )
+
+    def test_admin_deletes_keep_the_counter(self):
+        admin = site._registry[Notification]
+        request = RequestFactory().post("/")
+        first, *rest = Notification.objects.order_by("pk")
+        admin.delete_model(request, first)
+        self.assertEqual(notifications.unread_count(self.user), 2)
+        admin.delete_queryset(request, Notification.objects.filter(pk=rest[0].pk))
+        self.assertEqual(notifications.unread_count(self.user), 1)
+
+    def test_repair_recounts_after_a_bypassing_delete(self):
+        other = CustomUser.objects.create_user(username="bob", password="pw")
+        Notification.objects.filter(pk=Notification.objects.first().pk).delete()
+        Notification.objects.update(is_read=False)
+        UserProfile.objects.filter(user=other).update(unread_notifications=5)
+
+        call_command("repair_unread_notifications", batch_size=1, stdout=io.StringIO())
+        self.assertEqual(notifications.unread_count(self.user), 2)
+        self.assertEqual(notifications.unread_count(other), 0)
+
+
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        caches[response_cache.CACHE_ALIAS].clear()
+        self.author = CustomUser.objects.create_user(username="author", password="pw")
+        self.claimer = CustomUser.objects.create_user(username="claimer", password="pw")
+        self.open = make_rak(self.author)
+
+    def misses(self):
+        return response_cache.stats()["misses"]
+
+    def test_unrelated_changes_keep_the_unclaimed_list(self):
+        self.client.get("/rak/rak/unclaimed/")
+        completed = make_rak(self.author, status="completed")
+        completed.title = "renamed"
+        completed.save()
+        make_rak(self.author, private=True)
+        self.client.get("/rak/rak/unclaimed/")
+        self.assertEqual(self.misses(), 1)
+
+        # The list of all RAKs shows every one of those
+        self.client.get("/rak/all/")
+        make_rak(self.author, private=True)
+        self.client.get("/rak/all/")
+        self.assertEqual(self.misses(), 3)
+
+    def test_claiming_refreshes_both_lists(self):
+        self.client.get("/rak/rak/unclaimed/")
+        self.client.get("/rak/rak/claimed/")
+        self.open.claim_rak(self.claimer)
+
+        unclaimed = self.client.get("/rak/rak/unclaimed/").json()["results"]
+        claimed = self.client.get("/rak/rak/claimed/").json()["results"]
+        self.assertEqual(unclaimed, [])
+        self.assertEqual([rak["id"] for rak in claimed], [self.open.pk])
+
+        self.open.complete_rak()
+        self.assertEqual(self.client.get("/rak/rak/claimed/").json()["results"], [])
+
+
+class ConditionalTests(TestCase):
+    url = "/rak/my-posted-raks/"
+
+    def setUp(self):
+        self.alice = CustomUser.objects.create_user(username="alice", password="pw")
+        self.bob = CustomUser.objects.create_user(username="bob", password="pw")
+        make_rak(self.alice)
+
+    def get(self, user, **headers):
+        token, _ = Token.objects.get_or_create(user=user)
+        return self.client.get(
+            self.url, HTTP_AUTHORIZATION=f"Token {token.key}", **headers
+        )
+
+    def test_matching_etag_is_not_modified(self):
+        response = self.get(self.alice)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("no-cache", response["Cache-Control"])
+        self.assertIn("private", response["Cache-Control"])
+
+        revalidated = self.get(self.alice, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(revalidated["ETag"], response["ETag"])
+
+    def test_etags_differ_between_users(self):
+        alices = self.get(self.alice)["ETag"]
+        bobs = self.get(self.bob)
+        self.assertNotEqual(alices, bobs["ETag"])
+
+        # Bob never gets a 304 for Alice's page
+        response = self.get(self.bob, HTTP_IF_NONE_MATCH=alices)
+        self.assertEqual(response.status_code, 200)
+
+    def test_bump_changes_the_etag(self):
+        etag = self.get(self.alice)["ETag"]
+        versions.bump(versions.RAKS)
+
+        response = self.get(self.alice, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+
+class HubTests(TestCase):
+    async def test_concurrent_subscriptions_start_one_poller(self):
+        hub = streams.Hub()
+        lookups = []
+
+        async def latest(model):
+            lookups.append(model)
+            # Let the other subscription run in between
+            await asyncio.sleep(0)
+            return 0
+
+        with mock.patch.object(streams, "_latest", latest):
+            first, second = await asyncio.gather(hub.subscribe(1), hub.subscribe(2))
+        poller = hub._poller
+        self.assertEqual(len(lookups), 2)
+        self.assertEqual(len(hub), 2)
+
+        hub.unsubscribe(first)
+        hub.unsubscribe(second)
+        poller.cancel()
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        caches[response_cache.CACHE_ALIAS].clear()
+        self.author = CustomUser.objects.create_user(username="author", password="pw")
+        self.raks = [make_rak(self.author) for _ in range(5)]
+        # All at the same instant, so only the id breaks the ties
+        RandomActOfKindness.objects.update(created_at=self.raks[0].created_at)
+        self.newest_first = [rak.pk for rak in reversed(self.raks)]
+
+    def walk(self, url):
+        seen = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, response.content)
+            seen += [rak["id"] for rak in response.json()["results"]]
+            url = response.json()["next"]
+        return seen
+
+    def test_async_pages_walk_through_ties(self):
+        self.assertEqual(self.walk("/rak/all/?page_size=2"), self.newest_first)
+
+    def test_sync_pages_walk_through_ties(self):
+        paginator = RAKCursorPagination()
+        seen, params = [], {"page_size": 2}
+        while True:
+            request = Request(APIRequestFactory().get("/rak/all/", params))
+            page = paginator.paginate_queryset(
+                RandomActOfKindness.objects.all(), request
+            )
+            seen += [rak.pk for rak in page]
+            if not paginator.has_next:
+                break
+            params = parse_qs(urlsplit(paginator.get_next_link()).query)
+        self.assertEqual(seen, self.newest_first)
+
+    def test_invalid_cursors_are_rejected(self):
+        for cursor in (
+            "not base64!",
+            base64.urlsafe_b64encode(b"{}").decode(),
+            base64.urlsafe_b64encode(b'["2024-01-01T00:00:00"]').decode(),
+            base64.urlsafe_b64encode(b'["yesterday", 1]').decode(),
+            base64.urlsafe_b64encode(b'["2024-01-01T00:00:00", "one"]').decode(),
+        ):
+            with self.subTest(cursor=cursor):
+                response = self.client.get("/rak/all/", {"cursor": cursor})
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json()["detail"], "Invalid cursor")
+
+    def test_page_size_limits(self):
+        RandomActOfKindness.objects.bulk_create(
+            [
+                RandomActOfKindness(
+                    created_by=self.author,
+                    title="t",
+                    description="d",
+                    rak_type="offer",
+                    action="a",
+                )
+                for _ in range(100)
+            ]
+        )
+        for page_size, expected in (("3", 3), ("500", 100), ("0", 20), ("x", 20)):
+            with self.subTest(page_size=page_size):
+                response = self.client.get("/rak/all/", {"page_size": page_size})
+                self.assertEqual(len(response.json()["results"]), expected)
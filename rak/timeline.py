@@ -0,0 +1,157 @@
+"""
+Materialised home timelines for `UserFeedView`.
+
+When a public RAK is posted it is copied into a `TimelineEntry` row for each
+of the author's followers (fan-out on write), so reading a feed is a single
+range scan on `(user, created_at, rak)` instead of an IN-list over everyone
+the reader follows.
+
+Authors with more than `TIMELINE_FANOUT_MAX_FOLLOWERS` followers are not
+fanned out; their RAKs are pulled in at read time instead (hybrid feed) so
+one post never turns into millions of inserts.
+
+Timelines are trimmed to `TIMELINE_MAX_LENGTH` entries whenever entries are
+added, by the fan-out job or when their owner follows someone, never on the
+read path. The `trim_timelines` management command trims them all, e.g.
+after lowering the limit. Migration `rak.0031` seeded the timelines of the follows
+that existed before fan-out.
+
+Fan-out and retraction run in background jobs, after the RAK's own version
+bump, so they bump the `timeline:<user id>` version of every timeline they
+change; `UserFeedView` includes it in its ETag.
+"""
+
+from itertools import islice
+
+from django.conf import settings
+from django.db.models import Count, Q
+
+from rak import versions
+from rak.models import RandomActOfKindness, TimelineEntry
+from users.models import Follow, UserProfile
+
+TIMELINE_MAX_LENGTH = getattr(settings, "TIMELINE_MAX_LENGTH", 500)
+TIMELINE_FANOUT_MAX_FOLLOWERS = getattr(settings, "TIMELINE_FANOUT_MAX_FOLLOWERS", 5000)
+TIMELINE_BATCH_SIZE = 1000
+
+
+def _batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def uses_fan_out(user_id):
+    """Return True if RAKs by `user_id` are pushed into follower timelines."""
+    followers_count = (
+        UserProfile.objects.filter(user_id=user_id)
+        .values_list("followers_count", flat=True)
+        .first()
+    )
+    return (followers_count or 0) <= TIMELINE_FANOUT_MAX_FOLLOWERS
+
+
+def fan_out(rak):
+    """Copy a public RAK into the timelines of its author's followers."""
+    if rak.private or not uses_fan_out(rak.created_by_id):
+        return
+
+    follower_ids = (
+        Follow.objects.filter(followed_id=rak.created_by_id)
+        .values_list("follower_id", flat=True)
+        .iterator(chunk_size=TIMELINE_BATCH_SIZE)
+    )
+    for batch in _batched(follower_ids, TIMELINE_BATCH_SIZE):
+        TimelineEntry.objects.bulk_create(
+            [
+                TimelineEntry(user_id=user_id, rak=rak, created_at=rak.created_at)
+                for user_id in batch
+            ],
+            ignore_conflicts=True,
+        )
+        trim_oversized(batch)
+        versions.bump(*map(versions.timeline, batch))
+
+
+def retract(rak):
+    """Remove a RAK from every timeline, e.g. after it was made private."""
+    entries = TimelineEntry.objects.filter(rak=rak)
+    user_ids = list(entries.values_list("user_id", flat=True))
+    entries.delete()
+    for batch in _batched(user_ids, TIMELINE_BATCH_SIZE):
+        versions.bump(*map(versions.timeline, batch))
+
+
+def backfill(follower_id, followed_id):
+    """Seed a new follower's timeline with the followed user's recent RAKs."""
+    if not uses_fan_out(followed_id):
+        return
+
+    recent = RandomActOfKindness.objects.filter(
+        created_by_id=followed_id, private=False
+    ).order_by("-created_at", "-id")[:TIMELINE_MAX_LENGTH]
+    TimelineEntry.objects.bulk_create(
+        [
+            TimelineEntry(user_id=follower_id, rak_id=rak_id, created_at=created_at)
+            for rak_id, created_at in recent.values_list("id", "created_at")
+        ],
+        ignore_conflicts=True,
+    )
+    trim(follower_id)
+
+
+def unfollow(follower_id, followed_id):
+    """Drop the unfollowed user's RAKs from the follower's timeline."""
+    TimelineEntry.objects.filter(
+        user_id=follower_id, rak__created_by_id=followed_id
+    ).delete()
+
+
+def trim(user_id):
+    """Delete everything past the newest `TIMELINE_MAX_LENGTH` entries."""
+    boundary = (
+        TimelineEntry.objects.filter(user_id=user_id)
+        .order_by("-created_at", "-rak_id")
+        .values_list("created_at", "rak_id")[
+            TIMELINE_MAX_LENGTH - 1 : TIMELINE_MAX_LENGTH
+        ]
+    )
+    boundary = list(boundary)
+    if not boundary:
+        return 0
+    created_at, rak_id = boundary[0]
+    deleted, _ = (
+        TimelineEntry.objects.filter(user_id=user_id)
+        .filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, rak_id__lt=rak_id)
+        )
+        .delete()
+    )
+    return deleted
+
+
+def trim_oversized(user_ids=None):
+    """
+    `trim()` the timelines of `user_ids` (all of them when None) that are
+    longer than `TIMELINE_MAX_LENGTH`. Returns the number of entries deleted.
+    """
+    entries = TimelineEntry.objects.all()
+    if user_ids is not None:
+        entries = entries.filter(user_id__in=user_ids)
+    oversized = (
+        entries.values("user_id")
+        .annotate(total=Count("id"))
+        .filter(total__gt=TIMELINE_MAX_LENGTH)
+        .values_list("user_id", flat=True)
+    )
+    return sum(trim(user_id) for user_id in oversized.iterator(chunk_size=1000))
+
+
+def pull_author_ids(user):
+    """IDs of followed accounts whose RAKs are read at query time."""
+    return list(
+        Follow.objects.filter(
+            follower=user,
+            followed__userprofile__followers_count__gt=TIMELINE_FANOUT_MAX_FOLLOWERS,
+        ).values_list("followed_id", flat=True)
+    )
@@ -5,6 +5,8 @@ urlpatterns = [
     # RAK posts
     path("rak/", views.RandomActOfKindnessCreateView.as_view(), name="rak-create"),
     path("all/", views.AllRAKListView.as_view(), name="rak-all"),
+    path("rak/batch/", views.RAKBatchView.as_view(), name="rak-batch"),
+    path("rak/bulk/", views.RAKBulkActionView.as_view(), name="rak-bulk"),
     path(
         "rak/<int:pk>/",
         views.RandomActOfKindnessUpdateView.as_view(),
@@ -87,4 +89,25 @@ urlpatterns = [
     path("explore/", views.ExploreRAKView.as_view(), name="explore"),
     # Leaderboard
     path("leaderboard/", views.AuraPointsLeaderboardView.as_view(), name="leaderboard"),
+    # Notifications
+    path("notifications/", views.NotificationInboxView.as_view(), name="notifications"),
+    path(
+        "notifications/unread-count/",
+        views.NotificationUnreadCountView.as_view(),
+        name="notifications-unread-count",
+    ),
+    path(
+        "notifications/mark-read/",
+        views.NotificationMarkReadView.as_view(),
+        name="notifications-mark-read",
+    ),
+    path(
+        "notifications/delete/",
+        views.NotificationDeleteView.as_view(),
+        name="notifications-delete",
+    ),
+    # Live event stream
+    path("stream/", views.EventStreamView.as_view(), name="event-stream"),
+    # Response cache
+    path("cache-stats/", views.RAKListCacheStatsView.as_view(), name="rak-cache-stats"),
 ]
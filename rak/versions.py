@@ -0,0 +1,168 @@
+"""
+Version counters used as cheap HTTP validators.
+
+Each counter names the data a group of endpoints renders: `raks` covers RAKs
+and everything embedded in them (claims, collaborators, pay-it-forwards,
+author usernames), `raks:<status>` the same for the public RAKs in one status
+(the unclaimed and claimed lists), `profiles` the aura point leaderboards, and
+`follows:<user id>` whom a user follows (feed and explore pages), and
+`timeline:<user id>` the entries of a user's home timeline, which the
+background jobs in `rak.timeline` write after the RAK was saved. The
+receivers in `rak.signals` bump them on every save / delete; `bump_raks()`
+and `bump_rak()` pick the status counters a RAK change shows in.
+
+`conditional(...)` wraps an `APIView` method (sync or async) so a request
+whose `If-None-Match` / `If-Modified-Since` matches the current counters gets
+a `304 Not Modified` without running the list query or the serializer.
+"""
+
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.db.models import F
+from django.utils import timezone
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+
+from rak.models import RandomActOfKindness, ResourceVersion
+
+RAKS = "raks"
+RAK_LIST = "raks:{status}"
+# Statuses with a public list of their own
+RAK_LIST_STATUSES = ("open", "in progress")
+PROFILES = "profiles"
+FOLLOWS = "follows:{user}"
+TIMELINE = "timeline:{user}"
+
+
+def bump(*names):
+    """Advance the named counters, creating them on first use."""
+    names = set(names)
+    now = timezone.now()
+    updated = ResourceVersion.objects.filter(name__in=names).update(
+        version=F("version") + 1, updated_at=now
+    )
+    if updated < len(names):
+        # Create the new ones. A row that already exists was just bumped, or
+        # was created concurrently: either way its version is not 0 any more.
+        ResourceVersion.objects.bulk_create(
+            [ResourceVersion(name=name, version=1, updated_at=now) for name in names],
+            ignore_conflicts=True,
+        )
+
+
+def follows(user_id):
+    return FOLLOWS.format(user=user_id)
+
+
+def timeline(user_id):
+    return TIMELINE.format(user=user_id)
+
+
+def rak_list(status):
+    return RAK_LIST.format(status=status)
+
+
+def bump_raks(statuses=RAK_LIST_STATUSES):
+    """
+    Bump `raks` and the list counters of `statuses`, the statuses the changed
+    public RAKs had before and after the change (every list by default).
+    """
+    lists = {rak_list(status) for status in statuses if status in RAK_LIST_STATUSES}
+    bump(RAKS, *sorted(lists))
+
+
+def bump_rak(rak_id):
+    """`bump_raks()` for a change to what the RAK `rak_id` embeds."""
+    row = (
+        RandomActOfKindness.objects.filter(pk=rak_id)
+        .values_list("status", "private")
+        .first()
+    )
+    if row is None:
+        bump_raks()
+    else:
+        status, private = row
+        bump_raks(() if private else (status,))
+
+
+def current(request, names):
+    """
+    Map each counter name to its `(version, updated_at)`, reading every
+    counter at most once per request. Unknown counters are `(0, None)`.
+    """
+    known = getattr(request, "_resource_versions", None)
+    if known is None:
+        known = request._resource_versions = {}
+    missing = [name for name in names if name not in known]
+    if missing:
+        rows = ResourceVersion.objects.filter(name__in=missing).values_list(
+            "name", "version", "updated_at"
+        )
+        found = {name: (version, updated_at) for name, version, updated_at in rows}
+        for name in missing:
+            known[name] = found.get(name, (0, None))
+    return {name: known[name] for name in names}
+
+
+def _resolve(request, names):
+    """Return `(etag, last_modified)` for the request."""
+    user_id = request.user.pk if request.user.is_authenticated else None
+    counters = current(request, [name.format(user=user_id) for name in names])
+
+    parts = [f"{name}.{version}" for name, (version, _) in counters.items()]
+    if user_id is not None:
+        # Authenticated responses may differ per user; never share validators.
+        parts.append(f"u{user_id}")
+    modified = [updated_at for _, updated_at in counters.values()]
+    # A counter that was never bumped has no modification time.
+    last_modified = None if None in modified else max(modified)
+    return "-".join(parts), last_modified
+
+
+def conditional(*names, public=False):
+    """
+    Decorate an `APIView` `get` so it honours conditional requests against
+    the named counters (`{user}` is replaced by the requesting user's id).
+
+    Responses always revalidate (`no-cache`), are `public` only for
+    anonymous-friendly endpoints and `Vary` on `Authorization`.
+    """
+
+    def etag_func(request, *args, **kwargs):
+        return _resolve(request, names)[0]
+
+    def last_modified_func(request, *args, **kwargs):
+        return _resolve(request, names)[1]
+
+    check = method_decorator(condition(etag_func, last_modified_func))
+
+    def patch(response):
+        patch_cache_control(
+            response, no_cache=True, **{"public" if public else "private": True}
+        )
+        patch_vary_headers(response, ["Authorization"])
+        return response
+
+    def decorator(view_method):
+        conditional_method = check(view_method)
+
+        if iscoroutinefunction(view_method):
+
+            @wraps(view_method)
+            async def async_wrapper(self, request, *args, **kwargs):
+                # Load the counters off the event loop; the checks then read
+                # them from the per-request cache without querying.
+                await sync_to_async(_resolve)(request, names)
+                return patch(await conditional_method(self, request, *args, **kwargs))
+
+            return async_wrapper
+
+        @wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            return patch(conditional_method(self, request, *args, **kwargs))
+
+        return wrapper
+
+    return decorator
@@ -1,22 +1,43 @@
-from django.shortcuts import get_object_or_404
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.db.models import Q
+from django.http import JsonResponse, StreamingHttpResponse
+from django.shortcuts import aget_object_or_404, get_object_or_404
+from django.views import View
 from django.contrib.auth import get_user_model
 from rest_framework.views import APIView
 from rest_framework import permissions, status
 from rest_framework.response import Response
 from rest_framework.exceptions import PermissionDenied
 
+from core import batch
+from core.async_views import AsyncAPIView, gather_queries
+from core.optimization import optimize_queryset
+from core.serializers import sparse_fieldset
+from rak import bulk, notifications, response_cache, streams, timeline, versions
 from rak.choices import POST_TYPE_CHOICES
 
 from .models import (
     RandomActOfKindness,
     Claimant,
+    Notification,
     PayItForward,
+    TimelineEntry,
 )
 from rak.serializers import (
     RandomActOfKindnessSerializer,
     ClaimantSerializer,
     CollaboratorsSerializer,
+    NotificationSerializer,
+    NotificationBulkActionSerializer,
+    RAKBulkActionSerializer,
 )
+from rak.pagination import (
+    NotificationPagination,
+    RAKCursorPagination,
+    TimelinePagination,
+)
+from users.leaderboard import leaderboard
 from users.models import UserProfile
 from users.serializers import UserProfileSerializer, CustomUserSerializer
 
@@ -61,7 +82,7 @@ class RandomActOfKindnessCreateView(APIView):
 
 
 # Update a RAK post (edit an existing post)
-class RandomActOfKindnessUpdateView(APIView):
+class RandomActOfKindnessUpdateView(AsyncAPIView):
     """
     Retrieve or update an existing RAK post.
 
@@ -78,6 +99,10 @@ class RandomActOfKindnessUpdateView(APIView):
     **URL Parameters:**
     - `pk`: ID of the RAK post.
 
+    **Query Parameters (GET):**
+    - `fields`: Comma-separated field names, optional. Limits the RAK to these fields.
+    - `expand`: Comma-separated, optional. Adds `claims` / `collabs` back when `fields` is given.
+
     **Functionality:**
     - Update a RAK post (edit an existing post).
     - Delete a RAK post.
@@ -88,9 +113,17 @@ class RandomActOfKindnessUpdateView(APIView):
     def get_object(self, pk):
         return get_object_or_404(RandomActOfKindness, pk=pk)
 
-    def get(self, request, pk):
-        rak = self.get_object(pk)
-        serializer = RandomActOfKindnessSerializer(rak)
+    @versions.conditional(versions.RAKS)
+    async def get(self, request, pk):
+        fieldset = sparse_fieldset(request)
+        rak = await aget_object_or_404(
+            optimize_queryset(
+                RandomActOfKindness.objects.all(),
+                RandomActOfKindnessSerializer(**fieldset),
+            ),
+            pk=pk,
+        )
+        serializer = RandomActOfKindnessSerializer(rak, **fieldset)
         return Response(serializer.data)
 
     def put(self, request, pk):
@@ -124,8 +157,60 @@ class RandomActOfKindnessUpdateView(APIView):
         return Response({"detail": "RAK deleted."}, status=status.HTTP_204_NO_CONTENT)
 
 
+# Fetch many RAK posts at once
+class RAKBatchView(AsyncAPIView):
+    """
+    Retrieve several RAK posts in one request.
+
+    **Endpoint:** `/rak/batch/`
+
+    **Method:** `GET`
+
+    **Permissions:** Authenticated users only.
+
+    **Query Parameters:**
+    - `ids`: Comma-separated RAK IDs, required. At most `MAX_BATCH_IDS` (200).
+    - `fields`: Comma-separated field names, optional. Limits each RAK to these fields.
+    - `expand`: Comma-separated, optional. Adds `claims` / `collabs` back when `fields` is given.
+
+    **Functionality:**
+    - Returns one result per requested ID, in request order, with `status`
+      200 and the RAK as `data`, 404 if it does not exist, or 403 if it is
+      private and posted by someone else (see `core.batch`).
+    - Loads every RAK with the same fixed number of queries as one.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    @versions.conditional(versions.RAKS)
+    async def get(self, request):
+        ids = batch.parse_ids(request)
+        fieldset = sparse_fieldset(request)
+        raks = optimize_queryset(
+            RandomActOfKindness.objects.filter(pk__in=ids),
+            RandomActOfKindnessSerializer(**fieldset),
+            extra_fields=("private", "created_by"),
+        )
+        found = {rak.pk: rak async for rak in raks}
+        forbidden = {
+            pk
+            for pk, rak in found.items()
+            if rak.private and rak.created_by_id != request.user.id
+        }
+        return Response(
+            batch.batch_results(
+                ids,
+                found,
+                lambda raks: RandomActOfKindnessSerializer(
+                    raks, many=True, **fieldset
+                ).data,
+                forbidden,
+            )
+        )
+
+
 # Get all unclaimed RAK posts
-class UnclaimedRAKListView(APIView):
+class UnclaimedRAKListView(AsyncAPIView):
     """
     List all unclaimed and public RAK posts.
 
@@ -135,20 +220,39 @@ class UnclaimedRAKListView(APIView):
 
     **Permissions:** Allow any user.
 
+    **Query Parameters:**
+    - `cursor`: Opaque cursor taken from the `next` link of the previous page.
+    - `page_size`: Integer, optional. Defaults to 20, capped at 100.
+    - `fields`: Comma-separated field names, optional. Limits each RAK to these fields.
+    - `expand`: Comma-separated, optional. Adds `claims` / `collabs` back when `fields` is given.
+
     **Functionality:**
     - View all unclaimed RAK posts.
+    - Results are returned newest first in cursor-paginated pages.
+    - Answers `If-None-Match` / `If-Modified-Since` with 304 while no listed RAK changed.
+    - Pages are served from `rak.response_cache` until a listed RAK changes.
     """
 
     permission_classes = [permissions.AllowAny]
 
-    def get(self, request):
-        raks = RandomActOfKindness.objects.filter(status="open", private=False)
-        serializer = RandomActOfKindnessSerializer(raks, many=True)
-        return Response(serializer.data)
+    def get_queryset(self):
+        return RandomActOfKindness.objects.filter(status="open", private=False)
+
+    @versions.conditional(versions.rak_list("open"), public=True)
+    @response_cache.cached_response(versions.rak_list("open"))
+    async def get(self, request):
+        fieldset = sparse_fieldset(request)
+        raks = optimize_queryset(
+            self.get_queryset(), RandomActOfKindnessSerializer(**fieldset)
+        )
+        paginator = RAKCursorPagination()
+        page = await paginator.apaginate_queryset(raks, request, view=self)
+        serializer = RandomActOfKindnessSerializer(page, many=True, **fieldset)
+        return paginator.get_paginated_response(serializer.data)
 
 
 # View all claimed RAK posts
-class ClaimedRAKListView(APIView):
+class ClaimedRAKListView(AsyncAPIView):
     """
     List all claimed and public RAK posts.
 
@@ -158,18 +262,37 @@ class ClaimedRAKListView(APIView):
 
     **Permissions:** Allow any user.
 
+    **Query Parameters:**
+    - `cursor`: Opaque cursor taken from the `next` link of the previous page.
+    - `page_size`: Integer, optional. Defaults to 20, capped at 100.
+    - `fields`: Comma-separated field names, optional. Limits each RAK to these fields.
+    - `expand`: Comma-separated, optional. Adds `claims` / `collabs` back when `fields` is given.
+
     **Functionality:**
     - View all claimed RAK posts.
+    - Results are returned newest first in cursor-paginated pages.
+    - Answers `If-None-Match` / `If-Modified-Since` with 304 while no listed RAK changed.
+    - Pages are served from `rak.response_cache` until a listed RAK changes.
     """
 
     permission_classes = [permissions.AllowAny]
 
-    def get(self, request):
-        raks = RandomActOfKindness.objects.filter(
-            status="in progress", private=False, claims__isnull=False
-        ).distinct()
-        serializer = RandomActOfKindnessSerializer(raks, many=True)
-        return Response(serializer.data)
+    def get_queryset(self):
+        return RandomActOfKindness.objects.filter(
+            status="in progress", private=False, claim_count__gt=0
+        )
+
+    @versions.conditional(versions.rak_list("in progress"), public=True)
+    @response_cache.cached_response(versions.rak_list("in progress"))
+    async def get(self, request):
+        fieldset = sparse_fieldset(request)
+        raks = optimize_queryset(
+            self.get_queryset(), RandomActOfKindnessSerializer(**fieldset)
+        )
+        paginator = RAKCursorPagination()
+        page = await paginator.apaginate_queryset(raks, request, view=self)
+        serializer = RandomActOfKindnessSerializer(page, many=True, **fieldset)
+        return paginator.get_paginated_response(serializer.data)
 
 
 class RAKClaimView(APIView):
@@ -184,7 +307,10 @@ class RAKClaimView(APIView):
             # Try to claim the RAK
             rak.claim_rak(request.user, comment=comment, anonymous_claimant=anonymous)
 
-            # Return the updated RAK
+            # Return the updated RAK, loaded in a fixed number of queries
+            rak = optimize_queryset(
+                RandomActOfKindness.objects.all(), RandomActOfKindnessSerializer
+            ).get(pk=rak.pk)
             serializer = RandomActOfKindnessSerializer(rak)
             return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -287,6 +413,7 @@ class RAKStatusUpdateView(APIView):
     **Functionality:**
     - Change the status of a RAK post.
     - Award aura points to the claimant(s) and collaborators once the RAK is completed.
+    - Completed is final; updating a completed RAK returns 409 Conflict.
     """
 
     permission_classes = [permissions.IsAuthenticated]
@@ -322,19 +449,59 @@ class RAKStatusUpdateView(APIView):
                     status=status.HTTP_403_FORBIDDEN,
                 )
 
+        # Compare-and-swap, so concurrent updates cannot complete a RAK twice
+        if not rak.transition(new_status):
+            return Response(
+                {"detail": "This RAK has already been completed."},
+                status=status.HTTP_409_CONFLICT,
+            )
+
         # If new status is "completed", perform additional actions
         if new_status == "completed":
-            rak.complete_rak()
             rak.send_notification(
                 message=f"RAK '{rak.title}' has been marked as completed. YAY!"
             )
-        else:
-            rak.status = new_status
-            rak.save()
 
         return Response({"detail": "RAK status updated."}, status=status.HTTP_200_OK)
 
 
+# Claim or change the status of many RAK posts at once
+class RAKBulkActionView(APIView):
+    """
+    Claim RAK posts and change their status in bulk.
+
+    **Endpoint:** `/rak/bulk/`
+
+    **Method:** `POST`
+
+    **Permissions:** Authenticated users only. Each item is checked like its
+    single-item endpoint (`RAKClaimView`, `RAKStatusUpdateView`).
+
+    **Request Body:**
+    - `items`: List, required. At most `MAX_BATCH_IDS` (200) items, one per RAK, each with:
+      - `rak_id`: Integer, required.
+      - `action`: String, required. `claim`, or the new status: one of ['open', 'in progress', 'completed'].
+      - `comment`: String, optional. Claim comment.
+      - `anonymous`: Boolean, optional. Claim anonymously.
+
+    **Functionality:**
+    - Checks every item against the RAKs and the user's claims loaded in two queries.
+    - Applies the valid items in one transaction; rejected items change nothing.
+    - Returns one result per item, in request order, with the `status` the
+      single-item endpoint would have answered (200, 400, 403, 404 or 409)
+      and a `detail` message (see `rak.bulk`).
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        serializer = RAKBulkActionSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        results = bulk.apply(request.user, serializer.validated_data["items"])
+        return Response({"results": results}, status=status.HTTP_200_OK)
+
+
 # Create a Pay It Forward instance
 class CreatePayItForwardView(APIView):
     """
@@ -369,8 +536,10 @@ class CreatePayItForwardView(APIView):
         data = request.data.copy()
         serializer = RandomActOfKindnessSerializer(data=data)
         if serializer.is_valid():
-            new_rak = serializer.save(created_by=request.user)
-            PayItForward.objects.create(original_rak=original_rak, new_rak=new_rak)
+            with transaction.atomic():
+                new_rak = serializer.save(created_by=request.user)
+                PayItForward.objects.create(original_rak=original_rak, new_rak=new_rak)
+                original_rak.increment_counter("pay_it_forward_count")
             return Response(
                 {"detail": "Pay It Forward created.", "new_rak_id": new_rak.id},
                 status=status.HTTP_201_CREATED,
@@ -397,7 +566,7 @@ class AllClaimsView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
-        claims = Claimant.objects.all()
+        claims = optimize_queryset(Claimant.objects.all(), ClaimantSerializer)
         serializer = ClaimantSerializer(claims, many=True)
         return Response(serializer.data)
 
@@ -424,7 +593,7 @@ class RAKClaimantsView(APIView):
 
     def get(self, request, pk):
         rak = get_object_or_404(RandomActOfKindness, pk=pk)
-        claimants = rak.claims.all()
+        claimants = optimize_queryset(rak.claims.all(), ClaimantSerializer)
         serializer = ClaimantSerializer(claimants, many=True)
         return Response(serializer.data)
 
@@ -451,7 +620,7 @@ class RAKCollaboratorsView(APIView):
 
     def get(self, request, pk):
         rak = get_object_or_404(RandomActOfKindness, pk=pk)
-        collaborators = rak.collabs.all()
+        collaborators = optimize_queryset(rak.collabs.all(), CollaboratorsSerializer)
         serializer = CollaboratorsSerializer(collaborators, many=True)
         return Response(serializer.data)
 
@@ -515,7 +684,7 @@ class UserAuraPointsView(APIView):
 
 
 # Display a leaderboard of users based on aura points
-class AuraPointsLeaderboardView(APIView):
+class AuraPointsLeaderboardView(AsyncAPIView):
     """
     Display a leaderboard of users based on aura points.
 
@@ -525,17 +694,39 @@ class AuraPointsLeaderboardView(APIView):
 
     **Permissions:** Allow any user.
 
+    **Query Parameters:**
+    - `fields`: Comma-separated field names, optional. Limits each profile to these fields.
+    - `expand`: Comma-separated, optional. Adds `user` back when `fields` is given.
+
     **Functionality:**
     - Display a leaderboard of users based on aura points.
+    - The top 10 come from the in-process ranking in `users.leaderboard`.
+    - Answers `If-None-Match` / `If-Modified-Since` with 304 while no profile changed.
     - Assign colors to different aura levels (handled in serializers or frontend).
     - Award badges based on aura levels, displayed on the profile.
     """
 
     permission_classes = [permissions.AllowAny]
 
-    def get(self, request):
-        user_profiles = UserProfile.objects.order_by("-aura_points")[:10]
-        serializer = UserProfileSerializer(user_profiles, many=True)
+    @versions.conditional(versions.PROFILES, public=True)
+    async def get(self, request):
+        fieldset = sparse_fieldset(request)
+        top = await sync_to_async(leaderboard.top)(10)
+        user_ids = [user_id for _, user_id, _ in top]
+        user_profiles = await optimize_queryset(
+            UserProfile.objects.all(),
+            UserProfileSerializer(**fieldset),
+            extra_fields=["user"],
+        ).ain_bulk(user_ids, field_name="user_id")
+        serializer = UserProfileSerializer(
+            [
+                user_profiles[user_id]
+                for user_id in user_ids
+                if user_id in user_profiles
+            ],
+            many=True,
+            **fieldset,
+        )
         return Response(serializer.data)
 
 
@@ -664,24 +855,55 @@ class UserFeedView(APIView):
 
     **Permissions:** Authenticated users only.
 
+    **Query Parameters:**
+    - `cursor`: Opaque cursor taken from the `next` link of the previous page.
+    - `page_size`: Integer, optional. Defaults to 20, capped at 100.
+    - `fields`: Comma-separated field names, optional. Limits each RAK to these fields.
+    - `expand`: Comma-separated, optional. Adds `claims` / `collabs` back when `fields` is given.
+
     **Functionality:**
     - Display a curated feed of followed users.
+    - Reads the user's materialised timeline (see `rak.timeline`); RAKs from
+      followed accounts too large to fan out are merged in at read time.
+    - Results are returned newest first in cursor-paginated pages.
     """
 
     permission_classes = [permissions.IsAuthenticated]
 
+    @versions.conditional(versions.RAKS, versions.FOLLOWS, versions.TIMELINE)
     def get(self, request):
         user = request.user
-        following_users = user.userprofile.following.values_list("user", flat=True)
-        raks = RandomActOfKindness.objects.filter(
-            created_by__in=following_users
-        ).exclude(private=True)
-        serializer = RandomActOfKindnessSerializer(raks, many=True)
-        return Response(serializer.data)
+        fieldset = sparse_fieldset(request)
+        pull_author_ids = timeline.pull_author_ids(user)
+
+        if pull_author_ids:
+            raks = RandomActOfKindness.objects.filter(
+                Q(pk__in=TimelineEntry.objects.filter(user=user).values("rak_id"))
+                | Q(created_by__in=pull_author_ids),
+                private=False,
+            )
+            raks = optimize_queryset(raks, RandomActOfKindnessSerializer(**fieldset))
+            paginator = RAKCursorPagination()
+            page = paginator.paginate_queryset(raks, request, view=self)
+        else:
+            paginator = TimelinePagination()
+            entries = paginator.paginate_queryset(
+                TimelineEntry.objects.filter(user=user), request, view=self
+            )
+            raks = optimize_queryset(
+                RandomActOfKindness.objects.filter(
+                    pk__in=[entry.rak_id for entry in entries]
+                ),
+                RandomActOfKindnessSerializer(**fieldset),
+            ).in_bulk()
+            page = [raks[entry.rak_id] for entry in entries if entry.rak_id in raks]
+
+        serializer = RandomActOfKindnessSerializer(page, many=True, **fieldset)
+        return paginator.get_paginated_response(serializer.data)
 
 
 # Explore page: View RAKs from people I don't follow
-class ExploreRAKView(APIView):
+class ExploreRAKView(AsyncAPIView):
     """
     Display RAKs from users the current user does not follow.
 
@@ -691,83 +913,146 @@ class ExploreRAKView(APIView):
 
     **Permissions:** Authenticated users only.
 
+    **Query Parameters:**
+    - `cursor`: Opaque cursor taken from the `next` link of the previous page.
+    - `page_size`: Integer, optional. Defaults to 20, capped at 100.
+    - `fields`: Comma-separated field names, optional. Limits each RAK to these fields.
+    - `expand`: Comma-separated, optional. Adds `claims` / `collabs` back when `fields` is given.
+
     **Functionality:**
     - View an explore page with RAKs from people the user doesn’t follow.
+    - Results are returned newest first in cursor-paginated pages.
     """
 
     permission_classes = [permissions.IsAuthenticated]
 
-    def get(self, request):
-        user = request.user
-        following_users = user.userprofile.following.values_list("user", flat=True)
-        raks = (
+    def get_queryset(self):
+        user = self.request.user
+        following_users = user.following.values_list("followed", flat=True)
+        return (
             RandomActOfKindness.objects.exclude(created_by__in=following_users)
             .exclude(created_by=user)
             .exclude(private=True)
         )
-        serializer = RandomActOfKindnessSerializer(raks, many=True)
-        return Response(serializer.data)
 
+    @versions.conditional(versions.RAKS, versions.FOLLOWS)
+    async def get(self, request):
+        fieldset = sparse_fieldset(request)
+        raks = optimize_queryset(
+            self.get_queryset(), RandomActOfKindnessSerializer(**fieldset)
+        )
+        paginator = RAKCursorPagination()
+        page = await paginator.apaginate_queryset(raks, request, view=self)
+        serializer = RandomActOfKindnessSerializer(page, many=True, **fieldset)
+        return paginator.get_paginated_response(serializer.data)
 
-class AllRAKListView(APIView):
+
+class AllRAKListView(AsyncAPIView):
     """
     List all Random Acts of Kindness (RAKs).
+    Results are cursor-paginated, newest first (see `RAKCursorPagination`).
+    Conditional GETs are answered with 304 while no RAK changed (see `rak.versions`)
+    and pages are served from `rak.response_cache` until a RAK event invalidates them.
+    `?fields=` / `?expand=` select a sparse fieldset (see `core.serializers`).
     """
 
     permission_classes = [permissions.AllowAny]  # Make it public or restrict as needed
 
-    def get(self, request):
-        raks = RandomActOfKindness.objects.all()  # Query all RAKs
-        serializer = RandomActOfKindnessSerializer(raks, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+    def get_queryset(self):
+        return RandomActOfKindness.objects.all()  # Query all RAKs
+
+    @versions.conditional(versions.RAKS, public=True)
+    @response_cache.cached_response(versions.RAKS)
+    async def get(self, request):
+        fieldset = sparse_fieldset(request)
+        raks = optimize_queryset(
+            self.get_queryset(), RandomActOfKindnessSerializer(**fieldset)
+        )
+        paginator = RAKCursorPagination()
+        page = await paginator.apaginate_queryset(raks, request, view=self)
+        serializer = RandomActOfKindnessSerializer(page, many=True, **fieldset)
+        return paginator.get_paginated_response(serializer.data)
 
 
-class MyClaimedRAKListView(APIView):
+class MyClaimedRAKListView(AsyncAPIView):
     """
     List all Random Acts of Kindness (RAKs) the user has claimed.
+    Results are cursor-paginated, newest first (see `RAKCursorPagination`).
+    `?fields=` / `?expand=` select a sparse fieldset (see `core.serializers`).
     """
 
     permission_classes = [permissions.IsAuthenticated]
 
-    def get(self, request):
-        # Get the RAKs where the user is a claimant
-        claimed_raks = RandomActOfKindness.objects.filter(
-            claims__claimer=request.user
-        ).distinct()
-        serializer = RandomActOfKindnessSerializer(claimed_raks, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+    def get_queryset(self):
+        # Get the RAKs where the user is a claimant (a semi-join, so no DISTINCT)
+        return RandomActOfKindness.objects.filter(
+            pk__in=Claimant.objects.filter(claimer=self.request.user).values("rak_id")
+        )
+
+    @versions.conditional(versions.RAKS)
+    async def get(self, request):
+        fieldset = sparse_fieldset(request)
+        claimed_raks = optimize_queryset(
+            self.get_queryset(), RandomActOfKindnessSerializer(**fieldset)
+        )
+        paginator = RAKCursorPagination()
+        page = await paginator.apaginate_queryset(claimed_raks, request, view=self)
+        serializer = RandomActOfKindnessSerializer(page, many=True, **fieldset)
+        return paginator.get_paginated_response(serializer.data)
 
 
-class MyCompletedRequestRAKListView(APIView):
+class MyCompletedRequestRAKListView(AsyncAPIView):
     """
     List all Random Acts of Kindness (RAKs) posted by the user that are of type 'request' and have status 'completed'.
+    Results are cursor-paginated, newest first (see `RAKCursorPagination`).
+    `?fields=` / `?expand=` select a sparse fieldset (see `core.serializers`).
     """
 
     permission_classes = [permissions.IsAuthenticated]
 
-    def get(self, request):
+    def get_queryset(self):
         # Get the RAKs created by the user with type 'request' and status 'completed'
-        completed_request_raks = RandomActOfKindness.objects.filter(
-            created_by=request.user, rak_type="request", status="completed"
+        return RandomActOfKindness.objects.filter(
+            created_by=self.request.user, rak_type="request", status="completed"
+        )
+
+    @versions.conditional(versions.RAKS)
+    async def get(self, request):
+        fieldset = sparse_fieldset(request)
+        completed_request_raks = optimize_queryset(
+            self.get_queryset(), RandomActOfKindnessSerializer(**fieldset)
+        )
+        paginator = RAKCursorPagination()
+        page = await paginator.apaginate_queryset(
+            completed_request_raks, request, view=self
         )
-        # Serialize the filtered RAKs
-        serializer = RandomActOfKindnessSerializer(completed_request_raks, many=True)
-        # Return the serialized data in the response
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        serializer = RandomActOfKindnessSerializer(page, many=True, **fieldset)
+        return paginator.get_paginated_response(serializer.data)
 
 
-class MyPostedRAKListView(APIView):
+class MyPostedRAKListView(AsyncAPIView):
     """
     List all Random Acts of Kindness (RAKs) posted by the user.
+    Results are cursor-paginated, newest first (see `RAKCursorPagination`).
+    `?fields=` / `?expand=` select a sparse fieldset (see `core.serializers`).
     """
 
     permission_classes = [permissions.IsAuthenticated]
 
-    def get(self, request):
+    def get_queryset(self):
         # Get the RAKs created by the user
-        posted_raks = RandomActOfKindness.objects.filter(created_by=request.user)
-        serializer = RandomActOfKindnessSerializer(posted_raks, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return RandomActOfKindness.objects.filter(created_by=self.request.user)
+
+    @versions.conditional(versions.RAKS)
+    async def get(self, request):
+        fieldset = sparse_fieldset(request)
+        posted_raks = optimize_queryset(
+            self.get_queryset(), RandomActOfKindnessSerializer(**fieldset)
+        )
+        paginator = RAKCursorPagination()
+        page = await paginator.apaginate_queryset(posted_raks, request, view=self)
+        serializer = RandomActOfKindnessSerializer(page, many=True, **fieldset)
+        return paginator.get_paginated_response(serializer.data)
 
 
 # Display how a user’s aura points are calculated
@@ -816,6 +1101,10 @@ class UserProfileUpdateView(APIView):
 
     **Permissions:** Authenticated users only.
 
+    **Query Parameters (GET):**
+    - `fields`: Comma-separated field names, optional. Limits the profile to these fields.
+    - `expand`: Comma-separated, optional. Adds `user` back when `fields` is given.
+
     **Functionality:**
     - Add profile details: profile picture, bio, etc.
     - Allow users to create and manage posts (handled elsewhere).
@@ -825,7 +1114,7 @@ class UserProfileUpdateView(APIView):
 
     def get(self, request):
         profile = request.user.userprofile
-        serializer = UserProfileSerializer(profile)
+        serializer = UserProfileSerializer(profile, **sparse_fieldset(request))
         return Response(serializer.data)
 
     def put(self, request):
@@ -869,3 +1158,202 @@ class UserDeleteView(APIView):
         return Response(
             {"detail": "User account deactivated."}, status=status.HTTP_204_NO_CONTENT
         )
+
+
+class RAKListCacheStatsView(APIView):
+    """
+    Report how the public RAK list response cache is doing.
+
+    **Endpoint:** `/rak/cache-stats/`
+
+    **Methods:**
+    - `GET`: Hits, misses, hit rate and invalidation count per list counter.
+    - `DELETE`: Reset the hit / miss counters.
+
+    **Permissions:** Admin users only.
+
+    **Functionality:**
+    - Shows the effectiveness of `rak.response_cache`.
+    """
+
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(response_cache.stats())
+
+    def delete(self, request):
+        response_cache.reset_stats()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+# Notification inbox
+class NotificationInboxView(AsyncAPIView):
+    """
+    List the user's notifications, newest first.
+    Results are cursor-paginated (see `NotificationPagination`).
+
+    **Endpoint:** `/rak/notifications/`
+
+    **Method:** `GET`
+
+    **Permissions:** Authenticated users only.
+
+    **Query Parameters:**
+    - `unread`: `true` to list unread notifications only.
+    - `cursor`: Opaque cursor taken from the `next` link of the previous page.
+    - `page_size`: Integer, optional. Defaults to 20, capped at 100.
+
+    **Functionality:**
+    - Page through the inbox; the response also carries `unread_count`.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        inbox = Notification.objects.filter(recipient=self.request.user)
+        if self.request.query_params.get("unread") == "true":
+            inbox = inbox.filter(is_read=False)
+        return inbox
+
+    async def get(self, request):
+        inbox = optimize_queryset(self.get_queryset(), NotificationSerializer)
+        paginator = NotificationPagination()
+        # The page and the unread count are independent; fetch both at once
+        page, unread_count = await gather_queries(
+            lambda: paginator.paginate_queryset(inbox, request, view=self),
+            lambda: notifications.unread_count(request.user),
+        )
+        serializer = NotificationSerializer(page, many=True)
+        response = paginator.get_paginated_response(serializer.data)
+        response.data["unread_count"] = unread_count
+        return response
+
+
+class NotificationUnreadCountView(APIView):
+    """
+    Return the user's unread notification count.
+
+    **Endpoint:** `/rak/notifications/unread-count/`
+
+    **Method:** `GET`
+
+    **Permissions:** Authenticated users only.
+
+    **Functionality:**
+    - Cheap to poll: reads a counter kept up to date by `rak.notifications`.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        return Response({"unread_count": notifications.unread_count(request.user)})
+
+
+class NotificationMarkReadView(APIView):
+    """
+    Mark notifications as read in bulk.
+
+    **Endpoint:** `/rak/notifications/mark-read/`
+
+    **Method:** `POST`
+
+    **Permissions:** Authenticated users only.
+
+    **Request Body:**
+    - `ids`: List of notification IDs, or
+    - `all`: `true` to mark the whole inbox as read.
+
+    **Functionality:**
+    - One UPDATE however many notifications are targeted.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        serializer = NotificationBulkActionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        updated = notifications.mark_read(
+            request.user, serializer.validated_data.get("ids")
+        )
+        return Response(
+            {
+                "updated": updated,
+                "unread_count": notifications.unread_count(request.user),
+            }
+        )
+
+
+class NotificationDeleteView(APIView):
+    """
+    Delete notifications in bulk.
+
+    **Endpoint:** `/rak/notifications/delete/`
+
+    **Method:** `POST`
+
+    **Permissions:** Authenticated users only.
+
+    **Request Body:**
+    - `ids`: List of notification IDs, or
+    - `all`: `true` to empty the inbox.
+
+    **Functionality:**
+    - Set-based DELETEs however many notifications are targeted.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        serializer = NotificationBulkActionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        deleted = notifications.delete(
+            request.user, serializer.validated_data.get("ids")
+        )
+        return Response(
+            {
+                "deleted": deleted,
+                "unread_count": notifications.unread_count(request.user),
+            }
+        )
+
+
+# Live event stream
+class EventStreamView(View):
+    """
+    Push the user's notifications and RAK status changes as server-sent events.
+
+    **Endpoint:** `/rak/stream/`
+
+    **Method:** `GET`
+
+    **Permissions:** Authenticated users only, with `Authorization: Token <key>`
+    or `?token=<key>` (browsers' `EventSource` cannot send headers).
+
+    **Functionality:**
+    - `notification` events for new notifications; the event id is the
+      notification id, and reconnecting with `Last-Event-ID` replays missed ones.
+    - `status` events when a RAK the user posted, claimed or collaborates on
+      changes status.
+    - Async: idle streams hold no thread or database connection. Needs an
+      ASGI server (see `rak.streams`).
+    """
+
+    async def get(self, request):
+        user_id = await streams.authenticate(request)
+        if user_id is None:
+            return JsonResponse(
+                {"detail": "Authentication credentials were not provided."},
+                status=status.HTTP_401_UNAUTHORIZED,
+            )
+        try:
+            last_event_id = int(request.headers["Last-Event-ID"])
+        except (KeyError, ValueError):
+            last_event_id = None
+
+        response = StreamingHttpResponse(
+            streams.stream(user_id, last_event_id), content_type="text/event-stream"
+        )
+        response["Cache-Control"] = "no-cache"
+        # Stop nginx-style proxies from buffering the stream
+        response["X-Accel-Buffering"] = "no"
+        return response
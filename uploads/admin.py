@@ -0,0 +1,15 @@
+# uploads/admin.py
+
+from django.contrib import admin
+from .models import MediaBlob, Upload
+
+
+@admin.register(Upload)
+class UploadAdmin(admin.ModelAdmin):
+    list_display = ("id", "owner", "filename", "offset", "size", "updated_at")
+
+
+@admin.register(MediaBlob)
+class MediaBlobAdmin(admin.ModelAdmin):
+    list_display = ("name", "size", "ref_count", "unreferenced_at", "created_at")
+    readonly_fields = ("digest", "name", "size", "ref_count", "unreferenced_at")
@@ -0,0 +1,11 @@
+# uploads/apps.py
+
+from django.apps import AppConfig
+
+
+class UploadsConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "uploads"
+
+    def ready(self):
+        import uploads.signals  # Image variants and blob reference counts
@@ -0,0 +1,195 @@
+"""
+Reference counts and garbage collection of media blobs (`uploads.storage`).
+
+`FIELDS` are the file fields stored as blobs. `uploads.signals` keeps
+`MediaBlob.ref_count` current as their rows are saved and deleted: replacing
+a profile image or deleting a RAK releases the old blob, and a blob left
+with no references is stamped with `unreferenced_at`.
+
+`collect()` (the `gc_media` command) deletes blobs unreferenced for longer
+than `MEDIA_GC_GRACE_HOURS`, a batch per transaction in id order, so it can
+be stopped at any point and resumed after the last id it reported. Writes
+that bypass signals (`QuerySet.update()`, raw SQL) leave counts wrong, so it
+checks the fields themselves before deleting anything: a blob a row still
+names is never deleted. `recount()` rebuilds the counts from the fields.
+
+A blob's file is written when it is saved, but its row commits with the
+caller's transaction; if that rolls back, the file is left without a row.
+`sweep()` deletes such files (and temporary files of interrupted saves)
+once they are older than the grace period. Storage refreshes the time of a
+file it reuses, so a file about to get a row again is never that old.
+"""
+
+import os
+import time
+from collections import Counter
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, Count, F, Value, When
+from django.utils import timezone
+
+from uploads.models import MediaBlob
+from uploads.storage import BLOBS_DIR, get_blob_storage
+
+MEDIA_GC_GRACE_HOURS = getattr(settings, "MEDIA_GC_GRACE_HOURS", 24)
+MEDIA_GC_BATCH_SIZE = getattr(settings, "MEDIA_GC_BATCH_SIZE", 500)
+
+# The blob file field of each model
+FIELDS = {
+    "rak.randomactofkindness": "media",
+    "users.userprofile": "profile_image",
+}
+
+
+def retain(name):
+    """Count a new reference to the blob `name`, if it is one."""
+    if name:
+        MediaBlob.objects.filter(name=name).update(
+            ref_count=F("ref_count") + 1, unreferenced_at=None
+        )
+
+
+def release(name):
+    """Drop a reference to the blob `name`, if it is one."""
+    if name:
+        MediaBlob.objects.filter(name=name, ref_count__gt=0).update(
+            ref_count=F("ref_count") - 1,
+            # Compared before the update: the last reference is going
+            unreferenced_at=Case(
+                When(ref_count=1, then=Value(timezone.now())),
+                default=F("unreferenced_at"),
+            ),
+        )
+
+
+def _references(names):
+    """How many rows name each of `names`."""
+    counts = Counter()
+    for label, field_name in FIELDS.items():
+        rows = (
+            apps.get_model(label)
+            ._base_manager.filter(**{f"{field_name}__in": names})
+            .values(field_name)
+            .annotate(references=Count("pk"))
+        )
+        for row in rows:
+            counts[row[field_name]] += row["references"]
+    return counts
+
+
+def _lock_batch(queryset, after, batch_size):
+    """Lock the next `batch_size` rows of `queryset` with an id above `after`."""
+    return list(
+        queryset.select_for_update(skip_locked=True)
+        .filter(pk__gt=after)
+        .order_by("pk")[:batch_size]
+    )
+
+
+def collect(
+    after=0,
+    batch_size=MEDIA_GC_BATCH_SIZE,
+    grace_hours=MEDIA_GC_GRACE_HOURS,
+    dry_run=False,
+):
+    """
+    Delete unreferenced blobs with an id above `after`. Yields the last id
+    and the deleted blobs of each batch; with `dry_run`, the blobs that
+    would be deleted.
+    """
+    storage = get_blob_storage()
+    cutoff = timezone.now() - timedelta(hours=grace_hours)
+    candidates = MediaBlob.objects.filter(ref_count=0, unreferenced_at__lt=cutoff)
+    while True:
+        with transaction.atomic():
+            batch = _lock_batch(candidates, after, batch_size)
+            if not batch:
+                return
+            references = _references([blob.name for blob in batch])
+            garbage = [blob for blob in batch if not references[blob.name]]
+            if not dry_run:
+                # Under the row locks, so the content cannot be reused meanwhile
+                for blob in garbage:
+                    storage.purge(blob.name)
+                MediaBlob.objects.filter(pk__in=[blob.pk for blob in garbage]).delete()
+                for blob in batch:
+                    if references[blob.name]:
+                        # Referenced behind the signals' back; count it again
+                        MediaBlob.objects.filter(pk=blob.pk).update(
+                            ref_count=references[blob.name], unreferenced_at=None
+                        )
+        after = batch[-1].pk
+        yield after, garbage
+
+
+def recount(after=0, batch_size=MEDIA_GC_BATCH_SIZE):
+    """
+    Recompute `ref_count` of the blobs with an id above `after` from the
+    fields. Yields the last id and the number of corrected blobs per batch.
+    """
+    while True:
+        with transaction.atomic():
+            batch = _lock_batch(MediaBlob.objects.all(), after, batch_size)
+            if not batch:
+                return
+            references = _references([blob.name for blob in batch])
+            now = timezone.now()
+            changed = []
+            for blob in batch:
+                count = references[blob.name]
+                if count == blob.ref_count:
+                    continue
+                blob.ref_count = count
+                if count:
+                    blob.unreferenced_at = None
+                elif blob.unreferenced_at is None:
+                    blob.unreferenced_at = now
+                changed.append(blob)
+            MediaBlob.objects.bulk_update(changed, ["ref_count", "unreferenced_at"])
+        after = batch[-1].pk
+        yield after, len(changed)
+
+
+def _files(storage):
+    """Storage names of the files under `BLOBS_DIR`, in a stable order."""
+    root = storage.path(BLOBS_DIR)
+    for directory, subdirectories, files in os.walk(root):
+        subdirectories.sort()
+        for file_name in sorted(files):
+            path = os.path.join(directory, file_name)
+            yield os.path.relpath(path, storage.location).replace(os.sep, "/")
+
+
+def sweep(
+    batch_size=MEDIA_GC_BATCH_SIZE,
+    grace_hours=MEDIA_GC_GRACE_HOURS,
+    dry_run=False,
+):
+    """
+    Delete the files under `BLOBS_DIR` that no `MediaBlob` row names and
+    that were not touched for `grace_hours`. Yields the deleted (or, with
+    `dry_run`, deletable) storage names per batch.
+    """
+    storage = get_blob_storage()
+    cutoff = time.time() - grace_hours * 3600
+    files = _files(storage)
+    while batch := [name for _, name in zip(range(batch_size), files)]:
+        known = set(
+            MediaBlob.objects.filter(name__in=batch).values_list("name", flat=True)
+        )
+        orphans = []
+        for name in batch:
+            if name in known:
+                continue
+            try:
+                if os.path.getmtime(storage.path(name)) >= cutoff:
+                    continue
+            except FileNotFoundError:
+                continue
+            if not dry_run:
+                storage.purge(name)
+            orphans.append(name)
+        yield orphans
@@ -0,0 +1,214 @@
+"""
+Resumable chunked uploads.
+
+Large files (RAK videos, profile images) are sent in pieces instead of one
+multipart body:
+
+1. `POST /uploads/` with the filename and total size creates an `Upload`;
+2. `PATCH /uploads/<id>/` with an `Upload-Offset: <n>` header and a raw chunk
+   as body appends it. The body is copied from the request to storage in
+   blocks, so memory use is bounded whatever the chunk size. After a dropped
+   connection the client reads the offset back with `GET /uploads/<id>/`
+   and resumes from there;
+3. `POST /uploads/<id>/finalize/` concatenates the chunks into the RAK's
+   `media` or the user's `profile_image`, again block by block, and deletes
+   the upload.
+
+Each chunk is its own storage file, so any storage backend works (none of
+them can append). A chunk only counts once it is recorded with a
+compare-and-swap on the offset, so clients racing on the same upload cannot
+interleave chunks. `prune()` deletes uploads abandoned for longer than
+`UPLOAD_EXPIRY_HOURS`.
+"""
+
+import posixpath
+import uuid
+from datetime import timedelta
+from io import UnsupportedOperation
+
+from django.conf import settings
+from django.core.files.base import File
+from django.core.files.images import get_image_dimensions
+from django.core.files.storage import default_storage
+from django.http import UnreadablePostError
+from django.utils import timezone
+
+from uploads.models import Upload
+
+UPLOAD_MAX_SIZE = getattr(settings, "UPLOAD_MAX_SIZE", 500 * 1024 * 1024)
+UPLOAD_MAX_CHUNK_SIZE = getattr(settings, "UPLOAD_MAX_CHUNK_SIZE", 8 * 1024 * 1024)
+UPLOAD_EXPIRY_HOURS = getattr(settings, "UPLOAD_EXPIRY_HOURS", 24)
+
+PARTS_DIR = "uploads/parts"
+
+
+class UploadError(Exception):
+    def __init__(self, detail, status=400):
+        super().__init__(detail)
+        self.detail = detail
+        self.status = status
+
+
+class _Body(File):
+    """The next `length` bytes of a request body, read block by block."""
+
+    def __init__(self, stream, length, name):
+        super().__init__(stream, name=name)
+        self.size = length
+        self.received = 0
+
+    def read(self, size=-1):
+        remaining = self.size - self.received
+        if size is None or size < 0 or size > remaining:
+            size = remaining
+        data = self.file.read(size) if size else b""
+        self.received += len(data)
+        return data
+
+
+class _Parts(File):
+    """The chunks of an upload, read back to back as one file."""
+
+    def __init__(self, upload):
+        super().__init__(None, name=upload.filename)
+        self.size = upload.size
+        self._names = upload.parts
+        self._index = 0
+        self._current = None
+        self._position = 0
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            return b"".join(iter(lambda: self.read(self.DEFAULT_CHUNK_SIZE), b""))
+        while self._index < len(self._names):
+            if self._current is None:
+                self._current = default_storage.open(self._names[self._index], "rb")
+            data = self._current.read(size)
+            if data:
+                self._position += len(data)
+                return data
+            self._current.close()
+            self._current = None
+            self._index += 1
+        return b""
+
+    def tell(self):
+        return self._position
+
+    def seek(self, position, whence=0):
+        # Only rewinding is supported, which is all readers of uploads need
+        if (position, whence) != (0, 0):
+            raise UnsupportedOperation("Upload parts can only be rewound.")
+        self.close()
+        self._index = 0
+        self._position = 0
+        return 0
+
+    def close(self):
+        if self._current is not None:
+            self._current.close()
+            self._current = None
+
+    @property
+    def closed(self):
+        return self._current is None
+
+
+def _parts_dir(upload):
+    return posixpath.join(PARTS_DIR, str(upload.pk))
+
+
+def create(owner, filename, size, content_type=""):
+    if size > UPLOAD_MAX_SIZE:
+        raise UploadError(f"Uploads are limited to {UPLOAD_MAX_SIZE} bytes.", 413)
+    return Upload.objects.create(
+        owner=owner, filename=filename, size=size, content_type=content_type
+    )
+
+
+def append(upload, stream, offset, length):
+    """
+    Store the next `length` bytes of `stream` as the chunk at `offset`.
+    Raises `UploadError` if the chunk does not fit, was cut short or lost a
+    race with another chunk at the same offset.
+    """
+    if offset != upload.offset:
+        raise UploadError(f"Expected a chunk at offset {upload.offset}.", 409)
+    if length <= 0:
+        raise UploadError("Chunks must not be empty.")
+    if length > UPLOAD_MAX_CHUNK_SIZE:
+        raise UploadError(f"Chunks are limited to {UPLOAD_MAX_CHUNK_SIZE} bytes.", 413)
+    if offset + length > upload.size:
+        raise UploadError("The chunk goes past the declared upload size.")
+
+    # Unique per attempt: a racing attempt with the same bytes must not share
+    # (and then delete) this one's file
+    body = _Body(stream, length, name=f"{offset:012d}-{uuid.uuid4().hex}")
+    try:
+        name = default_storage.save(posixpath.join(_parts_dir(upload), body.name), body)
+    except UnreadablePostError:
+        # The client went away mid-chunk; prune() removes the partial file
+        raise UploadError(f"The chunk was cut short; resend it from offset {offset}.")
+    if body.received != length:
+        default_storage.delete(name)
+        raise UploadError(f"The chunk was cut short; resend it from offset {offset}.")
+
+    recorded = Upload.objects.filter(pk=upload.pk, offset=offset).update(
+        offset=offset + length,
+        parts=upload.parts + [name],
+        updated_at=timezone.now(),
+    )
+    if not recorded:
+        default_storage.delete(name)
+        raise UploadError("Another chunk was appended at this offset.", 409)
+    upload.offset += length
+    upload.parts.append(name)
+
+
+def is_image(upload):
+    """Whether the complete `upload` is an image Pillow can read."""
+    parts = _Parts(upload)
+    try:
+        return get_image_dimensions(parts) != (None, None)
+    finally:
+        parts.close()
+
+
+def attach(upload, instance, field_name):
+    """
+    Concatenate the chunks of the complete `upload` into the file field
+    `field_name` of `instance`, save it and delete the upload.
+    """
+    if not upload.complete:
+        raise UploadError(
+            f"The upload is incomplete: {upload.offset} of {upload.size} bytes received.",
+            409,
+        )
+    parts = _Parts(upload)
+    try:
+        getattr(instance, field_name).save(upload.filename, parts, save=False)
+    finally:
+        parts.close()
+    instance.save(update_fields=[field_name])
+    discard(upload)
+
+
+def discard(upload):
+    """Delete `upload` and every file stored for it."""
+    directory = _parts_dir(upload)
+    try:
+        _, files = default_storage.listdir(directory)
+    except FileNotFoundError:
+        files = []
+    for name in files:
+        default_storage.delete(posixpath.join(directory, name))
+    upload.delete()
+
+
+def prune(hours=UPLOAD_EXPIRY_HOURS):
+    """Discard uploads not appended to for `hours`; returns how many."""
+    cutoff = timezone.now() - timedelta(hours=hours)
+    uploads = list(Upload.objects.filter(updated_at__lt=cutoff))
+    for upload in uploads:
+        discard(upload)
+    return len(uploads)
@@ -0,0 +1,35 @@
+"""
+Rendering of image variants, run in worker processes (see `uploads.variants`).
+
+Free of Django imports on purpose: the process pool sends `render` to its
+children by reference, so they only need Pillow and this module.
+"""
+
+import io
+
+from PIL import Image, ImageOps
+
+WEBP_QUALITY = 80
+
+
+def render(data, width, height, crop):
+    """
+    Return `data` (an encoded image) as WebP fitting `width` x `height`:
+    cropped to exactly that size if `crop`, else scaled down (never up) to
+    fit, keeping the aspect ratio.
+    """
+    with Image.open(io.BytesIO(data)) as image:
+        # JPEGs can decode straight at a fraction of their size
+        image.draft("RGB", (width, height))
+        image = ImageOps.exif_transpose(image)
+        image = image.convert(
+            "RGBA" if image.mode in ("RGBA", "LA", "P", "PA") else "RGB"
+        )
+        if crop:
+            image = ImageOps.fit(image, (width, height), Image.Resampling.LANCZOS)
+        else:
+            image.thumbnail((width, height), Image.Resampling.LANCZOS)
+
+        output = io.BytesIO()
+        image.save(output, "WEBP", quality=WEBP_QUALITY, method=4)
+        return output.getvalue()
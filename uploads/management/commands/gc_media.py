@@ -0,0 +1,75 @@
+from django.core.management.base import BaseCommand
+
+from uploads import blobs
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete media blobs no RAK or profile refers to any more, once "
+        "unreferenced for MEDIA_GC_GRACE_HOURS, then files under blobs/ left "
+        "without a row by rolled-back saves. Runs in batches; if stopped, "
+        "resume with --after set to the last id reported. Run periodically."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--after",
+            type=int,
+            default=0,
+            help="Only look at blobs with a higher id.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=blobs.MEDIA_GC_BATCH_SIZE,
+            help="Blobs per transaction.",
+        )
+        parser.add_argument(
+            "--grace-hours",
+            type=int,
+            default=blobs.MEDIA_GC_GRACE_HOURS,
+            help="Keep blobs unreferenced for less than this many hours.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report what would be deleted.",
+        )
+        parser.add_argument(
+            "--recount",
+            action="store_true",
+            help="First recompute every reference count from the media fields.",
+        )
+
+    def handle(self, *args, **options):
+        if options["recount"]:
+            corrected = 0
+            for last_id, changed in blobs.recount(batch_size=options["batch_size"]):
+                corrected += changed
+                self.stdout.write(f"Recounted blobs up to id {last_id}.")
+            self.stdout.write(f"Corrected {corrected} reference counts.")
+
+        deleted = size = 0
+        for last_id, garbage in blobs.collect(
+            after=options["after"],
+            batch_size=options["batch_size"],
+            grace_hours=options["grace_hours"],
+            dry_run=options["dry_run"],
+        ):
+            deleted += len(garbage)
+            size += sum(blob.size for blob in garbage)
+            self.stdout.write(f"Checked blobs up to id {last_id}.")
+        orphans = 0
+        for names in blobs.sweep(
+            batch_size=options["batch_size"],
+            grace_hours=options["grace_hours"],
+            dry_run=options["dry_run"],
+        ):
+            orphans += len(names)
+        verb = "Would delete" if options["dry_run"] else "Deleted"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{verb} {deleted} unreferenced blobs ({size} bytes) and "
+                f"{orphans} files without a blob row."
+            )
+        )
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from uploads import chunked
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete chunked uploads nobody appended to for UPLOAD_EXPIRY_HOURS, "
+        "with their stored chunks. Run periodically."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--hours",
+            type=int,
+            default=chunked.UPLOAD_EXPIRY_HOURS,
+            help="Keep uploads appended to within this many hours.",
+        )
+
+    def handle(self, *args, **options):
+        deleted = chunked.prune(hours=options["hours"])
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} abandoned uploads."))
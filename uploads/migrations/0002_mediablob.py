@@ -0,0 +1,28 @@
+# Generated by Django 5.1 on 2026-10-18 17:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('uploads', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('digest', models.CharField(help_text='SHA-256, hex', max_length=64, unique=True)),
+                ('name', models.CharField(help_text='Storage name', max_length=255, unique=True)),
+                ('size', models.PositiveBigIntegerField(help_text='Size in bytes')),
+                ('ref_count', models.PositiveIntegerField(default=0)),
+                ('unreferenced_at', models.DateTimeField(blank=True, help_text='Since when nothing refers to the blob', null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('ref_count', 0)), fields=['id'], name='mediablob_unreferenced_idx')],
+            },
+        ),
+    ]
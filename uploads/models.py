@@ -0,0 +1,73 @@
+import uuid
+
+from django.conf import settings
+from django.db import models
+
+
+class Upload(models.Model):
+    """
+    A chunked upload in progress (see `uploads.chunked`). Each appended
+    chunk is stored as its own file in `parts`; finalizing concatenates
+    them into the target field and deletes the upload.
+    """
+
+    # Unguessable, as it appears in upload URLs
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="uploads"
+    )
+    filename = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=100, blank=True)
+    size = models.PositiveBigIntegerField(help_text="Total size in bytes")
+    offset = models.PositiveBigIntegerField(
+        default=0, help_text="Bytes received so far"
+    )
+    parts = models.JSONField(
+        default=list, help_text="Storage names of the received chunks, in order"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # prune_uploads finds abandoned uploads by age
+            models.Index(fields=["updated_at"], name="upload_updated_idx"),
+        ]
+
+    def __str__(self):
+        return f"Upload {self.pk}: {self.filename} ({self.offset}/{self.size})"
+
+    @property
+    def complete(self):
+        return self.offset == self.size
+
+
+class MediaBlob(models.Model):
+    """
+    A file of `uploads.storage.BlobStorage`, stored once per distinct
+    content. `ref_count` counts the rows whose media fields name it
+    (`uploads.blobs`); `gc_media` deletes blobs that stayed unreferenced
+    since `unreferenced_at` for longer than the grace period.
+    """
+
+    digest = models.CharField(max_length=64, unique=True, help_text="SHA-256, hex")
+    name = models.CharField(max_length=255, unique=True, help_text="Storage name")
+    size = models.PositiveBigIntegerField(help_text="Size in bytes")
+    ref_count = models.PositiveIntegerField(default=0)
+    unreferenced_at = models.DateTimeField(
+        null=True, blank=True, help_text="Since when nothing refers to the blob"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # gc_media walks the unreferenced blobs in id order
+            models.Index(
+                fields=["id"],
+                name="mediablob_unreferenced_idx",
+                condition=models.Q(ref_count=0),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.ref_count} references)"
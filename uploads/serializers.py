@@ -0,0 +1,49 @@
+from rest_framework import serializers
+
+from uploads import variants
+from .models import Upload
+
+
+class UploadSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Upload
+        fields = ["id", "filename", "content_type", "size", "offset", "created_at"]
+        read_only_fields = ["id", "offset", "created_at"]
+
+    def validate_size(self, size):
+        if size <= 0:
+            raise serializers.ValidationError("Must be positive.")
+        return size
+
+
+class FinalizeSerializer(serializers.Serializer):
+    """What a finished upload is attached to."""
+
+    RAK_MEDIA = "rak_media"
+    PROFILE_IMAGE = "profile_image"
+
+    target = serializers.ChoiceField(choices=[RAK_MEDIA, PROFILE_IMAGE])
+    rak_id = serializers.IntegerField(min_value=1, required=False)
+
+    def validate(self, data):
+        if data["target"] == self.RAK_MEDIA and "rak_id" not in data:
+            raise serializers.ValidationError({"rak_id": "Required for `rak_media`."})
+        return data
+
+
+class VariantsField(serializers.Field):
+    """
+    URLs of the resized WebP variants of an image field, by variant name
+    (see `uploads.variants`). Empty until they are rendered from the current
+    image. Declare `"<name>": ["<image field>", "<image field>_variants"]`
+    in `Meta.field_paths` so querysets load both columns.
+    """
+
+    def __init__(self, image_field, **kwargs):
+        self.image_field = image_field
+        kwargs["source"] = "*"
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, instance):
+        return variants.urls(instance, self.image_field, self.context.get("request"))
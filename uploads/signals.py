@@ -0,0 +1,95 @@
+from django.apps import apps
+from django.db.models.fields.files import FieldFile
+from django.db.models.signals import (
+    post_delete,
+    post_init,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+
+from uploads import blobs, tasks, variants
+
+# The blob a row named when loaded, unknown for a deferred field
+UNKNOWN = object()
+
+
+def _queue_variants(sender, instance, update_fields=None, **kwargs):
+    field_name = variants.FIELDS[sender._meta.label_lower]
+    if update_fields is not None and field_name not in update_fields:
+        return
+    # Rows loaded with .only() cannot tell without another query; the next
+    # full save will.
+    deferred = instance.get_deferred_fields()
+    if field_name in deferred or variants.variants_field(field_name) in deferred:
+        return
+    if variants.is_stale(instance, field_name):
+        tasks.generate_variants.enqueue(
+            model=sender._meta.label_lower, pk=instance.pk, field=field_name
+        )
+
+
+for label in variants.FIELDS:
+    post_save.connect(
+        _queue_variants,
+        sender=apps.get_model(label),
+        dispatch_uid=f"uploads.variants.{label}",
+    )
+
+
+def _blob_name(value):
+    if isinstance(value, FieldFile):
+        return value.name or None
+    # A name from the database; a new, unsaved file has none yet
+    return value if isinstance(value, str) and value else None
+
+
+def _remember_blob(sender, instance, **kwargs):
+    field_name = blobs.FIELDS[sender._meta.label_lower]
+    value = instance.__dict__.get(field_name, UNKNOWN)
+    instance._blob_name = UNKNOWN if value is UNKNOWN else _blob_name(value)
+
+
+def _load_blob_name(sender, instance, update_fields=None, **kwargs):
+    # Rows loaded without the field (.only()) look the stored name up before
+    # it is overwritten or deleted
+    field_name = blobs.FIELDS[sender._meta.label_lower]
+    if update_fields is not None and field_name not in update_fields:
+        return
+    if getattr(instance, "_blob_name", UNKNOWN) is UNKNOWN and instance.pk:
+        stored = (
+            sender._base_manager.filter(pk=instance.pk)
+            .values_list(field_name, flat=True)
+            .first()
+        )
+        instance._blob_name = _blob_name(stored)
+
+
+def _count_blob_references(sender, instance, update_fields=None, **kwargs):
+    field_name = blobs.FIELDS[sender._meta.label_lower]
+    if update_fields is not None and field_name not in update_fields:
+        return
+    old = getattr(instance, "_blob_name", None)
+    if old is UNKNOWN:
+        old = None
+    new = _blob_name(getattr(instance, field_name))
+    if old != new:
+        blobs.retain(new)
+        blobs.release(old)
+    instance._blob_name = new
+
+
+def _release_blob(sender, instance, **kwargs):
+    name = getattr(instance, "_blob_name", None)
+    if name is not UNKNOWN:
+        blobs.release(name)
+
+
+for label in blobs.FIELDS:
+    model = apps.get_model(label)
+    uid = f"uploads.blobs.{label}"
+    post_init.connect(_remember_blob, sender=model, dispatch_uid=uid)
+    pre_save.connect(_load_blob_name, sender=model, dispatch_uid=uid)
+    post_save.connect(_count_blob_references, sender=model, dispatch_uid=uid)
+    pre_delete.connect(_load_blob_name, sender=model, dispatch_uid=uid)
+    post_delete.connect(_release_blob, sender=model, dispatch_uid=uid)
@@ -0,0 +1,88 @@
+"""
+Content-addressed storage for the media fields (`media`, `profile_image`).
+
+`BlobStorage` ignores the name it is asked for and stores a file as
+`blobs/ab/cd/<sha256><ext>`, recording it as a `MediaBlob`. Content already
+stored (a re-shared pay-it-forward picture, the same avatar uploaded twice)
+is not written again: the existing name is returned, whatever its extension
+or original directory. Reference counting and garbage collection are in
+`uploads.blobs`.
+
+A blob is only written or reused while its `MediaBlob` row is locked, and
+`gc_media` deletes the file under the same lock, so saving content that is
+being collected either waits for the collection or writes the file anew.
+"""
+
+import os
+import posixpath
+
+from django.core.files.storage import storages
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from core.storage import HashedFileSystemStorage
+from uploads.models import MediaBlob
+
+BLOBS_DIR = "blobs"
+# Longer extensions are cut; the content, not the name, identifies a blob
+MAX_EXTENSION_LENGTH = 10
+
+
+def get_blob_storage():
+    """The `blobs` storage, as the `storage` callable of media fields."""
+    return storages["blobs"]
+
+
+def blob_name(digest, ext):
+    return posixpath.join(
+        BLOBS_DIR, digest[:2], digest[2:4], digest + ext[:MAX_EXTENSION_LENGTH]
+    )
+
+
+class BlobStorage(HashedFileSystemStorage):
+    def get_available_name(self, name, max_length=None):
+        # _save() names the file after its content
+        return name
+
+    def _save(self, name, content):
+        temp_path, digest = self._write_temp(self.path(BLOBS_DIR), content)
+        try:
+            size = os.path.getsize(temp_path)
+            ext = os.path.splitext(name)[1].lower()
+            with transaction.atomic():
+                blob = MediaBlob.objects.select_for_update().filter(digest=digest)
+                blob = blob.first()
+                if blob is None:
+                    blob = self._create(digest, blob_name(digest, ext), size)
+                else:
+                    # Restart the grace period of an unreferenced blob, so
+                    # gc_media leaves it to the row about to refer to it
+                    MediaBlob.objects.filter(pk=blob.pk, ref_count=0).update(
+                        unreferenced_at=timezone.now()
+                    )
+                self._place(temp_path, blob.name)
+                # A fresh time keeps blobs.sweep() off a file whose row may
+                # not be committed yet
+                os.utime(self.path(blob.name))
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        return blob.name
+
+    def _create(self, digest, name, size):
+        try:
+            with transaction.atomic():
+                return MediaBlob.objects.create(
+                    digest=digest, name=name, size=size, unreferenced_at=timezone.now()
+                )
+        except IntegrityError:
+            # A concurrent save of the same content won the race
+            return MediaBlob.objects.select_for_update().get(digest=digest)
+
+    def delete(self, name):
+        # Blobs are shared between rows; only gc_media removes them, with
+        # purge()
+        pass
+
+    def purge(self, name):
+        super().delete(name)
@@ -0,0 +1,14 @@
+"""
+Background tasks for uploaded files (see `jobs.registry`).
+"""
+
+from django.apps import apps
+
+from jobs.registry import task
+from uploads import variants
+
+
+@task(queue="images", atomic=False)
+def generate_variants(model, pk, field):
+    # Not atomic: rendering takes a while and only the final UPDATE writes
+    variants.generate(apps.get_model(model), pk, field)
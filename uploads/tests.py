@@ -0,0 +1,258 @@
+import io
+import os
+import shutil
+import tempfile
+import time
+from datetime import timedelta
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import storages
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from PIL import Image
+from rest_framework.authtoken.models import Token
+
+from jobs.worker import Worker
+from rak.models import RandomActOfKindness
+from uploads import blobs, chunked, imaging, variants
+from uploads.models import MediaBlob, Upload
+from users.models import CustomUser, UserProfile
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def age_blobs():
+    """Move every unreferenced blob past the grace period."""
+    MediaBlob.objects.filter(ref_count=0).update(
+        unreferenced_at=timezone.now() - timedelta(hours=blobs.MEDIA_GC_GRACE_HOURS + 1)
+    )
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class BlobTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username="alice", password="pw")
+        self.storage = storages["blobs"]
+
+    def make_rak(self, content, name="pic.png"):
+        return RandomActOfKindness.objects.create(
+            created_by=self.user,
+            title="t",
+            description="d",
+            rak_type="offer",
+            action="a",
+            media=SimpleUploadedFile(name, content),
+        )
+
+    def blob(self, name):
+        return MediaBlob.objects.get(name=name)
+
+    def collect(self):
+        return [blob.name for _, garbage in blobs.collect() for blob in garbage]
+
+    def test_shared_blob_survives_one_delete(self):
+        first = self.make_rak(b"shared bytes")
+        second = self.make_rak(b"shared bytes", name="copy.png")
+        self.assertEqual(first.media.name, second.media.name)
+        self.assertEqual(self.blob(first.media.name).ref_count, 2)
+
+        first.delete()
+        age_blobs()
+        self.assertEqual(self.collect(), [])
+        self.assertEqual(self.blob(second.media.name).ref_count, 1)
+        self.assertTrue(self.storage.exists(second.media.name))
+
+        second.delete()
+        age_blobs()
+        self.assertEqual(self.collect(), [second.media.name])
+        self.assertFalse(self.storage.exists(second.media.name))
+
+    def test_replacing_a_profile_image_releases_the_old_blob(self):
+        profile = UserProfile.objects.get(user=self.user)
+        profile.profile_image = SimpleUploadedFile("old.png", b"old image")
+        profile.save()
+        old = profile.profile_image.name
+
+        profile.profile_image = SimpleUploadedFile("new.png", b"new image")
+        profile.save()
+        self.assertEqual(self.blob(old).ref_count, 0)
+        self.assertIsNotNone(self.blob(old).unreferenced_at)
+        self.assertEqual(self.blob(profile.profile_image.name).ref_count, 1)
+
+    def test_deferred_media_keeps_counts_right(self):
+        rak = self.make_rak(b"deferred")
+        loaded = RandomActOfKindness.objects.only("title").get(pk=rak.pk)
+        loaded.title = "renamed"
+        loaded.save()
+        self.assertEqual(self.blob(rak.media.name).ref_count, 1)
+
+        loaded = RandomActOfKindness.objects.only("title").get(pk=rak.pk)
+        loaded.media = SimpleUploadedFile("other.png", b"replacement")
+        loaded.save()
+        self.assertEqual(self.blob(rak.media.name).ref_count, 0)
+        self.assertEqual(self.blob(loaded.media.name).ref_count, 1)
+
+        RandomActOfKindness.objects.only("title").get(pk=rak.pk).delete()
+        self.assertEqual(self.blob(loaded.media.name).ref_count, 0)
+
+    def test_collect_corrects_a_referenced_blob(self):
+        rak = self.make_rak(b"still used")
+        # As if a queryset update had bypassed the signals
+        MediaBlob.objects.update(ref_count=0)
+        age_blobs()
+
+        self.assertEqual(self.collect(), [])
+        blob = self.blob(rak.media.name)
+        self.assertEqual(blob.ref_count, 1)
+        self.assertIsNone(blob.unreferenced_at)
+        self.assertTrue(self.storage.exists(rak.media.name))
+
+    def test_sweep_deletes_files_of_rolled_back_saves(self):
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            name = self.storage.save("rak_media/lost.png", ContentFile(b"lost"))
+            raise RuntimeError
+        self.assertFalse(MediaBlob.objects.filter(name=name).exists())
+        self.assertTrue(self.storage.exists(name))
+
+        kept = self.make_rak(b"kept").media.name
+        self.assertEqual([swept for batch in blobs.sweep() for swept in batch], [])
+
+        old = time.time() - (blobs.MEDIA_GC_GRACE_HOURS + 1) * 3600
+        for stored in (name, kept):
+            os.utime(self.storage.path(stored), (old, old))
+        self.assertEqual([swept for batch in blobs.sweep() for swept in batch], [name])
+        self.assertFalse(self.storage.exists(name))
+        self.assertTrue(self.storage.exists(kept))
+
+
+def png(color="red"):
+    output = io.BytesIO()
+    Image.new("RGB", (800, 600), color).save(output, "PNG")
+    return output.getvalue()
+
+
+def render_here(data, variant_specs):
+    # The process pool would spawn interpreters; render in this one instead
+    return {name: imaging.render(data, *spec) for name, spec in variant_specs.items()}
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+@mock.patch.object(variants, "_render_all", render_here)
+class VariantTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username="alice", password="pw")
+        self.headers = {
+            "Authorization": f"Token {Token.objects.create(user=self.user).key}"
+        }
+
+    def test_rak_lists_show_variants_once_rendered(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            rak = RandomActOfKindness.objects.create(
+                created_by=self.user,
+                title="t",
+                description="d",
+                rak_type="offer",
+                action="a",
+                media=SimpleUploadedFile("pic.png", png()),
+            )
+        # Cached while the job is still queued
+        before = self.client.get("/rak/rak/unclaimed/").json()["results"]
+        self.assertEqual(before[0]["media_variants"], {})
+
+        Worker().run(burst=True)
+        after = self.client.get("/rak/rak/unclaimed/").json()["results"]
+        self.assertEqual(set(after[0]["media_variants"]), {"thumb", "card"})
+
+        # A replaced image falls back to the original until its variants exist
+        rak.media = SimpleUploadedFile("new.png", png("blue"))
+        rak.save()
+        after = self.client.get("/rak/rak/unclaimed/").json()["results"]
+        self.assertEqual(after[0]["media_variants"], {})
+
+    def test_profile_etag_changes_once_rendered(self):
+        profile = UserProfile.objects.get(user=self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            profile.profile_image = SimpleUploadedFile("me.png", png())
+            profile.save()
+        before = self.client.get("/users/profile/", headers=self.headers)
+        self.assertEqual(before.json()["profile_image_variants"], {})
+
+        Worker().run(burst=True)
+        after = self.client.get(
+            "/users/profile/",
+            headers={**self.headers, "If-None-Match": before["ETag"]},
+        )
+        self.assertEqual(after.status_code, 200)
+        rendered = after.json()["profile_image_variants"]
+        self.assertEqual(set(rendered), {"avatar_48", "avatar_96", "avatar_192"})
+
+        profile.refresh_from_db()
+        name = profile.profile_image_variants["avatar_48"]
+        with storages["default"].open(name) as file, Image.open(file) as image:
+            self.assertEqual((image.format, image.size), ("WEBP", (48, 48)))
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ChunkedUploadTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username="alice", password="pw")
+        self.upload = chunked.create(self.user, "clip.bin", 10)
+
+    def append(self, upload, offset, data):
+        chunked.append(upload, io.BytesIO(data), offset, len(data))
+
+    def assertRejected(self, offset, data, upload=None):
+        with self.assertRaises(chunked.UploadError) as caught:
+            self.append(upload or self.upload, offset, data)
+        self.assertEqual(caught.exception.status, 409)
+
+    def stored(self):
+        upload = Upload.objects.get(pk=self.upload.pk)
+        return upload.offset, len(upload.parts)
+
+    def test_out_of_order_chunk_is_rejected(self):
+        self.assertRejected(5, b"56789")
+        self.assertEqual(self.stored(), (0, 0))
+
+    def test_duplicate_chunk_is_rejected(self):
+        self.append(self.upload, 0, b"01234")
+        self.assertRejected(0, b"01234")
+        self.assertEqual(self.stored(), (5, 1))
+
+    def test_racing_chunk_loses_the_compare_and_swap(self):
+        stale = Upload.objects.get(pk=self.upload.pk)
+        self.append(self.upload, 0, b"01234")
+        # The stale copy still expects offset 0, so only the UPDATE catches it
+        self.assertRejected(0, b"abcde", upload=stale)
+        self.assertEqual(self.stored(), (5, 1))
+        _, files = chunked.default_storage.listdir(chunked._parts_dir(self.upload))
+        self.assertEqual(len(files), 1)
+
+    def test_incomplete_upload_cannot_be_attached(self):
+        rak = RandomActOfKindness.objects.create(
+            created_by=self.user,
+            title="t",
+            description="d",
+            rak_type="offer",
+            action="a",
+        )
+        self.append(self.upload, 0, b"01234")
+        with self.assertRaises(chunked.UploadError) as caught:
+            chunked.attach(self.upload, rak, "media")
+        self.assertEqual(caught.exception.status, 409)
+        self.assertTrue(Upload.objects.filter(pk=self.upload.pk).exists())
+
+        self.append(self.upload, 5, b"56789")
+        chunked.attach(self.upload, rak, "media")
+        rak.refresh_from_db()
+        with rak.media.open("rb") as media:
+            self.assertEqual(media.read(), b"0123456789")
+        self.assertFalse(Upload.objects.filter(pk=self.upload.pk).exists())
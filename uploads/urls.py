@@ -0,0 +1,12 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path("", views.UploadCreateView.as_view(), name="upload-create"),
+    path("<uuid:pk>/", views.UploadDetailView.as_view(), name="upload-detail"),
+    path(
+        "<uuid:pk>/finalize/",
+        views.UploadFinalizeView.as_view(),
+        name="upload-finalize",
+    ),
+]
@@ -0,0 +1,189 @@
+"""
+Resized WebP variants of uploaded images.
+
+Clients showing an avatar or a feed card should not download the original
+upload. For each image field listed in `VARIANTS`, the model has a
+`<field>_variants` JSON column mapping variant names to storage names, plus
+the name of the source file they were rendered from:
+
+    {"source": "profile_images/me.png", "avatar_48": "variants/...webp", ...}
+
+Saving a model whose image changed queues the `generate_variants` job
+(`uploads.signals`, `uploads.tasks`). The job renders every variant in a
+process pool, so the resizing runs in parallel and outside both the request
+and the worker's own process, and stores the result only if the image is
+still the one it rendered. `VariantsField` serializes the URLs, and returns
+nothing for variants rendered from a replaced image, so clients fall back
+to the original until the new ones exist. Storing them bumps the version
+counters of the responses that embed them (see `rak.versions`), as the
+update skips the signals that normally do.
+"""
+
+import hashlib
+import logging
+import mimetypes
+import multiprocessing
+import posixpath
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image
+
+from rak import versions
+from uploads import imaging
+
+logger = logging.getLogger(__name__)
+
+IMAGE_VARIANT_PROCESSES = getattr(settings, "IMAGE_VARIANT_PROCESSES", 2)
+# Larger sources are left alone (bytes)
+IMAGE_VARIANT_MAX_SOURCE_SIZE = getattr(
+    settings, "IMAGE_VARIANT_MAX_SOURCE_SIZE", 20 * 1024 * 1024
+)
+
+# The image field with variants of each model
+FIELDS = {
+    "users.userprofile": "profile_image",
+    "rak.randomactofkindness": "media",
+}
+
+# Variant name -> (width, height, crop) per model
+VARIANTS = {
+    "users.userprofile": {
+        "avatar_48": (48, 48, True),
+        "avatar_96": (96, 96, True),
+        "avatar_192": (192, 192, True),
+    },
+    "rak.randomactofkindness": {
+        "thumb": (320, 320, False),
+        "card": (720, 720, False),
+    },
+}
+
+# Bumps the version counters of the responses showing a row's variants
+INVALIDATE = {
+    "users.userprofile": lambda pk: versions.bump(versions.PROFILES),
+    "rak.randomactofkindness": versions.bump_rak,
+}
+
+SOURCE = "source"
+VARIANTS_DIR = "variants"
+
+_pool = None
+
+
+def variants_field(field_name):
+    return f"{field_name}_variants"
+
+
+def is_stale(instance, field_name):
+    """Whether the variants of `instance.<field_name>` need (re)generating."""
+    name = getattr(instance, field_name).name
+    return (
+        bool(name) and getattr(instance, variants_field(field_name)).get(SOURCE) != name
+    )
+
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        # Spawned children start clean instead of inheriting the worker's
+        # threads and database connections.
+        _pool = ProcessPoolExecutor(
+            IMAGE_VARIANT_PROCESSES, mp_context=multiprocessing.get_context("spawn")
+        )
+    return _pool
+
+
+def _render_all(data, variant_specs):
+    global _pool
+    names = list(variant_specs)
+    try:
+        rendered = _get_pool().map(
+            imaging.render,
+            [data] * len(names),
+            *zip(*(variant_specs[name] for name in names)),
+        )
+        return dict(zip(names, rendered))
+    except BrokenProcessPool:
+        # A child died (e.g. out of memory); start a fresh pool next time
+        _pool = None
+        raise
+
+
+def _variant_name(instance, field_name, source, variant):
+    # New sources get new names, so clients and CDNs never see stale bytes
+    digest = hashlib.sha1(source.encode()).hexdigest()[:12]
+    return posixpath.join(
+        VARIANTS_DIR,
+        instance._meta.label_lower,
+        str(instance.pk),
+        f"{field_name}-{variant}-{digest}.webp",
+    )
+
+
+def generate(model, pk, field_name):
+    """
+    Render and store the variants of `model` row `pk`'s image `field_name`.
+    Does nothing if they are up to date or the row is gone.
+    """
+    instance = model.objects.filter(pk=pk).first()
+    if instance is None or not is_stale(instance, field_name):
+        return
+
+    file = getattr(instance, field_name)
+    source = file.name
+    result = {SOURCE: source}
+    content_type, _ = mimetypes.guess_type(source)
+    # Videos and oversized images only get their source recorded
+    if (content_type or "").startswith("image/") and (
+        file.size <= IMAGE_VARIANT_MAX_SOURCE_SIZE
+    ):
+        with file.open("rb"):
+            data = file.read()
+        try:
+            rendered = _render_all(data, VARIANTS[model._meta.label_lower])
+        except (OSError, ValueError, Image.DecompressionBombError):
+            logger.warning("Cannot render variants of %s", source, exc_info=True)
+            rendered = {}
+        for variant, payload in rendered.items():
+            # Variants are derived, not shared, so they are not blobs
+            result[variant] = default_storage.save(
+                _variant_name(instance, field_name, source, variant),
+                ContentFile(payload),
+            )
+
+    # Only store them if the image was not replaced in the meantime
+    updated = model.objects.filter(pk=pk, **{field_name: source}).update(
+        **{variants_field(field_name): result}
+    )
+    if updated:
+        INVALIDATE[model._meta.label_lower](pk)
+        # The variants of the previous image
+        previous = getattr(instance, variants_field(field_name))
+        obsolete = [
+            name
+            for variant, name in previous.items()
+            if variant != SOURCE and name not in result.values()
+        ]
+    else:
+        obsolete = [name for variant, name in result.items() if variant != SOURCE]
+    for name in obsolete:
+        default_storage.delete(name)
+
+
+def urls(instance, field_name, request=None):
+    """Variant name -> URL for `instance.<field_name>`, if rendered from it."""
+    file = getattr(instance, field_name)
+    variants = getattr(instance, variants_field(field_name))
+    if not file.name or variants.get(SOURCE) != file.name:
+        return {}
+    result = {}
+    for variant, name in variants.items():
+        if variant == SOURCE:
+            continue
+        url = default_storage.url(name)
+        result[variant] = request.build_absolute_uri(url) if request else url
+    return result
@@ -0,0 +1,167 @@
+from django.shortcuts import get_object_or_404
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from rak.models import RandomActOfKindness
+from rak.serializers import RandomActOfKindnessSerializer
+from uploads import chunked
+from uploads.models import Upload
+from uploads.serializers import FinalizeSerializer, UploadSerializer
+from users.models import UserProfile
+from users.serializers import UserProfileSerializer
+
+
+def _error(error):
+    return Response({"detail": error.detail}, status=error.status)
+
+
+def _with_offset(response, upload):
+    response["Upload-Offset"] = str(upload.offset)
+    return response
+
+
+class UploadCreateView(APIView):
+    """
+    Start a resumable chunked upload (see `uploads.chunked`).
+
+    **Endpoint:** `/uploads/`
+
+    **Method:** `POST`
+
+    **Permissions:** Authenticated users only.
+
+    **Request Body:**
+    - `filename`: String, required.
+    - `size`: Integer, required. Total size in bytes, at most `UPLOAD_MAX_SIZE`.
+    - `content_type`: String, optional.
+
+    **Functionality:**
+    - Returns the upload `id` to send chunks to, starting at offset 0.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        serializer = UploadSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            upload = chunked.create(request.user, **serializer.validated_data)
+        except chunked.UploadError as error:
+            return _error(error)
+        return _with_offset(
+            Response(UploadSerializer(upload).data, status=status.HTTP_201_CREATED),
+            upload,
+        )
+
+
+class UploadDetailView(APIView):
+    """
+    Inspect, append to or cancel a chunked upload.
+
+    **Endpoint:** `/uploads/<uuid:pk>/`
+
+    **Methods:**
+    - `GET` / `HEAD`: The upload, with the bytes received so far as `offset`
+      and in the `Upload-Offset` header. Clients resume from there.
+    - `PATCH`: Append a chunk. The raw bytes are the request body, with the
+      offset they start at in the `Upload-Offset` header and a
+      `Content-Length` of at most `UPLOAD_MAX_CHUNK_SIZE`.
+    - `DELETE`: Cancel the upload and delete its chunks.
+
+    **Permissions:** Authenticated users only, for their own uploads.
+
+    **Functionality:**
+    - Chunks are streamed to storage without buffering the body in memory.
+    - A chunk at the wrong offset is rejected with 409 and the expected
+      offset; a chunk cut short is discarded and must be resent.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_object(self, request, pk):
+        return get_object_or_404(Upload, pk=pk, owner=request.user)
+
+    def get(self, request, pk):
+        upload = self.get_object(request, pk)
+        return _with_offset(Response(UploadSerializer(upload).data), upload)
+
+    def patch(self, request, pk):
+        upload = self.get_object(request, pk)
+        try:
+            offset = int(request.headers["Upload-Offset"])
+            length = int(request.headers["Content-Length"])
+        except (KeyError, ValueError):
+            return _with_offset(
+                Response(
+                    {"detail": "`Upload-Offset` and `Content-Length` are required."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                ),
+                upload,
+            )
+        try:
+            # Read the raw body; request.data would buffer and parse it
+            chunked.append(upload, request.stream, offset, length)
+        except chunked.UploadError as error:
+            return _with_offset(_error(error), upload)
+        return _with_offset(Response(UploadSerializer(upload).data), upload)
+
+    def delete(self, request, pk):
+        chunked.discard(self.get_object(request, pk))
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class UploadFinalizeView(APIView):
+    """
+    Attach a complete chunked upload to a RAK post or the user's profile.
+
+    **Endpoint:** `/uploads/<uuid:pk>/finalize/`
+
+    **Method:** `POST`
+
+    **Permissions:** Authenticated users only, for their own uploads. Only
+    the creator of a RAK can set its media.
+
+    **Request Body:**
+    - `target`: String, required. `rak_media` or `profile_image`.
+    - `rak_id`: Integer, required for `rak_media`.
+
+    **Functionality:**
+    - Concatenates the chunks into the target file field and deletes the upload.
+    - Returns the updated RAK or profile.
+    - Answers 409 while bytes are still missing.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, pk):
+        upload = get_object_or_404(Upload, pk=pk, owner=request.user)
+        serializer = FinalizeSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        if serializer.validated_data["target"] == FinalizeSerializer.RAK_MEDIA:
+            instance = get_object_or_404(
+                RandomActOfKindness, pk=serializer.validated_data["rak_id"]
+            )
+            if instance.created_by != request.user:
+                return Response(
+                    {"detail": "You cannot edit this RAK."},
+                    status=status.HTTP_403_FORBIDDEN,
+                )
+            field_name, output = "media", RandomActOfKindnessSerializer
+        else:
+            instance = get_object_or_404(UserProfile, user=request.user)
+            if upload.complete and not chunked.is_image(upload):
+                return Response(
+                    {"detail": "Upload a valid image."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            field_name, output = "profile_image", UserProfileSerializer
+
+        try:
+            chunked.attach(upload, instance, field_name)
+        except chunked.UploadError as error:
+            return _with_offset(_error(error), upload)
+        return Response(output(instance).data, status=status.HTTP_200_OK)
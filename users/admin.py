@@ -4,13 +4,37 @@ from django.contrib import admin
 from .models import CustomUser, UserProfile, Block, Report
 from django.contrib.auth.admin import UserAdmin
 
+from users.models import AuraPointsEntry
+from users.points import award
+
 
 class CustomUserAdmin(UserAdmin):
     model = CustomUser
     list_display = ["username", "email", "first_name", "last_name", "is_staff"]
 
 
+class UserProfileAdmin(admin.ModelAdmin):
+    # UserProfile.save() never writes these; the balance is edited through
+    # the ledger below, the rest follows from it
+    readonly_fields = (
+        tuple(field for field in UserProfile.LEDGER_FIELDS if field != "aura_points")
+        + UserProfile.COUNTER_FIELDS
+        + UserProfile.DERIVED_FIELDS
+    )
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if change and "aura_points" in form.changed_data:
+            # Record the edit as an adjustment of the balance the form showed
+            award(
+                obj.user_id,
+                AuraPointsEntry.ADJUSTMENT,
+                obj.aura_points - form.initial["aura_points"],
+            )
+            obj.refresh_from_db()
+
+
 admin.site.register(CustomUser, CustomUserAdmin)
-admin.site.register(UserProfile)
+admin.site.register(UserProfile, UserProfileAdmin)
 admin.site.register(Block)
 admin.site.register(Report)
@@ -0,0 +1,177 @@
+"""
+Token authentication with an in-process cache.
+
+DRF's `TokenAuthentication` queries `Token` and `CustomUser` on every
+request. Here the token and user rows are cached per token key in a bounded
+LRU, for at most `TOKEN_CACHE_TTL` seconds, so a hit costs no query at all.
+A miss loads the token, user and profile in one joined query.
+
+Profiles are not cached: their balances, levels and counters change with
+F() updates in other processes (the `run_jobs` worker), which no eviction
+can follow, and views save the profile they read. On a hit
+`request.user.userprofile` is queried fresh.
+
+A hit rebuilds fresh model instances from the cached column values; requests
+never share (and mutate) the same objects. Entries are evicted when their
+token is deleted and when their user is saved or deleted (`users.signals`),
+which includes deactivation by `UserDeleteView`. Those signals only reach
+this process: other workers drop the entry within `TOKEN_CACHE_TTL`, so keep
+it short.
+
+`CachedTokenAuthentication` is the DRF authentication class;
+`aget_user()` serves the async views that authenticate by hand (the event
+stream).
+"""
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db.models.fields.files import FieldFile
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from users.models import CustomUser
+
+TOKEN_CACHE_SIZE = getattr(settings, "TOKEN_CACHE_SIZE", 10000)
+TOKEN_CACHE_TTL = getattr(settings, "TOKEN_CACHE_TTL", 60)
+
+
+def _values(instance):
+    values = []
+    for field in instance._meta.concrete_fields:
+        value = getattr(instance, field.attname)
+        # Cache the stored name, not the file object bound to `instance`
+        values.append(value.name if isinstance(value, FieldFile) else value)
+    return tuple(values)
+
+
+def _rebuild(model, db, values):
+    # JSON columns hold mutable values; each request gets its own copy
+    return model.from_db(
+        db,
+        [field.attname for field in model._meta.concrete_fields],
+        copy.deepcopy(values),
+    )
+
+
+class TokenCache:
+    """LRU of token key -> (expiry, user id, cached rows), thread-safe."""
+
+    def __init__(self, size=TOKEN_CACHE_SIZE, ttl=TOKEN_CACHE_TTL):
+        self.size = size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._keys_by_user = {}
+        # Bumped by every eviction, so rows loaded before one are not cached
+        self.generation = 0
+
+    def get(self, key):
+        """The `(user, token)` cached for `key`, rebuilt, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expiry, _, rows = entry
+            if expiry <= time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+        db, token_values, user_values = rows
+
+        user = _rebuild(CustomUser, db, user_values)
+        token = _rebuild(Token, db, token_values)
+        Token._meta.get_field("user").set_cached_value(token, user)
+        return user, token
+
+    def set(self, token, generation):
+        """
+        Cache `token` and its user, loaded when the generation was
+        `generation`, unless something was evicted since.
+        """
+        user = token.user
+        rows = (token._state.db, _values(token), _values(user))
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._entries[token.key] = (time.monotonic() + self.ttl, user.pk, rows)
+            self._entries.move_to_end(token.key)
+            self._keys_by_user.setdefault(user.pk, set()).add(token.key)
+            while len(self._entries) > self.size:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            keys = self._keys_by_user[entry[1]]
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[entry[1]]
+
+    def evict(self, key):
+        with self._lock:
+            self.generation += 1
+            self._remove(key)
+
+    def evict_user(self, user_id):
+        with self._lock:
+            self.generation += 1
+            for key in list(self._keys_by_user.get(user_id, ())):
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+            self._keys_by_user.clear()
+
+
+token_cache = TokenCache()
+
+
+def _tokens():
+    # The profile comes along for the request that misses, not for the cache
+    return Token.objects.select_related("user__userprofile")
+
+
+def _check(token):
+    if token is None:
+        raise exceptions.AuthenticationFailed(_("Invalid token."))
+    if not token.user.is_active:
+        raise exceptions.AuthenticationFailed(_("User inactive or deleted."))
+
+
+def get_user(key):
+    """`(user, token)` for the token `key`; raises `AuthenticationFailed`."""
+    cached = token_cache.get(key)
+    if cached is not None:
+        return cached
+    generation = token_cache.generation
+    token = _tokens().filter(key=key).first()
+    _check(token)
+    token_cache.set(token, generation)
+    return token.user, token
+
+
+async def aget_user(key):
+    """Async `get_user()`."""
+    cached = token_cache.get(key)
+    if cached is not None:
+        return cached
+    generation = token_cache.generation
+    token = await _tokens().filter(key=key).afirst()
+    _check(token)
+    token_cache.set(token, generation)
+    return token.user, token
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """`TokenAuthentication` backed by `token_cache`."""
+
+    def authenticate_credentials(self, key):
+        return get_user(key)
@@ -0,0 +1,173 @@
+"""
+In-process aura points leaderboard.
+
+Every worker keeps the ranking as a sorted list of `(-aura_points, user_id)`
+keys, so a top-N page is a slice, a user's rank is a binary search and the
+users around them are a slice around that position. Nothing sorts the
+profile table per request.
+
+The ranking is loaded from the aura points ledger (`AuraPointsEntry`) and
+kept up to date incrementally: each read first applies the ledger entries
+written since the last one it saw, plus profile creations and deletions from
+the profile history table. Both catch-ups are primary-key range scans that
+are usually empty. A full reload every `LEADERBOARD_RELOAD_SECONDS` picks up
+entries that committed out of id order.
+
+The ranking only ever reads the ledger, never `UserProfile.aura_points`:
+balances changed without a ledger entry are not ranked, and
+`rebuild_aura_points` sets the balances back to what the ledger says.
+
+Ties share a rank (1, 2, 2, 4, ...); within a tie users are listed by id.
+"""
+
+import threading
+import time
+from bisect import bisect_left, insort
+
+from django.conf import settings
+from django.db.models import Max, Sum
+
+from users.models import AuraPointsEntry, UserProfile
+
+LEADERBOARD_RELOAD_SECONDS = getattr(settings, "LEADERBOARD_RELOAD_SECONDS", 300)
+
+
+class Leaderboard:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._keys = []
+        self._points = {}
+        self._entry_id = None
+        self._history_id = None
+        self._loaded_at = None
+
+    # Synchronisation
+
+    def _history(self):
+        return UserProfile.history.model.objects
+
+    def _load(self):
+        # Sum the ledger up to a known entry id so catching up from that id
+        # never applies an entry twice.
+        latest = AuraPointsEntry.objects.aggregate(latest=Max("id"))["latest"]
+        self._entry_id = latest or 0
+        latest = self._history().aggregate(latest=Max("history_id"))["latest"]
+        self._history_id = latest or 0
+
+        points = dict.fromkeys(UserProfile.objects.values_list("user_id", flat=True), 0)
+        totals = (
+            AuraPointsEntry.objects.filter(id__lte=self._entry_id)
+            .values("user_id")
+            .annotate(total=Sum("delta"))
+            .values_list("user_id", "total")
+        )
+        for user_id, total in totals:
+            if user_id in points:
+                points[user_id] = total
+        self._points = points
+        self._keys = sorted((-total, user_id) for user_id, total in points.items())
+        self._loaded_at = time.monotonic()
+
+    def _catch_up(self):
+        entries = (
+            AuraPointsEntry.objects.filter(id__gt=self._entry_id)
+            .order_by("id")
+            .values_list("id", "user_id", "delta")
+        )
+        for entry_id, user_id, delta in entries:
+            self._set(user_id, self._points.get(user_id, 0) + delta)
+            self._entry_id = entry_id
+
+        profiles = (
+            self._history()
+            .filter(history_id__gt=self._history_id, history_type__in=["+", "-"])
+            .order_by("history_id")
+            .values_list("history_id", "user_id", "history_type")
+        )
+        for history_id, user_id, history_type in profiles:
+            if history_type == "-":
+                self._remove(user_id)
+            elif user_id not in self._points:
+                self._set(user_id, 0)
+            self._history_id = history_id
+
+    def sync(self):
+        """Bring the ranking up to date with the database."""
+        with self._lock:
+            if (
+                self._loaded_at is None
+                or time.monotonic() - self._loaded_at > LEADERBOARD_RELOAD_SECONDS
+            ):
+                self._load()
+            else:
+                self._catch_up()
+
+    def reload(self):
+        """Rebuild from the ledger, e.g. after entries were deleted."""
+        with self._lock:
+            self._load()
+
+    def _set(self, user_id, points):
+        self._remove(user_id)
+        self._points[user_id] = points
+        insort(self._keys, (-points, user_id))
+
+    def _remove(self, user_id):
+        points = self._points.pop(user_id, None)
+        if points is not None:
+            index = bisect_left(self._keys, (-points, user_id))
+            del self._keys[index]
+
+    # Queries (all call sync() first)
+
+    def __len__(self):
+        self.sync()
+        return len(self._keys)
+
+    def top(self, limit, offset=0):
+        """`[(rank, user_id, points), ...]` for a page of the ranking."""
+        self.sync()
+        with self._lock:
+            return self._page(offset, offset + limit)
+
+    def position(self, user_id):
+        """
+        Return `{"rank", "percentile", "aura_points", "total"}` for a user,
+        or None if they have no profile. The percentile is the share of users
+        with fewer points.
+        """
+        self.sync()
+        with self._lock:
+            points = self._points.get(user_id)
+            if points is None:
+                return None
+            total = len(self._keys)
+            rank = bisect_left(self._keys, (-points,)) + 1
+            below = total - bisect_left(self._keys, (-points + 1,))
+            return {
+                "rank": rank,
+                "percentile": round(100 * below / total, 2),
+                "aura_points": points,
+                "total": total,
+            }
+
+    def around(self, user_id, k):
+        """The user and up to `k` users on either side of them."""
+        self.sync()
+        with self._lock:
+            points = self._points.get(user_id)
+            if points is None:
+                return []
+            index = bisect_left(self._keys, (-points, user_id))
+            return self._page(max(index - k, 0), index + k + 1)
+
+    def _page(self, start, stop):
+        page = []
+        for index in range(start, min(stop, len(self._keys))):
+            negative_points, user_id = self._keys[index]
+            rank = bisect_left(self._keys, (negative_points,)) + 1
+            page.append((rank, user_id, -negative_points))
+        return page
+
+
+leaderboard = Leaderboard()
@@ -0,0 +1,63 @@
+from django.core.management.base import BaseCommand
+from django.db.models import IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from rak import versions
+from users.models import AuraPointsEntry, UserProfile
+from users.points import SOURCE_COLUMNS, recalculate_levels
+
+
+def _total(**filters):
+    return Coalesce(
+        Subquery(
+            AuraPointsEntry.objects.filter(user=OuterRef("user"), **filters)
+            .order_by()
+            .values("user")
+            .annotate(total=Sum("delta"))
+            .values("total"),
+            output_field=IntegerField(),
+        ),
+        Value(0),
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute aura_points and the points_from_* breakdown of every profile "
+        "from the aura points ledger."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Number of profiles updated per UPDATE statement.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        projections = {"aura_points": _total()}
+        for source, column in SOURCE_COLUMNS.items():
+            projections[column] = _total(source=source)
+
+        last_id = 0
+        updated = 0
+        while True:
+            ids = list(
+                UserProfile.objects.filter(pk__gt=last_id)
+                .order_by("pk")
+                .values_list("pk", flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            batch = UserProfile.objects.filter(pk__gte=ids[0], pk__lte=ids[-1])
+            updated += batch.update(**projections)
+            recalculate_levels(batch)
+            last_id = ids[-1]
+
+        # Queryset updates skip the signals, so invalidate leaderboards here
+        versions.bump(versions.PROFILES)
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt aura points on {updated} profiles.")
+        )
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+
+from rak import versions
+from users.models import UserProfile
+from users.points import recalculate_levels
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute aura_level and aura_color for every profile from its aura "
+        "points, in batched UPDATEs."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Number of profiles updated per UPDATE statement.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        last_id = 0
+        updated = 0
+        while True:
+            ids = list(
+                UserProfile.objects.filter(pk__gt=last_id)
+                .order_by("pk")
+                .values_list("pk", flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            updated += recalculate_levels(
+                UserProfile.objects.filter(pk__gte=ids[0], pk__lte=ids[-1])
+            )
+            last_id = ids[-1]
+
+        # Queryset updates skip the signals, so invalidate leaderboards here
+        versions.bump(versions.PROFILES)
+        self.stdout.write(
+            self.style.SUCCESS(f"Recomputed levels on {updated} profiles.")
+        )
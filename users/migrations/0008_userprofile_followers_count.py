@@ -0,0 +1,39 @@
+# Generated by Django 5.1 on 2026-10-18 16:08
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+
+
+def populate_followers_count(apps, schema_editor):
+    UserProfile = apps.get_model("users", "UserProfile")
+    Follow = apps.get_model("users", "Follow")
+    counts = (
+        Follow.objects.filter(followed=OuterRef("user"))
+        .values("followed")
+        .annotate(total=Count("id"))
+        .values("total")
+    )
+    UserProfile.objects.filter(user__followers__isnull=False).update(
+        followers_count=Subquery(counts)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0007_historicaluserprofile_profile_image_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='historicaluserprofile',
+            name='followers_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='followers_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(populate_followers_count, migrations.RunPython.noop),
+    ]
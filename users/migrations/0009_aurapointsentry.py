@@ -0,0 +1,65 @@
+# Generated by Django 5.1 on 2026-10-18 16:22
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+SOURCE_COLUMNS = {
+    "offer": "points_from_offers",
+    "claim": "points_from_claiming",
+    "pay_it_forward": "points_from_pay_it_forward",
+}
+
+
+def open_ledger(apps, schema_editor):
+    """Record existing balances as opening entries so the ledger sums match."""
+    UserProfile = apps.get_model("users", "UserProfile")
+    AuraPointsEntry = apps.get_model("users", "AuraPointsEntry")
+    entries = []
+    for profile in UserProfile.objects.iterator(chunk_size=1000):
+        breakdown = 0
+        for source, column in SOURCE_COLUMNS.items():
+            points = getattr(profile, column)
+            if points:
+                entries.append(
+                    AuraPointsEntry(user_id=profile.user_id, source=source, delta=points)
+                )
+                breakdown += points
+        if profile.aura_points != breakdown:
+            entries.append(
+                AuraPointsEntry(
+                    user_id=profile.user_id,
+                    source="adjustment",
+                    delta=profile.aura_points - breakdown,
+                )
+            )
+        if len(entries) >= 1000:
+            AuraPointsEntry.objects.bulk_create(entries)
+            entries = []
+    AuraPointsEntry.objects.bulk_create(entries)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rak', '0025_resourceversion'),
+        ('users', '0008_userprofile_followers_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuraPointsEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(choices=[('offer', 'Completed offer'), ('claim', 'Completed claim'), ('pay_it_forward', 'Pay It Forward'), ('adjustment', 'Adjustment')], max_length=20)),
+                ('delta', models.IntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('rak', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='aura_points_entries', to='rak.randomactofkindness')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='aura_points_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'source', 'rak'), name='unique_aura_points_award')],
+            },
+        ),
+        migrations.RunPython(open_ledger, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1 on 2026-10-18 16:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0009_aurapointsentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='historicaluserprofile',
+            name='unread_notifications',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='unread_notifications',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
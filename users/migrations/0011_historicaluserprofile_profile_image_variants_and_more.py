@@ -0,0 +1,23 @@
+# Generated by Django 5.1 on 2026-10-18 16:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0010_userprofile_unread_notifications'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='historicaluserprofile',
+            name='profile_image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='profile_image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1 on 2026-10-18 17:08
+
+import uploads.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0011_historicaluserprofile_profile_image_variants_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='userprofile',
+            name='profile_image',
+            field=models.ImageField(blank=True, null=True, storage=uploads.storage.get_blob_storage, upload_to='profile_images/'),
+        ),
+    ]
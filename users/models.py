@@ -5,6 +5,7 @@ from users.utils import (
 )  # Ensure this utility function is in users/utils.py
 from django.conf import settings
 from simple_history.models import HistoricalRecords
+from uploads.storage import get_blob_storage
 
 
 class CustomUser(AbstractUser):
@@ -24,21 +25,61 @@ class UserProfile(models.Model):
     points_from_claiming = models.IntegerField(default=0)
     points_from_pay_it_forward = models.IntegerField(default=0)
     points_from_offers = models.IntegerField(default=0)
+    # Stored once per distinct content, see uploads.storage
     profile_image = models.ImageField(
-        upload_to="profile_images/", blank=True, null=True
+        upload_to="profile_images/", storage=get_blob_storage, blank=True, null=True
     )
+    # Resized copies of `profile_image`, written by uploads.variants
+    profile_image_variants = models.JSONField(default=dict, blank=True, editable=False)
+    followers_count = models.PositiveIntegerField(default=0)
+    # Maintained by rak.notifications
+    unread_notifications = models.PositiveIntegerField(default=0)
     history = HistoricalRecords()
 
+    # Maintained by the aura points ledger (users.points) with F() updates;
+    # the level and colour follow the balance in the same UPDATE
+    LEDGER_FIELDS = (
+        "aura_points",
+        "points_from_claiming",
+        "points_from_pay_it_forward",
+        "points_from_offers",
+        "aura_level",
+        "aura_color",
+    )
+    # Counters only ever changed with F() updates
+    COUNTER_FIELDS = ("followers_count", "unread_notifications")
+    # Only written by the job that renders them (see uploads.variants)
+    DERIVED_FIELDS = ("profile_image_variants",)
+
+    def save(self, *args, **kwargs):
+        # Never write the balances or counters back from a possibly stale
+        # in-memory copy
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name
+                not in self.LEDGER_FIELDS + self.COUNTER_FIELDS + self.DERIVED_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
     def calculate_level(self):
         aura_info = get_aura_level(self.aura_points)
         self.aura_level = aura_info["level"]
         self.aura_color = aura_info.get("glowColor", "#50C878")
-        self.save()
+        # Only write the level if the balance is still the one it was derived
+        # from; a concurrent award recalculates it otherwise.
+        UserProfile.objects.filter(pk=self.pk, aura_points=self.aura_points).update(
+            aura_level=self.aura_level, aura_color=self.aura_color
+        )
 
     def award_aura_points(self, points):
-        self.aura_points += points
-        self.calculate_level()
-        self.save()
+        # Manual awards go through the ledger like every other change
+        from users.points import award
+
+        award(self.user_id, AuraPointsEntry.ADJUSTMENT, points)
+        self.refresh_from_db()
 
 
 def award_badges(self, previous_points):
@@ -139,3 +180,53 @@ class Follow(models.Model):
 
     def __str__(self):
         return f"{self.follower.username} follows {self.followed.username}"
+
+
+class AuraPointsEntry(models.Model):
+    """
+    One change to a user's aura points. The ledger is append-only: balances
+    on `UserProfile` are updated with `F()` expressions in the same
+    transaction (see `users.points`), and the `points_from_*` breakdown can
+    be rebuilt from it with `rebuild_aura_points`.
+    """
+
+    OFFER = "offer"
+    CLAIM = "claim"
+    PAY_IT_FORWARD = "pay_it_forward"
+    ADJUSTMENT = "adjustment"
+    SOURCE_CHOICES = [
+        (OFFER, "Completed offer"),
+        (CLAIM, "Completed claim"),
+        (PAY_IT_FORWARD, "Pay It Forward"),
+        (ADJUSTMENT, "Adjustment"),
+    ]
+
+    user = models.ForeignKey(
+        CustomUser, on_delete=models.CASCADE, related_name="aura_points_entries"
+    )
+    source = models.CharField(max_length=20, choices=SOURCE_CHOICES)
+    rak = models.ForeignKey(
+        "rak.RandomActOfKindness",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="aura_points_entries",
+    )
+    delta = models.IntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            # A RAK pays each user at most once per source
+            models.UniqueConstraint(
+                fields=["user", "source", "rak"], name="unique_aura_points_award"
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("Aura points entries are append-only.")
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.delta:+d} aura points for {self.user_id} ({self.source})"
@@ -0,0 +1,111 @@
+"""
+Aura points awards.
+
+Every change to a balance is recorded as an `AuraPointsEntry` and applied to
+`UserProfile` with `F()` expressions in one transaction, so concurrent awards
+never overwrite each other. Awards tied to a RAK are idempotent: users the
+RAK already paid for a source are skipped, and the ledger's unique
+constraint rejects a concurrent duplicate, leaving the rest of the batch
+to be paid.
+
+Awards are set-based: paying any number of users costs one ledger INSERT,
+one UPDATE of balances and levels, one SELECT of the profiles and one
+history INSERT, so completing a RAK with 200 claimants takes as long as
+completing one with a single claimant.
+"""
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from users.models import AuraPointsEntry, UserProfile
+from users.utils import aura_level_expressions
+
+# Breakdown column fed by each source; adjustments only move the balance.
+SOURCE_COLUMNS = {
+    AuraPointsEntry.OFFER: "points_from_offers",
+    AuraPointsEntry.CLAIM: "points_from_claiming",
+    AuraPointsEntry.PAY_IT_FORWARD: "points_from_pay_it_forward",
+}
+
+
+def award(user_id, source, points, rak=None):
+    """
+    Record `points` for `user_id` and update their balance. Returns False if
+    this RAK already paid the user for `source`.
+    """
+    return bool(award_many([user_id], source, points, rak))
+
+
+def award_many(user_ids, source, points, rak=None):
+    """
+    Record `points` for every user in `user_ids` and update their balances.
+    Returns the ids of the users that were paid.
+    """
+    user_ids = set(user_ids)
+    with transaction.atomic():
+        if rak is not None:
+            user_ids -= set(
+                AuraPointsEntry.objects.filter(
+                    source=source, rak=rak, user_id__in=user_ids
+                ).values_list("user_id", flat=True)
+            )
+        if not user_ids:
+            return []
+
+        try:
+            with transaction.atomic():
+                AuraPointsEntry.objects.bulk_create(
+                    [
+                        AuraPointsEntry(
+                            user_id=user_id, source=source, rak=rak, delta=points
+                        )
+                        for user_id in user_ids
+                    ]
+                )
+        except IntegrityError:
+            # A concurrent award for the same RAK and source paid some of
+            # them first; pay the others one by one
+            user_ids = _insert_each(user_ids, source, points, rak)
+            if not user_ids:
+                return []
+
+        # Balance, breakdown and level in one UPDATE; the level is derived
+        # from the new balance.
+        changes = {
+            "aura_points": F("aura_points") + points,
+            **aura_level_expressions(F("aura_points") + points),
+        }
+        column = SOURCE_COLUMNS.get(source)
+        if column:
+            changes[column] = F(column) + points
+        UserProfile.objects.filter(user_id__in=user_ids).update(**changes)
+
+        profiles = list(UserProfile.objects.filter(user_id__in=user_ids))
+        UserProfile.history.bulk_history_create(profiles, update=True)
+
+        # Queryset updates skip post_save, so invalidate leaderboards here.
+        # Avoid circular import (rak.models imports this module)
+        from rak import versions
+
+        versions.bump(versions.PROFILES)
+    return sorted(user_ids)
+
+
+def _insert_each(user_ids, source, points, rak):
+    """Insert the ledger entries one at a time; return whom they paid."""
+    paid = set()
+    for user_id in user_ids:
+        try:
+            with transaction.atomic():
+                AuraPointsEntry.objects.create(
+                    user_id=user_id, source=source, rak=rak, delta=points
+                )
+        except IntegrityError:
+            continue
+        paid.add(user_id)
+    return paid
+
+
+def recalculate_levels(queryset):
+    """Recompute `aura_level` / `aura_color` for a set of profiles in one UPDATE."""
+    return queryset.update(**aura_level_expressions(F("aura_points")))
@@ -1,4 +1,7 @@
 from rest_framework import serializers
+
+from core.serializers import SparseFieldsetMixin
+from uploads.serializers import VariantsField
 from .models import CustomUser, UserProfile, Follow, Report
 
 
@@ -23,11 +26,12 @@ class CustomUserSerializer(serializers.ModelSerializer):
         return instance
 
 
-class UserProfileSerializer(serializers.ModelSerializer):
+class UserProfileSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     user = CustomUserSerializer(read_only=True)  # NESTING!!!!!!!!!!!!!!!
     points_from_claiming_percentage = serializers.SerializerMethodField()
     points_from_pay_it_forward_percentage = serializers.SerializerMethodField()
     points_from_offers_percentage = serializers.SerializerMethodField()
+    profile_image_variants = VariantsField("profile_image")
 
     class Meta:
         model = UserProfile
@@ -44,7 +48,28 @@ class UserProfileSerializer(serializers.ModelSerializer):
             "points_from_pay_it_forward_percentage",
             "points_from_offers_percentage",
             "profile_image",
+            "profile_image_variants",
         ]
+        # Balances only change through the aura points ledger (users.points)
+        read_only_fields = [
+            "aura_points",
+            "aura_level",
+            "aura_color",
+            "points_from_claiming",
+            "points_from_pay_it_forward",
+            "points_from_offers",
+        ]
+        field_paths = {
+            "points_from_claiming_percentage": ["points_from_claiming", "aura_points"],
+            "points_from_pay_it_forward_percentage": [
+                "points_from_pay_it_forward",
+                "aura_points",
+            ],
+            "points_from_offers_percentage": ["points_from_offers", "aura_points"],
+            "profile_image_variants": ["profile_image", "profile_image_variants"],
+        }
+        # Only rendered with `?fields=` when also named in `?expand=`
+        expandable_fields = ["user"]
 
     # Helper function to calculate the percentage
     def calculate_percentage(self, part, total):
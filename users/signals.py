@@ -0,0 +1,18 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from users.authentication import token_cache
+from users.models import CustomUser
+
+
+@receiver(post_delete, sender=Token, dispatch_uid="users.token_cache.token")
+def _evict_token(sender, instance, **kwargs):
+    token_cache.evict(instance.key)
+
+
+@receiver(post_save, sender=CustomUser, dispatch_uid="users.token_cache.user")
+@receiver(post_delete, sender=CustomUser, dispatch_uid="users.token_cache.user")
+def _evict_user(sender, instance, **kwargs):
+    # Deactivation included: the next request checks `is_active` again
+    token_cache.evict_user(instance.pk)
@@ -1,3 +1,201 @@
-from django.test import TestCase
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.admin.sites import site
+from django.db import connection
+from django.db.models import IntegerField, Value
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+
+from rak.models import RandomActOfKindness
+from users import points
+from users.authentication import get_user, token_cache
+from users.leaderboard import leaderboard
+from users.models import AuraPointsEntry, CustomUser, UserProfile
+from users.points import award
+from users.utils import aura_level_expressions, get_aura_level
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    def setUp(self):
+        token_cache.clear()
+        self.user = CustomUser.objects.create_user(username="alice", password="pw")
+        self.key = Token.objects.create(user=self.user).key
+        self.headers = {"Authorization": f"Token {self.key}"}
+
+    def test_hit_needs_no_query(self):
+        get_user(self.key)
+        with CaptureQueriesContext(connection) as queries:
+            user, token = get_user(self.key)
+        self.assertEqual(len(queries), 0)
+        self.assertEqual((user.pk, token.key), (self.user.pk, self.key))
+        self.assertIsNot(get_user(self.key)[0], user)
+
+    def test_profile_is_read_fresh(self):
+        # Prime the cache, then change the balance behind its back
+        self.client.get("/users/profile/", headers=self.headers)
+        award(self.user.pk, AuraPointsEntry.ADJUSTMENT, 100000)
+
+        response = self.client.patch(
+            "/rak/user/profile/",
+            {"aura_sub_level": "Spark"},
+            content_type="application/json",
+            headers=self.headers,
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.json()["aura_points"], 100000)
+
+        profile = UserProfile.objects.get(user=self.user)
+        self.assertEqual(profile.aura_points, 100000)
+        self.assertNotEqual(profile.aura_level, "Initiator")
+        self.assertEqual(profile.aura_sub_level, "Spark")
+
+    def test_deactivation_and_token_deletion_evict(self):
+        get_user(self.key)
+        self.client.delete("/rak/user/delete/", headers=self.headers)
+        response = self.client.get("/users/profile/", headers=self.headers)
+        self.assertEqual(response.status_code, 401)
+
+        other = CustomUser.objects.create_user(username="bob", password="pw")
+        key = Token.objects.create(user=other).key
+        get_user(key)
+        Token.objects.filter(key=key).delete()
+        self.assertIsNone(token_cache.get(key))
+
+
+class LedgerTests(TestCase):
+    def setUp(self):
+        self.users = [
+            CustomUser.objects.create_user(username=name, password="pw")
+            for name in ("alice", "bob", "carol")
+        ]
+        self.rak = RandomActOfKindness.objects.create(
+            created_by=self.users[0],
+            title="t",
+            description="d",
+            rak_type="offer",
+            action="a",
+        )
+
+    def balance(self, user):
+        return UserProfile.objects.get(user=user).aura_points
+
+    def test_a_concurrent_award_does_not_cancel_the_batch(self):
+        alice, bob, carol = self.users
+        award(alice.pk, AuraPointsEntry.CLAIM, 10, self.rak)
+        # As if alice's entry was committed after the already-paid check
+        with mock.patch.object(
+            AuraPointsEntry.objects,
+            "filter",
+            return_value=AuraPointsEntry.objects.none(),
+        ):
+            paid = points.award_many(
+                [alice.pk, bob.pk, carol.pk], AuraPointsEntry.CLAIM, 10, self.rak
+            )
+        self.assertEqual(paid, sorted([bob.pk, carol.pk]))
+        self.assertEqual([self.balance(user) for user in self.users], [10, 10, 10])
+        self.assertEqual(AuraPointsEntry.objects.count(), 3)
+
+    def test_admin_balance_edits_go_through_the_ledger(self):
+        alice = self.users[0]
+        award(alice.pk, AuraPointsEntry.ADJUSTMENT, 50)
+        profile = UserProfile.objects.get(user=alice)
+        profile.aura_points = 80
+        form = SimpleNamespace(
+            changed_data=["aura_points"], initial={"aura_points": 50}
+        )
+
+        site._registry[UserProfile].save_model(
+            RequestFactory().post("/"), profile, form, change=True
+        )
+        self.assertEqual(self.balance(alice), 80)
+        self.assertEqual(
+            list(
+                AuraPointsEntry.objects.filter(user=alice).values_list(
+                    "delta", flat=True
+                )
+            ),
+            [50, 30],
+        )
+
+
+class LeaderboardTests(TestCase):
+    def setUp(self):
+        self.users = {
+            name: CustomUser.objects.create_user(username=name, password="pw")
+            for name in ("alice", "bob", "carol", "dave")
+        }
+        for name, amount in (("alice", 30), ("bob", 20), ("carol", 20)):
+            award(self.users[name].pk, AuraPointsEntry.ADJUSTMENT, amount)
+        leaderboard.reload()
+
+    def ranking(self):
+        return [
+            (rank, CustomUser.objects.get(pk=user_id).username, amount)
+            for rank, user_id, amount in leaderboard.top(10)
+        ]
+
+    def test_ties_share_a_rank(self):
+        self.assertEqual(
+            self.ranking(),
+            [(1, "alice", 30), (2, "bob", 20), (2, "carol", 20), (4, "dave", 0)],
+        )
+
+    def test_catches_up_without_a_reload(self):
+        award(self.users["dave"].pk, AuraPointsEntry.ADJUSTMENT, 50)
+        self.users["carol"].delete()
+        erin = CustomUser.objects.create_user(username="erin", password="pw")
+        self.assertEqual(
+            self.ranking(),
+            [(1, "dave", 50), (2, "alice", 30), (3, "bob", 20), (4, "erin", 0)],
+        )
+        self.assertEqual(leaderboard.position(erin.pk)["rank"], 4)
+
+    def test_rank_view(self):
+        key = Token.objects.create(user=self.users["bob"]).key
+        response = self.client.get(
+            "/users/leaderboard/me/?around=1", headers={"Authorization": f"Token {key}"}
+        )
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(
+            (data["rank"], data["aura_points"], data["total"], data["percentile"]),
+            (2, 20, 4, 25.0),
+        )
+        self.assertEqual(
+            [row["username"] for row in data["around"]], ["alice", "bob", "carol"]
+        )
+        self.assertEqual(self.client.get("/users/leaderboard/999999/").status_code, 404)
+
+
+class AuraLevelTests(TestCase):
+    BOUNDARIES = (
+        (-5, "Initiator"),
+        (0, "Initiator"),
+        (100, "Initiator"),
+        (101, "Sustainer"),
+        (200, "Sustainer"),
+        (201, "Visionary"),
+        (900, "Orchestrator"),
+        (901, "Harmoniser"),
+        (10000, "Harmoniser"),
+        (2**31 - 1, "Harmoniser"),
+    )
+
+    def test_python_and_sql_agree_at_the_boundaries(self):
+        CustomUser.objects.create_user(username="alice", password="pw")
+        for points, level in self.BOUNDARIES:
+            with self.subTest(points=points):
+                info = get_aura_level(points)
+                self.assertEqual(info["level"], level)
+
+                expressions = aura_level_expressions(
+                    Value(points, output_field=IntegerField())
+                )
+                row = UserProfile.objects.annotate(
+                    level=expressions["aura_level"], color=expressions["aura_color"]
+                ).values("level", "color")
+                self.assertEqual(
+                    row.get(), {"level": level, "color": info["glowColor"]}
+                )
@@ -9,11 +9,11 @@ from .views import (
     FollowersListView,
     UnfollowUserView,
     LeaderboardView,
+    LeaderboardRankView,
     CustomAuthToken,
     UserProfileDetailView,
+    UserProfileBatchView,
 )
-from django.conf import settings
-from django.conf.urls.static import static
 
 urlpatterns = [
     # User-related endpoints
@@ -30,6 +30,9 @@ urlpatterns = [
     path(
         "profile/", UserProfileView.as_view(), name="user-profile"
     ),  # View and update logged-in user's profile
+    path(
+        "profile/batch/", UserProfileBatchView.as_view(), name="user-profile-batch"
+    ),  # Several users' profiles in one request
     path(
         "profile/<int:user_id>/",
         UserProfileDetailView.as_view(),
@@ -39,6 +42,14 @@ urlpatterns = [
     path(
         "leaderboard/", LeaderboardView.as_view(), name="leaderboard"
     ),  # Display top users by aura points
+    path(
+        "leaderboard/me/", LeaderboardRankView.as_view(), name="leaderboard-me"
+    ),  # Rank, percentile and neighbours of the logged-in user
+    path(
+        "leaderboard/<int:user_id>/",
+        LeaderboardRankView.as_view(),
+        name="leaderboard-rank",
+    ),  # Rank, percentile and neighbours of a user
     path(
         "token/", CustomAuthToken.as_view(), name="custom-token-auth"
     ),  # Custom token authentication
@@ -51,4 +62,3 @@ urlpatterns = [
         "following/<int:user_id>/", FollowingListView.as_view(), name="following-list"
     ),
 ]
-urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
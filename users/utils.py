@@ -1,28 +1,55 @@
+from bisect import bisect_right
+
+from django.db.models import Case, Value, When
+from django.db.models.lookups import GreaterThanOrEqual
+
+# The 10 aura levels with the points needed to reach them, descriptive names
+# and glow colors. Each level lasts until the next one's threshold.
+AURA_LEVELS = (
+    (0, "Initiator", "#50C878"),  # Green
+    (101, "Sustainer", "#FFD700"),  # Yellow
+    (201, "Visionary", "#1E90FF"),  # Electric Blue
+    (301, "Creator", "#FF00FF"),  # Magenta
+    (401, "Innovator", "#FF0000"),  # Bright Red
+    (501, "Accelerator", "#FFA500"),  # Orange
+    (601, "Transformer", "#8B0000"),  # Deep Red
+    (701, "Healer", "#40E0D0"),  # Turquoise
+    (801, "Orchestrator", "#C0C0C0"),  # Silver
+    (901, "Harmoniser", "#800080"),  # Purple
+)
+
+# Compiled once at import: sorted thresholds for bisect and the matching info
+LEVEL_THRESHOLDS = tuple(threshold for threshold, _, _ in AURA_LEVELS)
+LEVEL_INFO = tuple(
+    {
+        "level": level,
+        "badgeImage": f"/images/{level.lower().replace(' ', '-')}.png",
+        "glowColor": color,
+    }
+    for _, level, color in AURA_LEVELS
+)
+
+
 def get_aura_level(points):
-    # Defining ranges for 10 levels with descriptive names and colors
-    aura_levels = [
-    (range(0, 100), "Initiator", "#00FF00"),  # Green
-(range(101, 200), "Sustainer", "#FFD700"),  # Yellow
-(range(201, 300), "Visionary", "#1E90FF"),  # Electric Blue
-(range(301, 400), "Creator", "#FF00FF"),  # Magenta
-(range(401, 500), "Innovator", "#FF0000"),  # Bright Red
-(range(501, 600), "Accelerator", "#FFA500"),  # Orange
-(range(601, 700), "Transformer", "#8B0000"),  # Deep Red
-(range(701, 800), "Healer", "#40E0D0"),  # Turquoise
-(range(801, 900), "Orchestrator", "#C0C0C0"),  # Silver
-(range(901, 10000), "Harmoniser", "#800080"),  # Purple
-    ]
-
-    # Iterate through the levels and check if the user's points fall within a range
-    for point_range, level, color in aura_levels:
-        if points in point_range:
-            # Return the descriptive level, badge image, and glow color
-            badge_image = f"/images/{level.lower().replace(' ', '-')}.png"
-            return {
-                "level": level,
-                "badgeImage": badge_image,
-                "glowColor": color,
-            }
-
-    # If no level found, return None
-    return None
+    # Binary search for the last threshold at or below the points
+    index = max(bisect_right(LEVEL_THRESHOLDS, points) - 1, 0)
+    # Return the descriptive level, badge image, and glow color
+    return dict(LEVEL_INFO[index])
+
+
+def aura_level_expressions(points):
+    """
+    `aura_level` / `aura_color` as CASE expressions over the `points`
+    expression, so a single UPDATE can recompute levels for many profiles.
+    """
+
+    def case(key):
+        return Case(
+            *(
+                When(GreaterThanOrEqual(points, threshold), then=Value(info[key]))
+                for threshold, info in reversed(list(zip(LEVEL_THRESHOLDS, LEVEL_INFO)))
+            ),
+            default=Value(LEVEL_INFO[0][key]),
+        )
+
+    return {"aura_level": case("level"), "aura_color": case("glowColor")}
@@ -1,3 +1,4 @@
+from asgiref.sync import sync_to_async
 from django.http import Http404
 from rest_framework.views import APIView
 from rest_framework.response import Response
@@ -5,7 +6,13 @@ from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.authtoken.models import Token
-from users.models import UserProfile, CustomUser, Follow
+from core import batch
+from core.async_views import AsyncAPIView, gather_queries
+from core.optimization import optimize_queryset
+from core.serializers import sparse_fieldset
+from rak import versions
+from users.leaderboard import leaderboard
+from users.models import Block, UserProfile, CustomUser, Follow
 from users.serializers import (
     CustomUserSerializer,
     UserProfileSerializer,
@@ -201,16 +208,18 @@ class CustomUserDetail(APIView):
         return Response({"message": "User deleted successfully"}, status=204)
 
 
-class UserProfileView(APIView):
+class UserProfileView(AsyncAPIView):
     """
     View to retrieve the authenticated user's profile.
 
     Only authenticated users can access their own profile.
+    `?fields=` / `?expand=user` select a sparse fieldset (see `core.serializers`).
     """
 
     permission_classes = [IsAuthenticated]
 
-    def get(self, request):
+    @versions.conditional(versions.PROFILES)
+    async def get(self, request):
         """
         Retrieve the authenticated user's profile.
 
@@ -220,24 +229,29 @@ class UserProfileView(APIView):
         Returns:
             Response: A DRF Response object containing serialized user profile data.
         """
+        fieldset = sparse_fieldset(request)
         try:
-            user_profile = UserProfile.objects.get(user=request.user)
+            user_profile = await optimize_queryset(
+                UserProfile.objects.all(), UserProfileSerializer(**fieldset)
+            ).aget(user=request.user)
         except UserProfile.DoesNotExist:
             return Response({"error": "UserProfile does not exist."}, status=404)
-        serializer = UserProfileSerializer(user_profile)
+        serializer = UserProfileSerializer(user_profile, **fieldset)
         return Response(serializer.data, status=200)
 
 
-class UserProfileDetailView(APIView):
+class UserProfileDetailView(AsyncAPIView):
     """
     View to retrieve a user's profile by user ID.
 
     Only authenticated users can access this view.
+    `?fields=` / `?expand=user` select a sparse fieldset (see `core.serializers`).
     """
 
     permission_classes = [IsAuthenticated]
 
-    def get(self, request, user_id):
+    @versions.conditional(versions.PROFILES)
+    async def get(self, request, user_id):
         """
         Retrieve a user's profile by user ID.
 
@@ -248,43 +262,164 @@ class UserProfileDetailView(APIView):
         Returns:
             Response: A DRF Response object containing serialized user profile data.
         """
+        fieldset = sparse_fieldset(request)
         try:
-            user_profile = UserProfile.objects.get(user_id=user_id)
+            user_profile = await optimize_queryset(
+                UserProfile.objects.all(), UserProfileSerializer(**fieldset)
+            ).aget(user_id=user_id)
         except UserProfile.DoesNotExist:
             return Response({"error": "UserProfile does not exist."}, status=404)
 
-        serializer = UserProfileSerializer(user_profile)
+        serializer = UserProfileSerializer(user_profile, **fieldset)
         return Response(serializer.data, status=200)
 
 
-class LeaderboardView(APIView):
+class UserProfileBatchView(AsyncAPIView):
+    """
+    View to retrieve several users' profiles in one request.
+
+    Only authenticated users can access this view. `?ids=` lists up to
+    `MAX_BATCH_IDS` user IDs; `?fields=` / `?expand=user` select a sparse
+    fieldset (see `core.serializers`).
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    async def get(self, request):
+        """
+        Retrieve the profiles of the users in `?ids=`.
+
+        Args:
+            request: The HTTP request.
+
+        Returns:
+            Response: A DRF Response object with one result per requested user
+            ID (see `core.batch`): the profile, 404 if the user has no
+            profile, or 403 if the user blocked the requester.
+        """
+        ids = batch.parse_ids(request)
+        fieldset = sparse_fieldset(request)
+        profiles_qs = optimize_queryset(
+            UserProfile.objects.filter(user_id__in=ids),
+            UserProfileSerializer(**fieldset),
+            extra_fields=("user",),
+        )
+        blocked_qs = Block.objects.filter(
+            user_id__in=ids, blocked_user=request.user
+        ).values_list("user_id", flat=True)
+        profiles, blocked = await gather_queries(
+            lambda: {profile.user_id: profile for profile in profiles_qs},
+            lambda: set(blocked_qs),
+        )
+        return Response(
+            batch.batch_results(
+                ids,
+                profiles,
+                lambda rows: UserProfileSerializer(rows, many=True, **fieldset).data,
+                blocked,
+            ),
+            status=200,
+        )
+
+
+def _int_param(request, name, default, maximum):
+    """Read a non-negative integer query parameter, clamped to `maximum`."""
+    try:
+        value = int(request.query_params.get(name, default))
+    except ValueError:
+        return default
+    return min(max(value, 0), maximum)
+
+
+async def _leaderboard_rows(entries):
+    """Attach profile details to `(rank, user_id, points)` leaderboard entries."""
+    profiles = await UserProfile.objects.select_related("user").ain_bulk(
+        [user_id for _, user_id, _ in entries], field_name="user_id"
+    )
+    return [
+        {
+            "rank": rank,
+            "user_id": user_id,
+            "username": profiles[user_id].user.username,
+            "aura_points": points,
+            "aura_level": profiles[user_id].aura_level,
+            "aura_sub_level": profiles[user_id].aura_sub_level,
+        }
+        for rank, user_id, points in entries
+        if user_id in profiles
+    ]
+
+
+class LeaderboardView(AsyncAPIView):
     """
     View to display a leaderboard of top users based on aura points.
 
-    Allows anyone to view the top 10 users.
+    Allows anyone to page through the ranking with `?offset=` and `?limit=`
+    (default 50, at most 100). Conditional GETs are answered with 304 while
+    no profile changed (see `rak.versions`).
     """
 
-    def get(self, request):
+    @versions.conditional(versions.PROFILES, public=True)
+    async def get(self, request):
         """
-        Retrieve the top 10 users ordered by aura points.
+        Retrieve a page of users ordered by aura points.
 
         Args:
             request: The HTTP request.
 
         Returns:
-            Response: A DRF Response object containing a list of top users.
+            Response: A DRF Response object containing a list of ranked users.
         """
-        top_users = UserProfile.objects.order_by("-aura_points")
-        data = [
+        # The ranking catches up with the database before answering
+        total = await sync_to_async(len)(leaderboard)
+        entries = await sync_to_async(leaderboard.top)(
+            limit=_int_param(request, "limit", 50, 100),
+            offset=_int_param(request, "offset", 0, total),
+        )
+        return Response(await _leaderboard_rows(entries), status=200)
+
+
+class LeaderboardRankView(AsyncAPIView):
+    """
+    View to look up a user's position on the leaderboard.
+
+    Returns the user's rank, percentile (share of users with fewer points)
+    and the `?around=` users (default 5, at most 50) on either side of them.
+    `/users/leaderboard/me/` looks up the authenticated user.
+    """
+
+    @versions.conditional(versions.PROFILES)
+    async def get(self, request, user_id=None):
+        """
+        Retrieve a user's rank and neighbourhood.
+
+        Args:
+            request: The HTTP request.
+            user_id (int): The ID of the user, or None for the requesting user.
+
+        Returns:
+            Response: A DRF Response object containing the user's position.
+        """
+        if user_id is None:
+            if not request.user.is_authenticated:
+                return Response({"error": "Authentication required."}, status=401)
+            user_id = request.user.pk
+
+        position = await sync_to_async(leaderboard.position)(user_id)
+        if position is None:
+            return Response({"error": "UserProfile does not exist."}, status=404)
+
+        around = await sync_to_async(leaderboard.around)(
+            user_id, _int_param(request, "around", 5, 50)
+        )
+        return Response(
             {
-                "username": user.user.username,
-                "aura_points": user.aura_points,
-                "aura_level": user.aura_level,
-                "aura_sub_level": user.aura_sub_level,
-            }
-            for user in top_users
-        ]
-        return Response(data, status=200)
+                "user_id": user_id,
+                **position,
+                "around": await _leaderboard_rows(around),
+            },
+            status=200,
+        )
 
 
 class FollowUserView(APIView):
@@ -347,7 +482,7 @@ class UnfollowUserView(APIView):
             return Response({"error": "You are not following this user."}, status=400)
 
 
-class FollowersListView(APIView):
+class FollowersListView(AsyncAPIView):
     """
     View to list all followers of a user.
 
@@ -356,7 +491,7 @@ class FollowersListView(APIView):
 
     permission_classes = [IsAuthenticated]
 
-    def get(self, request, user_id):
+    async def get(self, request, user_id):
         """
         Retrieve a list of followers for a user.
 
@@ -367,13 +502,20 @@ class FollowersListView(APIView):
         Returns:
             Response: A DRF Response object containing serialized follower data.
         """
-        user = CustomUser.objects.get(id=user_id)
-        followers = user.followers.all()  # All users following this user
+        followers = optimize_queryset(
+            Follow.objects.filter(followed_id=user_id), FollowSerializer
+        )  # All users following this user
+        # The user lookup and the list are independent; run them concurrently
+        user_exists, followers = await gather_queries(
+            CustomUser.objects.filter(id=user_id).exists, lambda: list(followers)
+        )
+        if not user_exists:
+            return Response({"error": "User does not exist."}, status=404)
         serializer = FollowSerializer(followers, many=True)
         return Response(serializer.data)
 
 
-class FollowingListView(APIView):
+class FollowingListView(AsyncAPIView):
     """
     View to list all users that a user is following.
 
@@ -382,7 +524,7 @@ class FollowingListView(APIView):
 
     permission_classes = [IsAuthenticated]
 
-    def get(self, request, user_id):
+    async def get(self, request, user_id):
         """
         Retrieve a list of users that a user is following.
 
@@ -393,7 +535,14 @@ class FollowingListView(APIView):
         Returns:
             Response: A DRF Response object containing serialized data.
         """
-        user = CustomUser.objects.get(id=user_id)
-        following = user.following.all()  # All users this user is following
+        following = optimize_queryset(
+            Follow.objects.filter(follower_id=user_id), FollowSerializer
+        )  # All users this user is following
+        # The user lookup and the list are independent; run them concurrently
+        user_exists, following = await gather_queries(
+            CustomUser.objects.filter(id=user_id).exists, lambda: list(following)
+        )
+        if not user_exists:
+            return Response({"error": "User does not exist."}, status=404)
         serializer = FollowSerializer(following, many=True)
         return Response(serializer.data)